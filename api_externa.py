@@ -1,31 +1,51 @@
 # api_externa.py (Versão à Prova de Falhas)
 
 import requests
+import cliente_http
+import metricas
+from cliente_http import LimitadorDeTaxa, URL_API_FOOTBALL, URL_THE_ODDS_API, URL_THE_RUNDOWN
 from datetime import date, datetime
-from gerenciador_cache import ler_cache, salvar_cache
+from gerenciador_cache import ler_cache, salvar_cache, ler_cache_ou_atualizar
+from concurrent.futures import ThreadPoolExecutor
+import time
 import math
+import os
 
 # --- CONSTANTES DE CACHE (SEM A PASTA 'cache/') ---
-CACHE_JOGOS_API_FOOTBALL = 'cache_jogos_api_football.json'
+# A chave dos jogos inclui a data para que um cache de ontem nunca seja servido após a meia-noite.
+CACHE_JOGOS_API_FOOTBALL = 'cache_jogos_api_football_{data}.json'
 CACHE_ODDS_API = 'cache_odds_api.json'
 VALIDADE_CACHE_HORAS = 2
 VALIDADE_CACHE_TABELA_HORAS = 24
+# Por quanto tempo além da validade um cache vencido ainda é servido enquanto atualiza em segundo plano.
+TOLERANCIA_CACHE_VENCIDO_HORAS = 1
 
+# --- LIMITES DE CONCORRÊNCIA DA API-FOOTBALL ---
+# O limite por minuto depende do plano contratado; pode ser ajustado pelo Secret/variável de ambiente.
+LIMITE_CHAMADAS_POR_MINUTO_API_FOOTBALL = int(os.getenv('API_FOOTBALL_LIMITE_POR_MINUTO', '30'))
+MAX_CHAMADAS_SIMULTANEAS_API_FOOTBALL = 8
+IDS_POR_CHAMADA_RESULTADOS = 20
+TENTATIVAS_EXTRAS_LOTE_RESULTADOS = 2
+
+limitador_api_football = LimitadorDeTaxa(LIMITE_CHAMADAS_POR_MINUTO_API_FOOTBALL)
+
+@metricas.etapa('busca_jogos')
 def buscar_jogos_api_football(api_key):
     print(f"\n--- ⚽ Buscando jogos do dia na API-Football... ---")
-    dados_cache = ler_cache(CACHE_JOGOS_API_FOOTBALL, VALIDADE_CACHE_HORAS)
-    if dados_cache is not None:
-        print(f"--- ✅ Sucesso! {len(dados_cache)} jogos encontrados no cache. ---")
-        return dados_cache
-
-    print("  -> Cache vazio ou expirado. Fazendo chamada real à API...")
     DATA_HOJE = date.today().strftime('%Y-%m-%d')
+    cache_file = CACHE_JOGOS_API_FOOTBALL.format(data=DATA_HOJE)
+    todos_os_jogos = ler_cache_ou_atualizar(cache_file, VALIDADE_CACHE_HORAS, lambda: _baixar_jogos_api_football(api_key, DATA_HOJE, cache_file), TOLERANCIA_CACHE_VENCIDO_HORAS)
+    print(f"--- ✅ {len(todos_os_jogos)} jogos disponíveis para análise. ---")
+    return todos_os_jogos
+
+def _baixar_jogos_api_football(api_key, DATA_HOJE, cache_file):
+    print("  -> Fazendo chamada real à API-Football...")
     headers = {'x-rapidapi-host': "v3.football.api-sports.io", 'x-rapidapi-key': api_key}
-    url = f"https://v3.football.api-sports.io/fixtures?date={DATA_HOJE}"
+    url = f"{URL_API_FOOTBALL}/fixtures?date={DATA_HOJE}"
     todos_os_jogos = []
     
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = cliente_http.get(url, headers=headers, timeout=30)
         if response.status_code == 200:
             data = response.json().get('response', [])
             if data:
@@ -44,7 +64,7 @@ def buscar_jogos_api_football(api_key):
                         'placar_fora': fixture.get('goals', {}).get('away')
                     })
                 print(f"--- ✅ Sucesso! {len(todos_os_jogos)} jogos encontrados na API. ---")
-                salvar_cache(CACHE_JOGOS_API_FOOTBALL, todos_os_jogos)
+                salvar_cache(cache_file, todos_os_jogos)
             else:
                 print("--- ⚠️ Nenhum jogo encontrado para hoje na API-Football. ---")
         else:
@@ -54,7 +74,7 @@ def buscar_jogos_api_football(api_key):
         
     return todos_os_jogos
 
-def buscar_estatisticas_time(api_key, time_id, league_id):
+def buscar_estatisticas_time(api_key, time_id, league_id, limitador=None):
     season = datetime.now().year
     cache_file = f"cache_stats_time_{time_id}_{season}_{league_id}.json"
     dados_cache = ler_cache(cache_file, VALIDADE_CACHE_HORAS)
@@ -64,10 +84,13 @@ def buscar_estatisticas_time(api_key, time_id, league_id):
     print(f"  -> 📞 Validação Online: Buscando stats para o time ID {time_id}...")
     headers = {'x-rapidapi-host': "v3.football.api-sports.io", 'x-rapidapi-key': api_key}
     params = {'team': time_id, 'league': league_id, 'season': season}
-    url = "https://v3.football.api-sports.io/teams/statistics"
+    url = f"{URL_API_FOOTBALL}/teams/statistics"
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=15)
+        if limitador:
+            with metricas.etapa('espera_limitador_api_football'):
+                limitador.aguardar()
+        response = cliente_http.get(url, headers=headers, params=params, timeout=15)
         if response.status_code == 200:
             data = response.json().get('response')
             if data and data.get('form'):
@@ -85,20 +108,45 @@ def buscar_estatisticas_time(api_key, time_id, league_id):
     
     return None
 
+@metricas.etapa('estatisticas_online')
+def buscar_estatisticas_times_em_lote(api_key, pares_time_liga, max_simultaneas=MAX_CHAMADAS_SIMULTANEAS_API_FOOTBALL):
+    """
+    Busca as estatísticas de vários (time_id, league_id) em paralelo, sem repetir pares.
+    Retorna {(time_id, league_id): stats ou None}.
+    """
+    pares_unicos = list(dict.fromkeys(par for par in pares_time_liga if par[0] is not None and par[1] is not None))
+    if not pares_unicos:
+        return {}
+    print(f"\n--- 🌐 Pré-carregando estatísticas online de {len(pares_unicos)} times ({max_simultaneas} chamadas simultâneas)... ---")
+    def _buscar(par):
+        try:
+            return buscar_estatisticas_time(api_key, par[0], par[1], limitador_api_football)
+        except Exception as e:
+            print(f"  -> ERRO inesperado ao buscar stats para o time ID {par[0]}: {e}")
+            return None
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_simultaneas) as executor:
+        resultados = executor.map(_buscar, pares_unicos)
+        estatisticas = dict(zip(pares_unicos, resultados))
+    print(f"  -> Estatísticas de {sum(1 for s in estatisticas.values() if s)}/{len(pares_unicos)} times obtidas em {time.perf_counter() - inicio:.1f}s.")
+    return estatisticas
+
+@metricas.etapa('busca_odds')
 def buscar_odds_the_odds_api(api_key):
     print("\n--- 👍 Buscando odds disponíveis na The Odds API... ---")
-    dados_cache = ler_cache(CACHE_ODDS_API, VALIDADE_CACHE_HORAS)
-    if dados_cache is not None:
-        print(f"  -> ✅ Sucesso! Odds para {len(dados_cache)} jogos encontradas no cache.")
-        return dados_cache
-    
-    print("  -> Cache de odds vazio ou expirado. Fazendo chamada real à API...")
+    jogos_com_odds = ler_cache_ou_atualizar(CACHE_ODDS_API, VALIDADE_CACHE_HORAS, lambda: _baixar_odds_the_odds_api(api_key), TOLERANCIA_CACHE_VENCIDO_HORAS)
+    print(f"  -> ✅ Odds para {len(jogos_com_odds)} jogos disponíveis.")
+    return jogos_com_odds
+
+def _baixar_odds_the_odds_api(api_key):
+    print("  -> Fazendo chamada real à The Odds API...")
     CASAS_DE_APOSTAS = 'pinnacle,betfair,bet365,marathonbet'
     params = {'api_key': api_key, 'regions': 'br,eu', 'markets': 'h2h', 'bookmakers': CASAS_DE_APOSTAS, 'oddsFormat': 'decimal'}
-    url = "https://api.the-odds-api.com/v4/sports/soccer/odds"
+    url = f"{URL_THE_ODDS_API}/v4/sports/soccer/odds"
     jogos_com_odds = []
     try:
-        response = requests.get(url, params=params, timeout=20)
+        response = cliente_http.get(url, params=params, timeout=20)
         if response.status_code == 200:
             data = response.json()
             if data:
@@ -107,6 +155,7 @@ def buscar_odds_the_odds_api(api_key):
                         'id': jogo.get('id'),
                         'home_team': jogo.get('home_team'),
                         'away_team': jogo.get('away_team'),
+                        'commence_time': jogo.get('commence_time'),
                         'bookmakers': jogo.get('bookmakers', [])
                     })
                 print(f"  -> ✅ Sucesso! Odds para {len(jogos_com_odds)} jogos encontradas na API.")
@@ -119,58 +168,93 @@ def buscar_odds_the_odds_api(api_key):
         print(f"  -> ERRO de conexão com a The Odds API: {e}")
     return jogos_com_odds
     
-def buscar_resultados_por_ids(api_key, lista_de_ids):
+def _buscar_lote_resultados(api_key, chunk_ids, rotulo):
+    """Uma chamada com até IDS_POR_CHAMADA_RESULTADOS ids. Retorna a lista de fixtures ou None se a chamada falhar."""
+    headers = {'x-rapidapi-host': "v3.football.api-sports.io", 'x-rapidapi-key': api_key}
+    url = f"{URL_API_FOOTBALL}/fixtures"
+    print(f"    -> Fazendo chamada {rotulo} para {len(chunk_ids)} IDs...")
+    try:
+        with metricas.etapa('espera_limitador_api_football'):
+            limitador_api_football.aguardar()
+        response = cliente_http.get(url, headers=headers, params={'ids': '-'.join(map(str, chunk_ids))}, timeout=30)
+        if response.status_code == 200:
+            return response.json().get('response', [])
+        print(f"    -> ERRO na chamada em lote {rotulo}: {response.status_code}")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"    -> ERRO de conexão na chamada em lote {rotulo}: {e}")
+    return None
+
+@metricas.etapa('busca_resultados')
+def buscar_resultados_por_ids(api_key, lista_de_ids, max_simultaneas=MAX_CHAMADAS_SIMULTANEAS_API_FOOTBALL):
+    """
+    Busca os fixtures de `lista_de_ids` em lotes de 20 ids, com os lotes disparados em paralelo
+    (até `max_simultaneas` ao mesmo tempo, respeitando o limitador da API-Football).
+    Lotes que falharem são repetidos um a um; o resultado segue a ordem dos ids recebidos.
+    """
     if not lista_de_ids:
         return []
 
-    print(f"  -> 📞 Buscando resultados para {len(lista_de_ids)} jogos...")
-    headers = {'x-rapidapi-host': "v3.football.api-sports.io", 'x-rapidapi-key': api_key}
-    url = "https://v3.football.api-sports.io/fixtures"
-    todos_os_resultados = []
-    
-    ids_por_chamada = 20
-    num_chamadas = math.ceil(len(lista_de_ids) / ids_por_chamada)
-
-    for i in range(num_chamadas):
-        inicio = i * ids_por_chamada
-        fim = inicio + ids_por_chamada
-        chunk_ids = lista_de_ids[inicio:fim]
-        ids_string = '-'.join(map(str, chunk_ids))
-        
-        print(f"    -> Fazendo chamada {i+1}/{num_chamadas} para {len(chunk_ids)} IDs...")
-        
-        try:
-            response = requests.get(url, headers=headers, params={'ids': ids_string}, timeout=30)
-            if response.status_code == 200:
-                data = response.json().get('response', [])
-                todos_os_resultados.extend(data)
-            else:
-                print(f"    -> ERRO na chamada em lote: {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"    -> ERRO de conexão na chamada em lote: {e}")
-            
+    ids_unicos = list(dict.fromkeys(lista_de_ids))
+    print(f"  -> 📞 Buscando resultados para {len(ids_unicos)} jogos...")
+    num_chamadas = math.ceil(len(ids_unicos) / IDS_POR_CHAMADA_RESULTADOS)
+    lotes = [ids_unicos[i * IDS_POR_CHAMADA_RESULTADOS:(i + 1) * IDS_POR_CHAMADA_RESULTADOS] for i in range(num_chamadas)]
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_simultaneas, num_chamadas))) as executor:
+        respostas = list(executor.map(lambda i: _buscar_lote_resultados(api_key, lotes[i], f"{i+1}/{num_chamadas}"), range(num_chamadas)))
+
+    for tentativa in range(1, TENTATIVAS_EXTRAS_LOTE_RESULTADOS + 1):
+        falhas = [i for i, resposta in enumerate(respostas) if resposta is None]
+        if not falhas:
+            break
+        print(f"    -> 🔁 Repetindo {len(falhas)} chamada(s) que falharam (tentativa {tentativa}/{TENTATIVAS_EXTRAS_LOTE_RESULTADOS})...")
+        for i in falhas:
+            respostas[i] = _buscar_lote_resultados(api_key, lotes[i], f"{i+1}/{num_chamadas}")
+
+    fixtures_por_id = {}
+    for resposta in respostas:
+        for fixture_data in resposta or []:
+            fixtures_por_id[str(fixture_data.get('fixture', {}).get('id'))] = fixture_data
+    todos_os_resultados = [fixtures_por_id[str(id_partida)] for id_partida in ids_unicos if str(id_partida) in fixtures_por_id]
+    lotes_perdidos = sum(1 for resposta in respostas if resposta is None)
+    aviso = f" ({lotes_perdidos} lote(s) sem resposta)" if lotes_perdidos else ""
+    print(f"  -> Resultados de {len(todos_os_resultados)}/{len(ids_unicos)} jogos obtidos em {time.perf_counter() - inicio:.1f}s{aviso}.")
     return todos_os_resultados
 
+def _interpretar_resultado_fixture(fixture_data):
+    status = fixture_data.get('fixture', {}).get('status', {}).get('short', 'NS')
+    if status == 'FT':
+        placar_casa = fixture_data.get('goals', {}).get('home', -1)
+        placar_fora = fixture_data.get('goals', {}).get('away', -1)
+        return "encerrado", placar_casa, placar_fora
+    return "em_andamento", None, None
+
 def verificar_resultado_api_football(api_key, id_partida):
     headers = {'x-rapidapi-host': "v3.football.api-sports.io", 'x-rapidapi-key': api_key}
-    url = f"https://v3.football.api-sports.io/fixtures?id={id_partida}"
+    url = f"{URL_API_FOOTBALL}/fixtures?id={id_partida}"
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = cliente_http.get(url, headers=headers, timeout=15)
         if response.status_code == 200:
             data = response.json().get('response', [])
             if data:
-                fixture_data = data[0]
-                status = fixture_data.get('fixture', {}).get('status', {}).get('short', 'NS')
-                if status == 'FT':
-                    placar_casa = fixture_data.get('goals', {}).get('home', -1)
-                    placar_fora = fixture_data.get('goals', {}).get('away', -1)
-                    return "encerrado", placar_casa, placar_fora
-                else:
-                    return "em_andamento", None, None
+                return _interpretar_resultado_fixture(data[0])
     except requests.exceptions.RequestException as e:
         print(f"  -> ERRO de conexão ao verificar resultado para ID {id_partida}: {e}")
     return "erro", None, None
 
+def verificar_resultados_api_football(api_key, ids_partidas):
+    """
+    Versão em lote de verificar_resultado_api_football: usa buscar_resultados_por_ids (20 jogos por chamada).
+    Retorna {str(id_partida): (status, placar_casa, placar_fora)}; jogos que não vieram na resposta ficam como "erro".
+    """
+    ids_unicos = list(dict.fromkeys(ids_partidas))
+    resultados = {str(id_partida): ("erro", None, None) for id_partida in ids_unicos}
+    for fixture_data in buscar_resultados_por_ids(api_key, ids_unicos):
+        id_partida = fixture_data.get('fixture', {}).get('id')
+        if id_partida is not None:
+            resultados[str(id_partida)] = _interpretar_resultado_fixture(fixture_data)
+    return resultados
+
 def buscar_tabela_rundown(api_key, league_id):
     cache_file = f"cache_tabela_liga_{league_id}.json"
     dados_cache = ler_cache(cache_file, VALIDADE_CACHE_TABELA_HORAS)
@@ -185,10 +269,10 @@ def buscar_tabela_rundown(api_key, league_id):
         'x-rapidapi-host': "therundown-therundown-v1-pro.p.rapidapi.com",
         'x-rapidapi-key': api_key
     }
-    url = f"https://therundown-therundown-v1-pro.p.rapidapi.com/sports/{SPORT_ID}/leagues/{league_id}/standings"
+    url = f"{URL_THE_RUNDOWN}/sports/{SPORT_ID}/leagues/{league_id}/standings"
     
     try:
-        response = requests.get(url, headers=headers, params={'format': 'json'}, timeout=20)
+        response = cliente_http.get(url, headers=headers, params={'format': 'json'}, timeout=20)
         if response.status_code == 200:
             data = response.json()
             if data and data.get('standings') and data['standings'][0].get('teams'):
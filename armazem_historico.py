@@ -0,0 +1,377 @@
+# armazem_historico.py (Armazém Colunar do Histórico de Partidas)
+
+import csv
+import importlib.util
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (os jobs agendados rodam em Linux).
+    fcntl = None
+
+from importacao_tardia import importar_tardio
+
+pd = importar_tardio('pandas')
+pa = importar_tardio('pyarrow')
+pq = importar_tardio('pyarrow.parquet')
+ds = importar_tardio('pyarrow.dataset')
+
+# O CSV continua sendo a fonte da verdade (é ele que vai para o git); o armazém é uma cópia colunar
+# dele, particionada por temporada, que é refeita sozinha quando o CSV muda por fora.
+ARMAZEM_DISPONIVEL = importlib.util.find_spec('pyarrow') is not None
+SUFIXO_DIRETORIO_ARMAZEM = '_colunar'
+ARQUIVO_ORIGEM = '_origem.json'
+VERSAO_ARMAZEM = 1
+# Diretórios por temporada; dentro de cada arquivo as linhas ficam ordenadas por liga, e as estatísticas do
+# Parquet deixam o filtro de liga pular o resto. (Um diretório por liga+temporada gerava ~160 arquivos minúsculos
+# só no histórico principal e a leitura ficava 10x mais lenta que com ~15 arquivos.)
+COLUNAS_PARTICAO = ['Temporada']
+# Cada anexação grava novas partes; passando disso, o armazém é regravado inteiro a partir do CSV.
+LIMITE_PARTES_ANEXADAS = 50
+# Temporadas europeias começam em julho; a partição usa o ano de início (jogos de jan-jun vão para o ano anterior).
+MES_INICIO_TEMPORADA = 7
+COLUNAS_TEXTO = ['League', 'HomeTeam', 'AwayTeam', 'FTR']
+COLUNAS_CONTAGEM = ['FTHG', 'FTAG', 'HC', 'AC', 'HS', 'AS', 'HST', 'AST', 'HY', 'AY', 'HR', 'AR']
+# Posição da linha no CSV: o carregador devolve as linhas na ordem original do arquivo.
+COLUNA_ORDEM = '_ordem'
+FORMATOS_DATA = ['%d/%m/%Y', '%Y-%m-%d', '%d/%m/%y']
+# Formato das datas gravadas nos CSVs (o mesmo que o limpar_historico espera com dayfirst=True).
+FORMATO_DATA_CSV = '%d/%m/%Y'
+
+def diretorio_armazem(arquivo_csv):
+    return os.path.splitext(arquivo_csv)[0] + SUFIXO_DIRETORIO_ARMAZEM
+
+def _assinatura_csv(arquivo_csv):
+    info = os.stat(arquivo_csv)
+    return {'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+def _ler_origem(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_ORIGEM), 'r', encoding='utf-8') as f:
+            origem = json.load(f)
+        return origem if origem.get('versao') == VERSAO_ARMAZEM else None
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _salvar_origem(diretorio, arquivo_csv, proxima_ordem, colunas, partes_anexadas=0):
+    origem = {
+        'versao': VERSAO_ARMAZEM, 'csv': _assinatura_csv(arquivo_csv), 'proxima_ordem': proxima_ordem,
+        'colunas': list(colunas), 'partes_anexadas': partes_anexadas
+    }
+    with open(os.path.join(diretorio, ARQUIVO_ORIGEM), 'w', encoding='utf-8') as f:
+        json.dump(origem, f)
+
+def converter_datas(serie):
+    """Datas em qualquer um dos FORMATOS_DATA (o histórico mistura dd/mm/aaaa e ISO) para datetime64."""
+    texto = serie.astype('string').str.strip()
+    datas = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    for formato in FORMATOS_DATA:
+        faltantes = datas.isna() & texto.notna()
+        if not faltantes.any():
+            break
+        datas[faltantes] = pd.to_datetime(texto[faltantes], format=formato, errors='coerce')
+    return datas
+
+def normalizar_historico(df, primeira_ordem=0):
+    """Tipa as colunas do histórico (datas ISO, contagens inteiras, textos) e acrescenta temporada e ordem."""
+    df = df.copy()
+    for coluna in df.columns:
+        if coluna in COLUNAS_TEXTO:
+            df[coluna] = df[coluna].astype('string')
+        elif coluna in COLUNAS_CONTAGEM:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').round().astype('Int16')
+        elif coluna != 'Date':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float64')
+    df['Date'] = converter_datas(df['Date'])
+    df['Temporada'] = (df['Date'].dt.year - (df['Date'].dt.month < MES_INICIO_TEMPORADA)).astype('Int16')
+    df[COLUNA_ORDEM] = pd.RangeIndex(primeira_ordem, primeira_ordem + len(df), dtype='int64')
+    return df
+
+def compactar_historico(df):
+    """
+    Representação compacta do histórico em memória: times/liga/resultado como category, contagens no menor
+    inteiro que comporta os valores (Int8 quase sempre), odds e demais números em float32 com NaN no lugar
+    dos zeros de preenchimento e datas em datetime64. Altera e devolve `df`.
+    """
+    for coluna in df.columns:
+        if coluna in COLUNAS_TEXTO:
+            df[coluna] = df[coluna].astype('category')
+        elif coluna in COLUNAS_CONTAGEM:
+            valores = pd.to_numeric(df[coluna], errors='coerce').round()
+            maximo = valores.abs().max()
+            df[coluna] = valores.astype('Int8' if pd.isna(maximo) or maximo <= 127 else 'Int16')
+        elif coluna == 'Date':
+            if not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+                df[coluna] = converter_datas(df[coluna])
+        elif coluna == 'Temporada':
+            df[coluna] = df[coluna].astype('Int16')
+        elif coluna != COLUNA_ORDEM:
+            valores = pd.to_numeric(df[coluna], errors='coerce')
+            # Odd 0 não existe: é o fillna(0) de versões antigas do corretor marcando odd ausente.
+            df[coluna] = valores.where(valores > 0).astype('float32')
+    return df
+
+def _gravar_partes(df, diretorio):
+    ordem = [coluna for coluna in ['League', COLUNA_ORDEM] if coluna in df.columns]
+    tabela = pa.Table.from_pandas(df.sort_values(ordem, kind='stable'), preserve_index=False)
+    pq.write_to_dataset(
+        tabela, diretorio, partition_cols=COLUNAS_PARTICAO,
+        basename_template=f"parte-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}-{{i}}.parquet"
+    )
+
+def salvar_armazem(df, arquivo_csv):
+    """
+    Regrava o armazém colunar de `arquivo_csv` a partir de `df` (o conteúdo que acabou de ser salvo no CSV).
+    Chamado por quem reescreve o CSV inteiro (corretor da manutenção, geradores de histórico).
+    """
+    if not ARMAZEM_DISPONIVEL:
+        return False
+    inicio = time.perf_counter()
+    diretorio = diretorio_armazem(arquivo_csv)
+    temporario = f"{diretorio}.tmp-{uuid.uuid4().hex[:8]}"
+    try:
+        normalizado = normalizar_historico(df)
+        _gravar_partes(normalizado, temporario)
+        _salvar_origem(temporario, arquivo_csv, len(df), normalizado.columns)
+        if os.path.isdir(diretorio):
+            shutil.rmtree(diretorio)
+        os.replace(temporario, diretorio)
+    except Exception as e:
+        shutil.rmtree(temporario, ignore_errors=True)
+        print(f"  -> ⚠️ AVISO: Não foi possível gravar o armazém colunar de '{arquivo_csv}': {e}")
+        return False
+    print(f"  -> 🗄️ Armazém colunar '{diretorio}' gravado com {len(df)} jogos em {time.perf_counter() - inicio:.2f}s.")
+    return True
+
+def converter_csv(arquivo_csv):
+    """Converte (ou reconverte) o CSV inteiro para o armazém colunar."""
+    try:
+        df = pd.read_csv(arquivo_csv, low_memory=False)
+    except UnicodeDecodeError:
+        df = pd.read_csv(arquivo_csv, encoding='latin1', low_memory=False)
+    return salvar_armazem(df, arquivo_csv)
+
+def armazem_atualizado(arquivo_csv):
+    origem = _ler_origem(diretorio_armazem(arquivo_csv))
+    return origem is not None and os.path.exists(arquivo_csv) and origem['csv'] == _assinatura_csv(arquivo_csv)
+
+def _particionamento():
+    # Tipo explícito: inferida do nome do diretório, a temporada viria como dicionário e não como Int16.
+    return ds.partitioning(pa.schema([('Temporada', pa.int16())]), flavor='hive')
+
+def _filtro(ligas, temporadas):
+    condicoes = []
+    if ligas is not None:
+        condicoes.append(('League', 'in', list(ligas)))
+    if temporadas is not None:
+        condicoes.append(('Temporada', 'in', [int(temporada) for temporada in temporadas]))
+    return condicoes or None
+
+def _ler_csv_filtrado(arquivo_csv, colunas, ligas, temporadas):
+    """Caminho sem pyarrow: lê o CSV (só as colunas pedidas) e aplica os mesmos filtros em memória."""
+    necessarias = None if colunas is None else list(dict.fromkeys(list(colunas) + ['Date'] + (['League'] if ligas is not None else [])))
+    df = pd.read_csv(arquivo_csv, usecols=lambda coluna: necessarias is None or coluna in necessarias, low_memory=False)
+    df = normalizar_historico(df)
+    if ligas is not None:
+        df = df[df['League'].isin(list(ligas))]
+    if temporadas is not None:
+        df = df[df['Temporada'].isin([int(temporada) for temporada in temporadas])]
+    return df
+
+def carregar_historico(arquivo_csv, colunas=None, ligas=None, temporadas=None):
+    """
+    Histórico tipado de `arquivo_csv`, lido do armazém colunar: só as `colunas` pedidas e só as partições
+    das `ligas`/`temporadas` informadas, com os arquivos mapeados em memória. Se o armazém não existir ou o
+    CSV tiver mudado desde a última gravação, ele é refeito antes. Sem pyarrow, lê o próprio CSV.
+    As linhas vêm na ordem do CSV, já na representação de compactar_historico.
+    """
+    inicio = time.perf_counter()
+    if not ARMAZEM_DISPONIVEL:
+        df = _ler_csv_filtrado(arquivo_csv, colunas, ligas, temporadas)
+    else:
+        if not armazem_atualizado(arquivo_csv):
+            print(f"  -> 🗄️ Armazém colunar de '{arquivo_csv}' ausente ou desatualizado. Convertendo o CSV...")
+            converter_csv(arquivo_csv)
+        existentes = _ler_origem(diretorio_armazem(arquivo_csv))['colunas']
+        colunas_lidas = [coluna for coluna in existentes if colunas is None or coluna in colunas or coluna == COLUNA_ORDEM]
+        tabela = pq.read_table(
+            diretorio_armazem(arquivo_csv), columns=colunas_lidas, filters=_filtro(ligas, temporadas),
+            memory_map=True, partitioning=_particionamento()
+        )
+        df = tabela.to_pandas()[colunas_lidas]
+    df = df.sort_values(COLUNA_ORDEM, kind='stable').reset_index(drop=True)
+    df = df.drop(columns=[COLUNA_ORDEM] + [coluna for coluna in COLUNAS_PARTICAO if colunas is not None and coluna not in colunas], errors='ignore')
+    df = compactar_historico(df)
+    print(f"  -> 🗄️ Histórico '{arquivo_csv}': {len(df)} jogos carregados em {(time.perf_counter() - inicio) * 1000:.0f} ms.")
+    return df
+
+def _formato_data_do_csv(arquivo_csv):
+    """Formato de data já usado no CSV (para as linhas anexadas não misturarem formatos)."""
+    with open(arquivo_csv, 'r', encoding='utf-8', newline='') as f:
+        leitor = csv.DictReader(f)
+        for linha in leitor:
+            data = (linha.get('Date') or '').strip()
+            if data:
+                return '%Y-%m-%d' if '-' in data else FORMATO_DATA_CSV
+    return FORMATO_DATA_CSV
+
+# --- ÍNDICE DE CHAVES DAS PARTIDAS ---
+# Chaves (data + mandante + visitante) de todas as linhas do CSV, para quem anexa pular em O(1) jogos que já
+# estão no histórico. A deduplicação é só pela chave natural: o CSV não guarda o id da partida, e o índice
+# precisa poder ser refeito a partir dele. Se o arquivo sumir ou o CSV mudar por fora, é refeito.
+SUFIXO_ARQUIVO_INDICE = '_indice_chaves.json'
+SUFIXO_ARQUIVO_TRAVA = '.lock'
+VERSAO_INDICE = 2
+# Índices já carregados neste processo (modo serviço): {csv: (assinatura, chaves)}.
+_indices_em_memoria = {}
+
+def arquivo_indice(arquivo_csv):
+    return os.path.splitext(arquivo_csv)[0] + SUFIXO_ARQUIVO_INDICE
+
+def _data_python(valor):
+    """datetime a partir de datetime/date/Timestamp ou de texto em algum dos FORMATOS_DATA (None se não der)."""
+    if hasattr(valor, 'strftime'):
+        return valor
+    texto = str(valor or '').strip()
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+def chave_partida(data, time_casa, time_fora):
+    """Chave de um jogo: data ISO + nomes dos times (sem espaços nas pontas e sem diferença de maiúsculas)."""
+    data_convertida = _data_python(data)
+    texto_data = data_convertida.strftime('%Y-%m-%d') if data_convertida is not None else str(data or '').strip()
+    return f"{texto_data}|{str(time_casa).strip().casefold()}|{str(time_fora).strip().casefold()}"
+
+def _chave_da_linha(linha):
+    return chave_partida(linha.get('Date'), linha.get('HomeTeam', ''), linha.get('AwayTeam', ''))
+
+@contextmanager
+def _trava_csv(arquivo_csv):
+    """Trava exclusiva em '<csv>.lock' para dois jobs não anexarem ao mesmo CSV ao mesmo tempo."""
+    if fcntl is None:
+        yield
+        return
+    with open(arquivo_csv + SUFIXO_ARQUIVO_TRAVA, 'a') as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(trava, fcntl.LOCK_UN)
+
+def _salvar_indice(arquivo_csv, chaves):
+    indice = {'versao': VERSAO_INDICE, 'csv': _assinatura_csv(arquivo_csv), 'chaves': sorted(chaves)}
+    arquivo_temporario = f"{arquivo_indice(arquivo_csv)}.tmp"
+    try:
+        with open(arquivo_temporario, 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False)
+        os.replace(arquivo_temporario, arquivo_indice(arquivo_csv))
+    except OSError as e:
+        print(f"  -> ⚠️ AVISO: Não foi possível salvar o índice de chaves de '{arquivo_csv}': {e}")
+    _indices_em_memoria[arquivo_csv] = (indice['csv'], chaves)
+
+def reconstruir_indice(arquivo_csv):
+    """Refaz o índice lendo o CSV inteiro (sem pandas) e grava o arquivo do índice."""
+    chaves = set()
+    if os.path.exists(arquivo_csv):
+        with open(arquivo_csv, 'r', encoding='utf-8', newline='') as f:
+            for linha in csv.DictReader(f):
+                chaves.add(_chave_da_linha(linha))
+        _salvar_indice(arquivo_csv, chaves)
+    print(f"  -> 🔑 Índice de chaves de '{arquivo_csv}' reconstruído com {len(chaves)} chaves.")
+    return chaves
+
+def carregar_indice(arquivo_csv):
+    """Conjunto de chaves das partidas do CSV: da memória, do arquivo do índice ou reconstruído do CSV."""
+    if not os.path.exists(arquivo_csv):
+        return set()
+    assinatura = _assinatura_csv(arquivo_csv)
+    em_memoria = _indices_em_memoria.get(arquivo_csv)
+    if em_memoria and em_memoria[0] == assinatura:
+        return em_memoria[1]
+    try:
+        with open(arquivo_indice(arquivo_csv), 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+        if indice.get('versao') == VERSAO_INDICE and indice.get('csv') == assinatura:
+            chaves = set(indice['chaves'])
+            _indices_em_memoria[arquivo_csv] = (assinatura, chaves)
+            return chaves
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return reconstruir_indice(arquivo_csv)
+
+def anexar_partidas(arquivo_csv, linhas):
+    """
+    Acrescenta ao CSV as `linhas` (dicts com as colunas do histórico; 'Date' como datetime/date ou texto) cujos
+    jogos ainda não estão nele, consultando o índice de chaves. Respeita o cabeçalho e o formato de data existentes
+    e acrescenta as mesmas linhas ao armazém colunar como novas partes (sem regravar o resto). Tudo roda sob a
+    trava do CSV. Retorna quantos jogos foram gravados (os repetidos são pulados).
+    """
+    if not linhas:
+        return 0
+    with _trava_csv(arquivo_csv):
+        return _anexar_partidas(arquivo_csv, linhas)
+
+def _anexar_partidas(arquivo_csv, linhas):
+    if os.path.exists(arquivo_csv) and os.path.getsize(arquivo_csv) > 0:
+        with open(arquivo_csv, 'r', encoding='utf-8', newline='') as f:
+            cabecalho = next(csv.reader(f))
+        formato_data = _formato_data_do_csv(arquivo_csv)
+    else:
+        cabecalho = list(dict.fromkeys(chave for linha in linhas for chave in linha))
+        formato_data = FORMATO_DATA_CSV
+    armazem_em_dia = ARMAZEM_DISPONIVEL and armazem_atualizado(arquivo_csv)
+    indice = carregar_indice(arquivo_csv)
+
+    linhas_csv, chaves_novas = [], set()
+    for linha in linhas:
+        chave = _chave_da_linha(linha)
+        if chave in indice or chave in chaves_novas:
+            continue
+        chaves_novas.add(chave)
+        data = _data_python(linha.get('Date'))
+        linhas_csv.append({**linha, 'Date': data.strftime(formato_data) if data is not None else linha.get('Date')})
+    if len(linhas_csv) < len(linhas):
+        print(f"  -> 🔑 {len(linhas) - len(linhas_csv)} jogos já estavam em '{arquivo_csv}' e foram pulados.")
+    if not linhas_csv:
+        return 0
+
+    with open(arquivo_csv, 'a', newline='', encoding='utf-8') as f:
+        escritor = csv.DictWriter(f, fieldnames=cabecalho, extrasaction='ignore')
+        if f.tell() == 0:
+            escritor.writeheader()
+        escritor.writerows(linhas_csv)
+    _salvar_indice(arquivo_csv, indice | chaves_novas)
+
+    if armazem_em_dia:
+        diretorio = diretorio_armazem(arquivo_csv)
+        origem = _ler_origem(diretorio)
+        if origem.get('partes_anexadas', 0) >= LIMITE_PARTES_ANEXADAS:
+            converter_csv(arquivo_csv)
+            return len(linhas_csv)
+        try:
+            novas = normalizar_historico(pd.DataFrame(linhas_csv).reindex(columns=cabecalho), primeira_ordem=origem['proxima_ordem'])
+            _gravar_partes(novas, diretorio)
+            _salvar_origem(
+                diretorio, arquivo_csv, origem['proxima_ordem'] + len(linhas_csv), origem['colunas'],
+                origem.get('partes_anexadas', 0) + novas['Temporada'].nunique(dropna=False)
+            )
+        except Exception as e:
+            # O armazém fica com a assinatura antiga e será reconvertido do CSV na próxima leitura.
+            print(f"  -> ⚠️ AVISO: Não foi possível anexar ao armazém colunar: {e}")
+    return len(linhas_csv)
+
+if __name__ == "__main__":
+    # Uso: python armazem_historico.py [arquivo.csv ...]   (converte os históricos para o armazém colunar)
+    import sys
+    for arquivo in sys.argv[1:] or ['dados_historicos_corrigido.csv']:
+        converter_csv(arquivo)
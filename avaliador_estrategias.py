@@ -0,0 +1,233 @@
+# avaliador_estrategias.py (Avaliação em Lote das Estratégias)
+
+import time
+from collections import Counter
+
+from importacao_tardia import importar_tardio
+
+# Carregados só no primeiro uso: importar este módulo (via estrategias/main) não paga o custo do pandas.
+np = importar_tardio('numpy')
+pd = importar_tardio('pandas')
+
+# --- CÓDIGOS DE MOTIVO ---
+APROVADO = 'APROVADO'
+SEM_CORRESPONDENCIA = 'SEM_CORRESPONDENCIA'
+SEM_HISTORICO = 'SEM_HISTORICO'
+SEM_ODD = 'SEM_ODD'
+FORMA_INSUFICIENTE = 'FORMA_INSUFICIENTE'
+CRITERIOS_NAO_ATENDIDOS = 'CRITERIOS_NAO_ATENDIDOS'
+
+JOGOS_MINIMOS_FORMA = 5
+COLUNAS_PERC_CASA = ['perc_vitorias_casa', 'perc_empates_casa', 'perc_derrotas_casa']
+COLUNAS_PERC_FORA = ['perc_vitorias_fora', 'perc_empates_fora', 'perc_derrotas_fora']
+COLUNAS_FEATURES = [
+    'tem_nome_casa', 'tem_nome_fora', 'tem_stats_casa', 'tem_stats_fora',
+    'jogos_forma_casa', 'vitorias_forma_casa', 'derrotas_forma_casa',
+    'jogos_forma_fora', 'vitorias_forma_fora', 'derrotas_forma_fora',
+    'odd_casa', 'odd_empate', 'odd_fora',
+] + COLUNAS_PERC_CASA + COLUNAS_PERC_FORA
+
+def _melhor_odd(jogo, mercado, tabela_odds=None):
+    """
+    Maior preço do resultado `mercado` (Home, Away, Draw). Com a tabela de odds da execução e o evento
+    pareado (`id_evento_odds`) a consulta é direta; sem ela, percorre os bookmakers do próprio jogo.
+    """
+    if tabela_odds is not None and jogo.get('id_evento_odds') is not None:
+        preco = tabela_odds.preco(jogo['id_evento_odds'], mercado)
+        return preco if preco is not None else np.nan
+    precos = [
+        outcome.get('price')
+        for bookmaker in jogo.get('bookmakers', []) if isinstance(bookmaker, dict)
+        for market in bookmaker.get('markets', []) if market.get('key') == 'h2h'
+        for outcome in market.get('outcomes', []) if outcome.get('name') == mercado and outcome.get('price')
+    ]
+    return max(precos) if precos else np.nan
+
+def construir_tabela_features(jogos, contexto):
+    """
+    Uma linha por jogo com tudo o que as estratégias consultam: nomes traduzidos, percentuais do mandante
+    em casa e do visitante fora, contagens da forma recente e melhores odds. Cada dicionário do contexto
+    é consultado uma única vez por jogo, em vez de uma vez por estratégia.
+    """
+    colunas = {coluna: [] for coluna in COLUNAS_FEATURES}
+    for jogo in jogos:
+        for coluna, valor in zip(COLUNAS_FEATURES, _valores_features(jogo, contexto)):
+            colunas[coluna].append(valor)
+    return pd.DataFrame(colunas)
+
+def _valores_features(jogo, contexto):
+    """Valores de COLUNAS_FEATURES (na mesma ordem) para um jogo."""
+    mapa_de_nomes = contexto.get('mapa_de_nomes', {})
+    stats_individuais = contexto.get('stats_individuais', {})
+    forma_recente = contexto.get('forma_recente', {})
+    tabela_odds = contexto.get('tabela_odds')
+    nome_casa, nome_fora = mapa_de_nomes.get(jogo.get('home_team')), mapa_de_nomes.get(jogo.get('away_team'))
+    stats_casa, stats_fora = stats_individuais.get(nome_casa), stats_individuais.get(nome_fora)
+    forma_casa, forma_fora = forma_recente.get(nome_casa, []), forma_recente.get(nome_fora, [])
+    return (
+        bool(nome_casa), bool(nome_fora), stats_casa is not None, stats_fora is not None,
+        len(forma_casa), forma_casa.count('V'), forma_casa.count('D'),
+        len(forma_fora), forma_fora.count('V'), forma_fora.count('D'),
+        _melhor_odd(jogo, 'Home', tabela_odds), _melhor_odd(jogo, 'Draw', tabela_odds), _melhor_odd(jogo, 'Away', tabela_odds),
+        *[(stats_casa or {}).get(coluna, 0) for coluna in COLUNAS_PERC_CASA],
+        *[(stats_fora or {}).get(coluna, 0) for coluna in COLUNAS_PERC_FORA],
+    )
+
+# --- LIMIARES DAS ESTRATÉGIAS ---
+# Valores em uso no bot; backtest.py e varredura_parametros.py podem avaliar outros sem alterar o código.
+PARAMETROS_ESTRATEGIAS = {
+    'FAVORITO_FORA_MIN_PERC_VITORIAS_FORA': 70, 'FAVORITO_FORA_MIN_PERC_DERROTAS_CASA': 70,
+    'MANDANTE_AZARAO_MIN_ODD': 2.0, 'MANDANTE_AZARAO_MIN_PERC_VITORIAS_CASA': 45,
+    'VISITANTE_AZARAO_MIN_ODD': 2.2, 'VISITANTE_AZARAO_MIN_PERC_VITORIAS_FORA': 40,
+    'EMPATE_MIN_PERC_EMPATES_CASA': 30, 'EMPATE_MIN_PERC_EMPATES_FORA': 30,
+    'FORMA_CASA_MIN_VITORIAS_CASA': 3, 'FORMA_CASA_MIN_DERROTAS_FORA': 3,
+    'FORMA_FORA_MIN_DERROTAS_CASA': 3, 'FORMA_FORA_MIN_VITORIAS_FORA': 3,
+}
+
+# --- DEFINIÇÃO VETORIZADA DAS ESTRATÉGIAS ---
+# Cada requisito é (código, máscara, mensagem de debug); o primeiro requisito não atendido define o motivo.
+# As máscaras recebem a tabela de features inteira (DataFrame ou {coluna: array}) e devolvem um vetor booleano
+# (uma posição por jogo); o critério recebe também os limiares, lidos dos nomes listados em 'parametros'.
+def _nomes_casa_e_fora(f): return f['tem_nome_casa'] & f['tem_nome_fora']
+def _stats_casa_e_fora(f): return f['tem_stats_casa'] & f['tem_stats_fora']
+def _forma_completa(f): return (f['jogos_forma_casa'] >= JOGOS_MINIMOS_FORMA) & (f['jogos_forma_fora'] >= JOGOS_MINIMOS_FORMA)
+
+ESTRATEGIAS = [
+    {
+        'funcao': 'analisar_favorito_forte_fora',
+        'requisitos': [
+            (SEM_CORRESPONDENCIA, _nomes_casa_e_fora, "Time sem correspondência no histórico."),
+            (SEM_HISTORICO, _stats_casa_e_fora, "Time sem estatísticas no histórico."),
+        ],
+        'parametros': ['FAVORITO_FORA_MIN_PERC_VITORIAS_FORA', 'FAVORITO_FORA_MIN_PERC_DERROTAS_CASA'],
+        'criterio': lambda f, p: (f['perc_vitorias_fora'] > p['FAVORITO_FORA_MIN_PERC_VITORIAS_FORA']) & (f['perc_derrotas_casa'] > p['FAVORITO_FORA_MIN_PERC_DERROTAS_CASA']),
+        'reprovado': lambda linha: "Critérios de favoritismo extremo do visitante não atendidos.",
+        'resultado': {'type': 'pre_aprovado', 'nome_estrategia': 'Favorito Forte Fora', 'mercado': 'Visitante para Vencer', 'emoji': '🚀'},
+    },
+    {
+        'funcao': 'analisar_valor_mandante_azarao',
+        'requisitos': [
+            (SEM_CORRESPONDENCIA, lambda f: f['tem_nome_casa'], "Time da casa sem correspondência no histórico."),
+            (SEM_HISTORICO, lambda f: f['tem_stats_casa'], "Time da casa sem estatísticas no histórico."),
+            (SEM_ODD, lambda f: f['odd_casa'] > 0, "Odd do mandante não encontrada."),
+        ],
+        'parametros': ['MANDANTE_AZARAO_MIN_ODD', 'MANDANTE_AZARAO_MIN_PERC_VITORIAS_CASA'],
+        'criterio': lambda f, p: (f['odd_casa'] > p['MANDANTE_AZARAO_MIN_ODD']) & (f['perc_vitorias_casa'] > p['MANDANTE_AZARAO_MIN_PERC_VITORIAS_CASA']),
+        'reprovado': lambda linha: "Critérios de valor para o mandante azarão não atendidos.",
+        'resultado': {'type': 'pre_aprovado', 'nome_estrategia': 'Valor no Mandante Azarão', 'mercado': 'Casa para Vencer', 'emoji': '💎'},
+    },
+    {
+        'funcao': 'analisar_valor_visitante_azarao',
+        'requisitos': [
+            (SEM_CORRESPONDENCIA, lambda f: f['tem_nome_fora'], "Time visitante sem correspondência no histórico."),
+            (SEM_HISTORICO, lambda f: f['tem_stats_fora'], "Time visitante sem estatísticas no histórico."),
+            (SEM_ODD, lambda f: f['odd_fora'] > 0, "Odd do visitante não encontrada."),
+        ],
+        'parametros': ['VISITANTE_AZARAO_MIN_ODD', 'VISITANTE_AZARAO_MIN_PERC_VITORIAS_FORA'],
+        'criterio': lambda f, p: (f['odd_fora'] > p['VISITANTE_AZARAO_MIN_ODD']) & (f['perc_vitorias_fora'] > p['VISITANTE_AZARAO_MIN_PERC_VITORIAS_FORA']),
+        'reprovado': lambda linha: "Critérios de valor para o visitante azarão não atendidos.",
+        'resultado': {'type': 'pre_aprovado', 'nome_estrategia': 'Valor no Visitante Azarão', 'mercado': 'Visitante para Vencer', 'emoji': '💎'},
+    },
+    {
+        'funcao': 'analisar_empate_valorizado',
+        'requisitos': [
+            (SEM_CORRESPONDENCIA, _nomes_casa_e_fora, "Time sem correspondência no histórico."),
+            (SEM_HISTORICO, _stats_casa_e_fora, "Time sem estatísticas no histórico."),
+        ],
+        'parametros': ['EMPATE_MIN_PERC_EMPATES_CASA', 'EMPATE_MIN_PERC_EMPATES_FORA'],
+        'criterio': lambda f, p: (f['perc_empates_casa'] > p['EMPATE_MIN_PERC_EMPATES_CASA']) & (f['perc_empates_fora'] > p['EMPATE_MIN_PERC_EMPATES_FORA']),
+        'reprovado': lambda linha: "Critérios para tendência de empate não atendidos.",
+        'resultado': {'type': 'pre_aprovado', 'nome_estrategia': 'Empate Valorizado', 'mercado': 'Empate', 'emoji': '🤝'},
+    },
+    {
+        'funcao': 'analisar_forma_recente_casa',
+        'requisitos': [
+            (SEM_CORRESPONDENCIA, _nomes_casa_e_fora, "Time sem correspondência no histórico."),
+            (FORMA_INSUFICIENTE, _forma_completa, "Times com menos de 5 jogos recentes."),
+        ],
+        'parametros': ['FORMA_CASA_MIN_VITORIAS_CASA', 'FORMA_CASA_MIN_DERROTAS_FORA'],
+        'criterio': lambda f, p: (f['vitorias_forma_casa'] >= p['FORMA_CASA_MIN_VITORIAS_CASA']) & (f['derrotas_forma_fora'] >= p['FORMA_CASA_MIN_DERROTAS_FORA']),
+        'reprovado': lambda linha: f"Reprovado. Vitórias Recentes Casa: {linha['vitorias_forma_casa']}, Derrotas Recentes Fora: {linha['derrotas_forma_fora']}",
+        'resultado': {'type': 'pre_aprovado', 'nome_estrategia': 'Forma Recente (Casa Forte)', 'mercado': 'Casa para Vencer', 'emoji': '🔥'},
+    },
+    {
+        'funcao': 'analisar_forma_recente_fora',
+        'requisitos': [
+            (SEM_CORRESPONDENCIA, _nomes_casa_e_fora, "Time sem correspondência no histórico."),
+            (FORMA_INSUFICIENTE, _forma_completa, "Times com menos de 5 jogos recentes."),
+        ],
+        'parametros': ['FORMA_FORA_MIN_DERROTAS_CASA', 'FORMA_FORA_MIN_VITORIAS_FORA'],
+        'criterio': lambda f, p: (f['derrotas_forma_casa'] >= p['FORMA_FORA_MIN_DERROTAS_CASA']) & (f['vitorias_forma_fora'] >= p['FORMA_FORA_MIN_VITORIAS_FORA']),
+        'reprovado': lambda linha: f"Reprovado. Derrotas Recentes Casa: {linha['derrotas_forma_casa']}, Vitórias Recentes Fora: {linha['vitorias_forma_fora']}",
+        'resultado': {'type': 'pre_aprovado', 'nome_estrategia': 'Forma Recente (Visitante Forte)', 'mercado': 'Visitante para Vencer', 'emoji': '🔥'},
+    },
+]
+ESTRATEGIAS_POR_FUNCAO = {estrategia['funcao']: estrategia for estrategia in ESTRATEGIAS}
+
+def mascara_aprovacao(estrategia, features, parametros=None):
+    """Vetor booleano dos jogos aprovados por `estrategia` (requisitos e critério), sem códigos de motivo."""
+    parametros = {**PARAMETROS_ESTRATEGIAS, **(parametros or {})}
+    aprovado = np.asarray(estrategia['criterio'](features, parametros), dtype=bool)
+    for _, mascara, _ in estrategia['requisitos']:
+        aprovado = aprovado & np.asarray(mascara(features), dtype=bool)
+    return aprovado
+
+def avaliar_tabela(features, estrategias=ESTRATEGIAS, parametros=None):
+    """
+    Avalia as estratégias sobre a tabela de features inteira de uma vez.
+    Retorna um DataFrame (mesmo índice de `features`) com uma coluna por estratégia contendo o código do motivo.
+    `parametros` substitui limiares de PARAMETROS_ESTRATEGIAS.
+    """
+    if features.empty:
+        return pd.DataFrame(columns=[estrategia['funcao'] for estrategia in estrategias], index=features.index)
+    parametros = {**PARAMETROS_ESTRATEGIAS, **(parametros or {})}
+    motivos = {}
+    for estrategia in estrategias:
+        condicoes = [~np.asarray(mascara(features), dtype=bool) for _, mascara, _ in estrategia['requisitos']]
+        condicoes.append(np.asarray(estrategia['criterio'](features, parametros), dtype=bool))
+        codigos = [codigo for codigo, _, _ in estrategia['requisitos']] + [APROVADO]
+        motivos[estrategia['funcao']] = np.select(condicoes, codigos, default=CRITERIOS_NAO_ATENDIDOS)
+    return pd.DataFrame(motivos, index=features.index)
+
+def descrever_motivo(nome_funcao, codigo, linha):
+    """Texto de debug de um código de motivo (só é montado quando alguém vai exibi-lo)."""
+    estrategia = ESTRATEGIAS_POR_FUNCAO[nome_funcao]
+    if codigo == APROVADO:
+        return f"Pré-aprovado ({estrategia['resultado']['nome_estrategia']})."
+    if codigo == CRITERIOS_NAO_ATENDIDOS:
+        return estrategia['reprovado'](linha)
+    return next(mensagem for codigo_requisito, _, mensagem in estrategia['requisitos'] if codigo_requisito == codigo)
+
+def avaliar_jogos_em_lote(jogos, contexto, funcoes=None):
+    """
+    Triagem offline de todos os jogos do dia com as estratégias em `funcoes` (nomes das funções; todas por padrão).
+    Retorna (pre_aprovados, motivos): `pre_aprovados` é [(jogo, [(nome_funcao, resultado)])] e `motivos` é o
+    DataFrame de códigos devolvido por avaliar_tabela, na ordem de `jogos`.
+    """
+    inicio = time.perf_counter()
+    estrategias = [ESTRATEGIAS_POR_FUNCAO[nome] for nome in funcoes] if funcoes else ESTRATEGIAS
+    features = construir_tabela_features(jogos, contexto)
+    motivos = avaliar_tabela(features, estrategias)
+    pre_aprovados = []
+    aprovados = motivos.to_numpy() == APROVADO
+    for posicao in np.flatnonzero(aprovados.any(axis=1)):
+        aprovacoes = [(estrategia['funcao'], dict(estrategia['resultado'])) for estrategia, ok in zip(estrategias, aprovados[posicao]) if ok]
+        pre_aprovados.append((jogos[posicao], aprovacoes))
+    contagem = Counter(motivos.to_numpy().ravel())
+    resumo = ', '.join(f"{codigo}: {quantidade}" for codigo, quantidade in contagem.most_common())
+    print(f"  -> 🧮 {len(jogos)} jogos x {len(estrategias)} estratégias avaliados em {(time.perf_counter() - inicio) * 1000:.1f} ms ({resumo or 'nenhum jogo'}).")
+    return pre_aprovados, motivos
+
+def avaliar_jogo(nome_funcao, jogo, contexto, debug=False):
+    """
+    Interface antiga, jogo a jogo: dicionário de pré-aprovação, texto do motivo (debug) ou None.
+    As mesmas máscaras são aplicadas a valores escalares, sem montar um DataFrame por chamada.
+    """
+    estrategia = ESTRATEGIAS_POR_FUNCAO[nome_funcao]
+    linha = dict(zip(COLUNAS_FEATURES, _valores_features(jogo, contexto)))
+    codigo = next((codigo for codigo, mascara, _ in estrategia['requisitos'] if not mascara(linha)), None)
+    if codigo is None:
+        codigo = APROVADO if estrategia['criterio'](linha, PARAMETROS_ESTRATEGIAS) else CRITERIOS_NAO_ATENDIDOS
+    if codigo == APROVADO:
+        return dict(estrategia['resultado'])
+    return descrever_motivo(nome_funcao, codigo, linha) if debug else None
@@ -0,0 +1,145 @@
+# backtest.py (Backtest Vetorizado das Estratégias)
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from armazem_historico import carregar_historico
+from avaliador_estrategias import APROVADO, COLUNAS_FEATURES, ESTRATEGIAS, JOGOS_MINIMOS_FORMA, avaliar_tabela
+from estatisticas_historicas import limpar_historico
+
+ARQUIVO_HISTORICO_PADRAO = 'dados_historicos_corrigido.csv'
+STAKE_UNIDADES = 1.0
+# Odds de fechamento da Pinnacle que vêm no histórico, por mercado das estratégias.
+COLUNA_ODD_POR_MERCADO = {'Casa para Vencer': 'PSH', 'Empate': 'PSD', 'Visitante para Vencer': 'PSA'}
+COLUNAS_ODDS = ['PSH', 'PSD', 'PSA']
+# No histórico compacto as odds vêm em float32; voltam a float64 arredondadas (as cotações têm no máximo
+# 3 casas) para o lucro não herdar o erro de representação (1.85 -> 1.8500000238...).
+CASAS_DECIMAIS_ODDS = 3
+
+def _preparar_historico(df):
+    """Limpa como o cálculo de estatísticas, remove linhas sem times e ordena por data (ordem do arquivo no empate)."""
+    df = limpar_historico(df.copy())
+    df = df[(df['HomeTeam'].astype(str) != '0') & (df['AwayTeam'].astype(str) != '0')]
+    for coluna in COLUNAS_ODDS:
+        df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float64').round(CASAS_DECIMAIS_ODDS) if coluna in df.columns else np.nan
+        df[coluna] = df[coluna].where(df[coluna] > 1)
+    if 'League' not in df.columns:
+        df['League'] = 'Desconhecida'
+    return df.sort_values('Date', kind='stable').reset_index(drop=True)
+
+def construir_features_historicas(df):
+    """
+    Tabela de features (as mesmas colunas de avaliador_estrategias.construir_tabela_features) para cada
+    jogo do histórico, usando apenas os jogos anteriores a ele: nada do próprio jogo ou do futuro entra na conta.
+    """
+    saldo = np.sign(df['FTHG'].to_numpy() - df['FTAG'].to_numpy())
+    features = pd.DataFrame(index=df.index)
+
+    # Percentuais do mandante em casa e do visitante fora, acumulados até o jogo anterior.
+    for local, coluna_time, vitoria, derrota in [('casa', 'HomeTeam', saldo > 0, saldo < 0), ('fora', 'AwayTeam', saldo < 0, saldo > 0)]:
+        resultados = pd.DataFrame({'vitorias': vitoria, 'empates': saldo == 0, 'derrotas': derrota}, index=df.index).astype(int)
+        anteriores = resultados.groupby(df[coluna_time]).cumsum() - resultados
+        jogos = df.groupby(coluna_time).cumcount().replace(0, np.nan)
+        for resultado in ['vitorias', 'empates', 'derrotas']:
+            features[f'perc_{resultado}_{local}'] = anteriores[resultado] / jogos * 100
+
+    # Forma recente: uma linha por participação (mandante antes do visitante), como em estatisticas_historicas.
+    n = len(df)
+    participacoes = pd.DataFrame({
+        'time': np.concatenate([df['HomeTeam'].to_numpy(), df['AwayTeam'].to_numpy()]),
+        'V': np.concatenate([saldo > 0, saldo < 0]).astype(int),
+        'D': np.concatenate([saldo < 0, saldo > 0]).astype(int),
+        'ordem': np.concatenate([2 * np.arange(n), 2 * np.arange(n) + 1])
+    }).sort_values('ordem', kind='stable')
+    por_time = participacoes.groupby('time', sort=False)
+    participacoes['jogos'] = por_time.cumcount().clip(upper=JOGOS_MINIMOS_FORMA)
+    for coluna in ['V', 'D']:
+        antes = por_time[coluna].cumsum() - participacoes[coluna]
+        participacoes[coluna] = antes - antes.groupby(participacoes['time']).shift(JOGOS_MINIMOS_FORMA).fillna(0).astype(int)
+    participacoes = participacoes.sort_values('ordem')
+    casa, fora = participacoes.iloc[0::2], participacoes.iloc[1::2]
+    for local, lado in [('casa', casa), ('fora', fora)]:
+        features[f'jogos_forma_{local}'] = lado['jogos'].to_numpy()
+        features[f'vitorias_forma_{local}'] = lado['V'].to_numpy()
+        features[f'derrotas_forma_{local}'] = lado['D'].to_numpy()
+
+    # No histórico os nomes já são os "corrigidos"; estatística existe se o time já jogou antes.
+    ja_jogou = participacoes['jogos'].to_numpy() > 0
+    features['tem_nome_casa'] = features['tem_nome_fora'] = True
+    features['tem_stats_casa'], features['tem_stats_fora'] = ja_jogou[0::2], ja_jogou[1::2]
+    features['odd_casa'], features['odd_empate'], features['odd_fora'] = df['PSH'], df['PSD'], df['PSA']
+    return features[COLUNAS_FEATURES]
+
+def _resumir(apostas):
+    agrupado = apostas.groupby(['estrategia', 'liga'], sort=True)
+    relatorio = agrupado.agg(
+        apostas=('lucro', 'size'), acertos=('acerto', 'sum'), lucro=('lucro', 'sum'),
+        odd_media=('odd', 'mean'), drawdown_maximo=('drawdown', 'max'), capital_necessario=('exposicao', 'max')
+    )
+    relatorio['taxa_acerto'] = relatorio['acertos'] / relatorio['apostas'] * 100
+    # yield: lucro sobre o total apostado; roi: lucro sobre o capital que foi preciso ter para fazer todas as apostas.
+    relatorio['yield'] = relatorio['lucro'] / (relatorio['apostas'] * STAKE_UNIDADES) * 100
+    relatorio['roi'] = relatorio['lucro'] / relatorio['capital_necessario'] * 100
+    return relatorio
+
+def rodar_backtest(df, estrategias=ESTRATEGIAS, parametros=None):
+    """
+    Reexecuta o histórico em ordem de data e aposta STAKE_UNIDADES nas odds de fechamento da Pinnacle
+    em cada jogo aprovado por cada estratégia (com os limiares de `parametros`, se informados).
+    Retorna (relatorio, apostas): o relatório por estratégia/liga (e um total por estratégia com
+    liga 'TODAS') e a lista de apostas simuladas.
+    """
+    inicio = time.perf_counter()
+    df = _preparar_historico(df)
+    features = construir_features_historicas(df)
+    motivos = avaliar_tabela(features, estrategias, parametros)
+    vitoria_casa, empate = (df['FTHG'] > df['FTAG']).to_numpy(), (df['FTHG'] == df['FTAG']).to_numpy()
+    acerto_por_mercado = {'Casa para Vencer': vitoria_casa, 'Empate': empate, 'Visitante para Vencer': ~vitoria_casa & ~empate}
+
+    blocos, sem_odd = [], {}
+    for estrategia in estrategias:
+        mercado = estrategia['resultado']['mercado']
+        aprovados = motivos[estrategia['funcao']].to_numpy() == APROVADO
+        odds = df[COLUNA_ODD_POR_MERCADO[mercado]].to_numpy()
+        selecionados = aprovados & ~np.isnan(odds)
+        sem_odd[estrategia['resultado']['nome_estrategia']] = int((aprovados & np.isnan(odds)).sum())
+        acerto = acerto_por_mercado[mercado][selecionados]
+        blocos.append(pd.DataFrame({
+            'estrategia': estrategia['resultado']['nome_estrategia'], 'liga': df['League'].to_numpy()[selecionados],
+            'data': df['Date'].to_numpy()[selecionados], 'jogo': (df['HomeTeam'].astype(str) + ' x ' + df['AwayTeam'].astype(str)).to_numpy()[selecionados],
+            'mercado': mercado, 'odd': odds[selecionados], 'acerto': acerto,
+            'lucro': np.where(acerto, (odds[selecionados] - 1) * STAKE_UNIDADES, -STAKE_UNIDADES)
+        }))
+    apostas = pd.concat(blocos, ignore_index=True) if blocos else pd.DataFrame(columns=['estrategia', 'liga', 'data', 'jogo', 'mercado', 'odd', 'acerto', 'lucro'])
+
+    # Drawdown: maior queda do lucro acumulado (em unidades), por estratégia/liga e no total da estratégia.
+    # Exposição: banca necessária para cobrir a stake de cada aposta dado o lucro acumulado até ali.
+    acumulado = apostas.groupby(['estrategia', 'liga'])['lucro'].cumsum()
+    apostas['drawdown'] = acumulado.groupby([apostas['estrategia'], apostas['liga']]).cummax().clip(lower=0) - acumulado
+    apostas['exposicao'] = STAKE_UNIDADES - (acumulado - apostas['lucro'])
+    relatorio = _resumir(apostas)
+    total = apostas.assign(liga='TODAS')
+    acumulado_total = total.groupby('estrategia')['lucro'].cumsum()
+    total['drawdown'] = acumulado_total.groupby(total['estrategia']).cummax().clip(lower=0) - acumulado_total
+    total['exposicao'] = STAKE_UNIDADES - (acumulado_total - total['lucro'])
+    relatorio = pd.concat([relatorio, _resumir(total)]).sort_index()
+
+    print(f"  -> 🧪 Backtest de {len(df)} jogos x {len(estrategias)} estratégias: {len(apostas)} apostas simuladas em {time.perf_counter() - inicio:.2f}s.")
+    for nome, quantidade in sem_odd.items():
+        if quantidade:
+            print(f"     - '{nome}': {quantidade} jogos aprovados sem odd de fechamento foram ignorados.")
+    return relatorio, apostas
+
+def imprimir_relatorio(relatorio):
+    colunas = ['apostas', 'acertos', 'taxa_acerto', 'odd_media', 'lucro', 'yield', 'roi', 'capital_necessario', 'drawdown_maximo']
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 250, 'display.float_format', '{:.2f}'.format):
+        print(relatorio[colunas])
+
+if __name__ == "__main__":
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_HISTORICO_PADRAO
+    print(f"===== BACKTEST DAS ESTRATÉGIAS ({arquivo}) =====")
+    relatorio, _ = rodar_backtest(carregar_historico(arquivo))
+    imprimir_relatorio(relatorio)
@@ -0,0 +1,292 @@
+# benchmark.py (Benchmark dos Trechos Críticos da Análise)
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+PASTA_RESULTADOS_BENCHMARK = 'resultados_benchmark'
+REPETICOES = 3
+SEMENTE = 42
+# Cada escala: jogos do dia (N), eventos de odds (M) e linhas do histórico (K).
+ESCALAS = {
+    'pequena': {'jogos': 100, 'eventos_odds': 200, 'linhas_historico': 5000},
+    'media': {'jogos': 500, 'eventos_odds': 1000, 'linhas_historico': 20000},
+    'grande': {'jogos': 2000, 'eventos_odds': 4000, 'linhas_historico': 80000},
+}
+ENTRADAS_CACHE = 200
+# Comparação do pareamento indexado com o loop antigo: jogos, eventos de odds, times e semente.
+CENARIO_PAREAMENTO = {'jogos': 600, 'eventos_odds': 300, 'times': 60, 'semente': 3}
+
+PREFIXOS = ['Atlético', 'Sporting', 'Real', 'Deportivo', 'União', 'Racing', 'Olympique', 'Dynamo', 'Inter', 'Athletic']
+CIDADES = [
+    'Lisboa', 'Porto', 'Madrid', 'Sevilla', 'Paris', 'Lyon', 'Milano', 'Torino', 'Munique', 'Berlin', 'London',
+    'Manchester', 'Glasgow', 'Amsterdam', 'Bruxelas', 'Istambul', 'Atenas', 'Kiev', 'Praga', 'Viena', 'Zurique',
+    'Recife', 'Curitiba', 'Salvador', 'Fortaleza', 'Goiânia', 'Belém', 'Campinas', 'Santos', 'Rosário', 'Córdoba'
+]
+SUFIXOS_ODDS = ['', ' FC', ' SC', ' CF']
+
+# --- GERADORES SINTÉTICOS ---
+def gerar_times(quantidade, rng):
+    nomes = [f"{prefixo} {cidade}" for prefixo in PREFIXOS for cidade in CIDADES]
+    rng.shuffle(nomes)
+    extras = [f"Clube {i}" for i in range(max(0, quantidade - len(nomes)))]
+    return (nomes + extras)[:quantidade]
+
+def gerar_historico(linhas, times, rng):
+    """DataFrame no formato de dados_historicos_corrigido.csv, com placares e odds plausíveis."""
+    np_rng = np.random.default_rng(rng.randrange(2**32))
+    casa = np_rng.integers(0, len(times), linhas)
+    fora = (casa + np_rng.integers(1, len(times), linhas)) % len(times)
+    nomes = np.array(times, dtype=object)
+    datas = pd.Timestamp('2015-01-01') + pd.to_timedelta(np.sort(np_rng.integers(0, 3650, linhas)), unit='D')
+    psh = np.round(np_rng.uniform(1.2, 6.0, linhas), 2)
+    dados = {
+        'League': np_rng.choice(['E0', 'D1', 'SP1', 'I1', 'F1', 'P1'], linhas), 'Date': datas.strftime('%d/%m/%Y'),
+        'HomeTeam': nomes[casa], 'AwayTeam': nomes[fora],
+        'FTHG': np_rng.poisson(1.5, linhas).astype(float), 'FTAG': np_rng.poisson(1.1, linhas).astype(float),
+    }
+    for coluna, media in [('HC', 5.5), ('AC', 4.5), ('HS', 13), ('AS', 10), ('HST', 4.8), ('AST', 3.9), ('HY', 1.7), ('AY', 2.0), ('HR', 0.06), ('AR', 0.08)]:
+        dados[coluna] = np_rng.poisson(media, linhas).astype(float)
+    dados.update({'PSH': psh, 'PSD': np.round(np_rng.uniform(2.8, 4.5, linhas), 2), 'PSA': np.round(np_rng.uniform(1.2, 8.0, linhas), 2),
+                  'P>2.5': np.round(np_rng.uniform(1.5, 2.6, linhas), 2), 'P<2.5': np.round(np_rng.uniform(1.4, 2.6, linhas), 2)})
+    return pd.DataFrame(dados)
+
+def gerar_jogos_e_odds(num_jogos, num_eventos, times, rng):
+    """Jogos da API-Football e eventos da The Odds API; parte dos eventos corresponde aos jogos com nomes levemente diferentes."""
+    inicio_dia = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+    jogos = []
+    for i in range(num_jogos):
+        casa, fora = rng.sample(times, 2)
+        jogos.append({
+            'id_partida': 1_000_000 + i, 'home_team': casa, 'away_team': fora, 'home_team_id': times.index(casa), 'away_team_id': times.index(fora),
+            'league_id': rng.randrange(1, 60), 'timestamp': int((inicio_dia + timedelta(minutes=rng.randrange(0, 600))).timestamp())
+        })
+    eventos = []
+    for i in range(num_eventos):
+        if i < len(jogos) * 0.7:
+            jogo = jogos[i]
+            casa, fora = jogo['home_team'] + rng.choice(SUFIXOS_ODDS), jogo['away_team'] + rng.choice(SUFIXOS_ODDS)
+            inicio = datetime.fromtimestamp(jogo['timestamp'], tz=timezone.utc)
+        else:
+            casa, fora = rng.sample(times, 2)
+            inicio = inicio_dia + timedelta(minutes=rng.randrange(-1440, 2880))
+        precos = [round(rng.uniform(1.2, 6.0), 2), round(rng.uniform(2.8, 4.5), 2), round(rng.uniform(1.2, 8.0), 2)]
+        eventos.append({
+            'id': f"evento{i}", 'home_team': casa, 'away_team': fora, 'commence_time': inicio.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'bookmakers': [
+                {'key': casa_apostas, 'markets': [{'key': 'h2h', 'outcomes': [
+                    {'name': casa, 'price': round(precos[0] * rng.uniform(0.95, 1.05), 2)},
+                    {'name': 'Draw', 'price': round(precos[1] * rng.uniform(0.95, 1.05), 2)},
+                    {'name': fora, 'price': round(precos[2] * rng.uniform(0.95, 1.05), 2)}]}]}
+                for casa_apostas in ['pinnacle', 'betfair', 'bet365', 'marathonbet']
+            ]
+        })
+    rng.shuffle(eventos)
+    return jogos, eventos
+
+# --- MEDIÇÃO ---
+def medir(funcao, repeticoes=REPETICOES):
+    """
+    Executa `funcao` `repeticoes` vezes para medir o tempo e uma vez a mais sob o tracemalloc para o pico
+    de memória (o tracemalloc deixa o código bem mais lento, por isso não entra na medição de tempo).
+    A saída dos prints é descartada.
+    """
+    tempos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        tracemalloc.start()
+        try:
+            funcao()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'tempo_min_s': min(tempos), 'tempo_mediana_s': statistics.median(tempos), 'pico_memoria_mb': pico / 2**20}
+
+def rodar_escala(nome_escala, parametros, pasta_temporaria):
+    import estrategias
+    import armazem_historico
+    import gerenciador_cache
+    from avaliador_estrategias import ESTRATEGIAS, avaliar_jogos_em_lote
+    from estatisticas_historicas import calcular_estatisticas_historicas
+    from pareamento_odds import parear_jogos_com_odds
+    from tabela_odds import construir_tabela_odds
+
+    rng = random.Random(SEMENTE)
+    times = gerar_times(max(60, parametros['linhas_historico'] // 40), rng)
+    historico = gerar_historico(parametros['linhas_historico'], times, rng)
+    jogos, eventos = gerar_jogos_e_odds(parametros['jogos'], parametros['eventos_odds'], times, rng)
+    arquivo_csv = os.path.join(pasta_temporaria, f"historico_{nome_escala}.csv")
+    historico.to_csv(arquivo_csv, index=False)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats_i, stats_h, forma_r = calcular_estatisticas_historicas(historico.copy())
+        pareamentos = parear_jogos_com_odds(jogos, eventos)
+        tabela_odds = construir_tabela_odds(eventos)
+    for jogo in jogos:
+        evento = pareamentos.get(jogo['id_partida'], ({}, 0))[0]
+        jogo['bookmakers'], jogo['id_evento_odds'] = evento.get('bookmakers', []), evento.get('id')
+    contexto = {'stats_individuais': stats_i, 'stats_h2h': stats_h, 'forma_recente': forma_r,
+                'mapa_de_nomes': {nome: nome for nome in times}, 'tabela_odds': tabela_odds}
+
+    etapas = {
+        'carregar_csv': lambda: pd.read_csv(arquivo_csv, low_memory=False),
+        'carregar_armazem': lambda: armazem_historico.carregar_historico(arquivo_csv),
+        'calcular_estatisticas_historicas': lambda: calcular_estatisticas_historicas(historico.copy()),
+        'parear_jogos_com_odds': lambda: parear_jogos_com_odds(jogos, eventos),
+        'construir_tabela_odds': lambda: construir_tabela_odds(eventos),
+        'avaliar_jogos_em_lote': lambda: avaliar_jogos_em_lote(jogos, contexto),
+    }
+    for estrategia in ESTRATEGIAS:
+        funcao = getattr(estrategias, estrategia['funcao'])
+        etapas[estrategia['funcao']] = lambda funcao=funcao: [funcao(jogo, contexto) for jogo in jogos]
+
+    # Cache: o banco é criado dentro da pasta temporária para não tocar no cache real do bot.
+    gerenciador_cache.fechar_cache()
+    gerenciador_cache.ARQUIVO_BANCO_CACHE = os.path.join(pasta_temporaria, f"cache_{nome_escala}.sqlite3")
+    payload = {'response': eventos[:20]}
+    chaves = [f"benchmark_{nome_escala}_{i}" for i in range(ENTRADAS_CACHE)]
+    def _ler_do_banco():
+        gerenciador_cache.limpar_memoria()
+        for chave in chaves:
+            gerenciador_cache.ler_cache(chave, 24)
+    etapas['salvar_cache'] = lambda: [gerenciador_cache.salvar_cache(chave, payload) for chave in chaves]
+    etapas['ler_cache_banco'] = _ler_do_banco
+    etapas['ler_cache_memoria'] = lambda: [gerenciador_cache.ler_cache(chave, 24) for chave in chaves]
+    etapas['get_many'] = lambda: (gerenciador_cache.limpar_memoria(), gerenciador_cache.get_many(chaves, 24))
+
+    resultados = {}
+    for nome_etapa, funcao in etapas.items():
+        resultados[nome_etapa] = medir(funcao)
+        print(f"  -> {nome_escala:>8} | {nome_etapa:<36} {resultados[nome_etapa]['tempo_mediana_s'] * 1000:>10.1f} ms  {resultados[nome_etapa]['pico_memoria_mb']:>8.1f} MB")
+    gerenciador_cache.fechar_cache()
+    return {'parametros': parametros, 'etapas': resultados}
+
+# --- PAREAMENTO: ÍNDICE x LOOP ANTIGO ---
+def _parear_loop_antigo(jogos, eventos, pontuacao_minima=75):
+    """O pareamento de antes do pareamento_odds (main.rodar_analise_completa): cada jogo contra todos os eventos."""
+    from thefuzz import fuzz
+    pareamentos = {}
+    for jogo in jogos:
+        melhor_match, maior_pontuacao = None, pontuacao_minima
+        for evento in eventos:
+            if evento.get('home_team') and evento.get('away_team'):
+                pontuacao = fuzz.token_set_ratio(f"{jogo['home_team']} {jogo['away_team']}", f"{evento['home_team']} {evento['away_team']}")
+                if pontuacao > maior_pontuacao:
+                    maior_pontuacao, melhor_match = pontuacao, evento
+        if melhor_match is not None:
+            pareamentos[jogo['id_partida']] = (melhor_match, maior_pontuacao)
+    return pareamentos
+
+def comparar_pareamento(cenario=CENARIO_PAREAMENTO):
+    """
+    Roda o pareamento indexado e o loop antigo sobre os mesmos dados sintéticos e conta, para cada um, os pareamentos
+    certos e errados pelo gabarito do gerador (o evento i foi gerado a partir do jogo i). Também conta os jogos em que
+    os dois divergem e quantas dessas divergências são eventos do loop antigo fora da janela de horário.
+    """
+    from pareamento_odds import JANELA_HORARIO_HORAS, _timestamp_inicio, parear_jogos_com_odds
+
+    rng = random.Random(cenario['semente'])
+    times = gerar_times(cenario['times'], rng)
+    jogos, eventos = gerar_jogos_e_odds(cenario['jogos'], cenario['eventos_odds'], times, rng)
+    gabarito = {}
+    for evento in eventos:
+        posicao = int(evento['id'].removeprefix('evento'))
+        if posicao < len(jogos) * 0.7:
+            gabarito[jogos[posicao]['id_partida']] = evento['id']
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        novo = {id_partida: evento['id'] for id_partida, (evento, _) in parear_jogos_com_odds(jogos, eventos).items()}
+    tempo_novo = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    antigo_completo = _parear_loop_antigo(jogos, eventos)
+    tempo_antigo = time.perf_counter() - inicio
+    antigo = {id_partida: evento['id'] for id_partida, (evento, _) in antigo_completo.items()}
+
+    timestamps = {jogo['id_partida']: jogo['timestamp'] for jogo in jogos}
+    divergentes = [id_partida for id_partida in set(novo) | set(antigo) if novo.get(id_partida) != antigo.get(id_partida)]
+    fora_da_janela = sum(
+        1 for id_partida in divergentes if id_partida in antigo_completo
+        and abs(_timestamp_inicio(antigo_completo[id_partida][0]) - timestamps[id_partida]) > JANELA_HORARIO_HORAS * 3600
+    )
+    resultado = {'cenario': cenario, 'jogos_com_evento_verdadeiro': len(gabarito), 'divergentes': len(divergentes), 'divergentes_fora_da_janela': fora_da_janela}
+    print(f"Pareamento em {cenario}: {len(gabarito)} jogos têm evento verdadeiro.")
+    for nome, pareamentos, tempo in [('loop antigo', antigo, tempo_antigo), ('índice', novo, tempo_novo)]:
+        certos = sum(1 for id_partida, id_evento in pareamentos.items() if gabarito.get(id_partida) == id_evento)
+        resultado[nome] = {'pareados': len(pareamentos), 'certos': certos, 'errados': len(pareamentos) - certos, 'tempo_s': tempo}
+        print(f"  {nome:<12} {len(pareamentos):>5} pareados | {certos:>5} certos | {len(pareamentos) - certos:>5} errados | {tempo * 1000:>9.1f} ms")
+    print(f"  {len(divergentes)} jogos com pareamento diferente; em {fora_da_janela} deles o evento do loop antigo começa "
+          f"a mais de {JANELA_HORARIO_HORAS}h do jogo.")
+    return resultado
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', '-C', os.path.dirname(os.path.abspath(__file__)), 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+def rodar_benchmark(escalas=None):
+    """Roda as etapas em cada escala e salva o resultado em PASTA_RESULTADOS_BENCHMARK. Retorna o caminho do JSON."""
+    escalas = escalas or list(ESCALAS)
+    commit = _commit_atual()
+    resultado = {
+        'commit': commit, 'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+        'plataforma': platform.platform(), 'repeticoes': REPETICOES, 'escalas': {}
+    }
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        for nome_escala in escalas:
+            print(f"\n--- ⏱️  Escala '{nome_escala}': {ESCALAS[nome_escala]} ---")
+            resultado['escalas'][nome_escala] = rodar_escala(nome_escala, ESCALAS[nome_escala], pasta_temporaria)
+    os.makedirs(PASTA_RESULTADOS_BENCHMARK, exist_ok=True)
+    caminho = os.path.join(PASTA_RESULTADOS_BENCHMARK, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Resultado salvo em '{caminho}'.")
+    return caminho
+
+def comparar(arquivo_antes, arquivo_depois):
+    """Imprime, etapa a etapa, a razão de tempo (depois/antes) entre dois resultados salvos."""
+    with open(arquivo_antes, 'r', encoding='utf-8') as f:
+        antes = json.load(f)
+    with open(arquivo_depois, 'r', encoding='utf-8') as f:
+        depois = json.load(f)
+    print(f"Comparando {antes['commit']} -> {depois['commit']} (razão < 1.00 = mais rápido)")
+    for nome_escala, escala in depois['escalas'].items():
+        etapas_antes = antes['escalas'].get(nome_escala, {}).get('etapas', {})
+        for nome_etapa, medida in escala['etapas'].items():
+            if nome_etapa not in etapas_antes:
+                continue
+            razao = medida['tempo_mediana_s'] / max(etapas_antes[nome_etapa]['tempo_mediana_s'], 1e-9)
+            print(f"  {nome_escala:>8} | {nome_etapa:<36} {etapas_antes[nome_etapa]['tempo_mediana_s'] * 1000:>10.1f} ms -> {medida['tempo_mediana_s'] * 1000:>10.1f} ms  x{razao:.2f}")
+
+if __name__ == "__main__":
+    # Uso: python benchmark.py [pequena media grande]  |  python benchmark.py comparar antes.json depois.json
+    #      python benchmark.py pareamento   (pareamento indexado x loop antigo, com gabarito)
+    if len(sys.argv) == 4 and sys.argv[1] == 'comparar':
+        comparar(sys.argv[2], sys.argv[3])
+    elif sys.argv[1:] == ['pareamento']:
+        comparar_pareamento()
+    else:
+        escalas_pedidas = sys.argv[1:]
+        desconhecidas = [escala for escala in escalas_pedidas if escala not in ESCALAS]
+        if desconhecidas:
+            print(f"❌ Escala(s) desconhecida(s): {', '.join(desconhecidas)}. Opções: {', '.join(ESCALAS)}.")
+            sys.exit(1)
+        rodar_benchmark(escalas_pedidas)
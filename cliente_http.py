@@ -0,0 +1,131 @@
+# cliente_http.py (Cliente HTTP Compartilhado)
+
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metricas
+
+# --- CONFIGURAÇÕES DE CONEXÃO ---
+# Ajustáveis por variável de ambiente para não precisar mexer no código nos workflows.
+TENTATIVAS_HTTP = int(os.getenv('HTTP_TENTATIVAS', '3'))
+FATOR_BACKOFF_HTTP = float(os.getenv('HTTP_FATOR_BACKOFF', '1.0'))
+STATUS_PARA_NOVA_TENTATIVA = (429, 500, 502, 503, 504)
+NUM_POOLS_DE_HOSTS = 10
+CONEXOES_POR_HOST = 16
+TIMEOUT_PADRAO = 15
+TIMEOUTS_POR_HOST = {
+    'v3.football.api-sports.io': 30,
+    'api.the-odds-api.com': 20,
+    'api.sofascore.com': 10,
+    'api.telegram.org': 10,
+    'therundown-therundown-v1-pro.p.rapidapi.com': 20,
+}
+
+# --- ENDEREÇOS DAS APIS ---
+# Cada base pode ser trocada por variável de ambiente; SERVIDOR_SIMULADO aponta todas de uma vez para o
+# servidor local de servidor_simulado.py (ex.: SERVIDOR_SIMULADO=http://127.0.0.1:8099).
+SERVIDOR_SIMULADO = os.getenv('SERVIDOR_SIMULADO', '').rstrip('/')
+
+def _url_base(variavel, padrao, prefixo_simulado):
+    if os.getenv(variavel):
+        return os.getenv(variavel).rstrip('/')
+    return f"{SERVIDOR_SIMULADO}/{prefixo_simulado}" if SERVIDOR_SIMULADO else padrao
+
+URL_API_FOOTBALL = _url_base('URL_API_FOOTBALL', 'https://v3.football.api-sports.io', 'api-football')
+URL_THE_ODDS_API = _url_base('URL_THE_ODDS_API', 'https://api.the-odds-api.com', 'odds')
+URL_SOFASCORE = _url_base('URL_SOFASCORE', 'https://api.sofascore.com', 'sofascore')
+URL_TELEGRAM = _url_base('URL_TELEGRAM', 'https://api.telegram.org', 'telegram')
+URL_THE_RUNDOWN = _url_base('URL_THE_RUNDOWN', 'https://therundown-therundown-v1-pro.p.rapidapi.com', 'rundown')
+# Rótulo de cada API nas métricas (chamadas e tempo por API, para acompanhar o consumo de cota).
+APIS_POR_URL_BASE = {
+    URL_API_FOOTBALL: 'api_football', URL_THE_ODDS_API: 'the_odds_api', URL_SOFASCORE: 'sofascore',
+    URL_TELEGRAM: 'telegram', URL_THE_RUNDOWN: 'the_rundown'
+}
+
+_sessao = None
+_trava_sessao = threading.Lock()
+
+def _criar_sessao():
+    """Sessão única com keep-alive, gzip e novas tentativas com backoff exponencial em 429/5xx."""
+    politica_de_tentativas = Retry(
+        total=TENTATIVAS_HTTP,
+        connect=TENTATIVAS_HTTP,
+        read=TENTATIVAS_HTTP,
+        status=TENTATIVAS_HTTP,
+        backoff_factor=FATOR_BACKOFF_HTTP,
+        status_forcelist=STATUS_PARA_NOVA_TENTATIVA,
+        allowed_methods=frozenset(['GET', 'HEAD']),  # POST (Telegram) não é repetido para não duplicar mensagens
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adaptador = HTTPAdapter(pool_connections=NUM_POOLS_DE_HOSTS, pool_maxsize=CONEXOES_POR_HOST, max_retries=politica_de_tentativas)
+    sessao = requests.Session()
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    sessao.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+    return sessao
+
+def obter_sessao():
+    global _sessao
+    if _sessao is None:
+        with _trava_sessao:
+            if _sessao is None:
+                _sessao = _criar_sessao()
+    return _sessao
+
+def timeout_para(url):
+    return TIMEOUTS_POR_HOST.get(urlsplit(url).hostname, TIMEOUT_PADRAO)
+
+def _nome_api(url):
+    return next((nome for base, nome in APIS_POR_URL_BASE.items() if url.startswith(base)), urlsplit(url).hostname or 'desconhecida')
+
+def requisitar(metodo, url, **kwargs):
+    """Igual a requests.request, mas reutilizando as conexões e com timeout padrão por host."""
+    kwargs.setdefault('timeout', timeout_para(url))
+    api = _nome_api(url)
+    status = 'erro_conexao'
+    try:
+        with metricas.etapa(f'http_{api}'):
+            resposta = obter_sessao().request(metodo, url, **kwargs)
+        status = resposta.status_code
+        # As novas tentativas do urllib3 também consomem cota: ficam num contador próprio.
+        tentativas = getattr(getattr(resposta.raw, 'retries', None), 'history', ())
+        if tentativas:
+            metricas.incrementar('novas_tentativas_http', len(tentativas), api=api)
+        return resposta
+    finally:
+        metricas.incrementar('chamadas_api', api=api, status=status)
+
+def get(url, **kwargs):
+    return requisitar('GET', url, **kwargs)
+
+def post(url, **kwargs):
+    return requisitar('POST', url, **kwargs)
+
+class LimitadorDeTaxa:
+    """Janela deslizante thread-safe: no máximo `limite` chamadas a cada `periodo_segundos`."""
+
+    def __init__(self, limite, periodo_segundos=60):
+        self.limite = max(1, limite)
+        self.periodo_segundos = periodo_segundos
+        self._chamadas = deque()
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                while self._chamadas and agora - self._chamadas[0] >= self.periodo_segundos:
+                    self._chamadas.popleft()
+                if len(self._chamadas) < self.limite:
+                    self._chamadas.append(agora)
+                    return
+                espera = self.periodo_segundos - (agora - self._chamadas[0])
+            time.sleep(espera)
@@ -1,19 +1,31 @@
-from decouple import Config, RepositoryEnv
 import os
 
 # --- CAMINHO EXPLÍCITO PARA O ARQUIVO .ENV ---
 # Esta linha constrói o caminho completo para o arquivo .env, garantindo que ele sempre seja encontrado.
 DOTENV_PATH = os.path.join(os.path.dirname(__file__), '.env')
 
-# Cria uma instância de configuração que LÊ ESSE ARQUIVO ESPECÍFICO
-env_config = Config(RepositoryEnv(DOTENV_PATH))
-
 # --- CHAVES DE ACESSO E TOKENS ---
-TELEGRAM_TOKEN = env_config('TELEGRAM_TOKEN')
-TELEGRAM_CHAT_ID = env_config('TELEGRAM_CHAT_ID')
-API_KEY_ODDS = env_config('API_KEY_ODDS')
-# Adicione esta linha junto com as outras chaves
-API_KEY_FOOTBALL = env_config('API_KEY_FOOTBALL')
+# Lidas do .env só quando alguém as usa (ex.: `from config import API_KEY_FOOTBALL`): importar o config
+# para pegar as constantes abaixo não exige o python-decouple nem o arquivo .env.
+CHAVES_DO_ENV = ('TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID', 'API_KEY_ODDS', 'API_KEY_FOOTBALL')
+_env_config = None
+
+def _obter_env_config():
+    """Cria (uma vez) a instância de configuração que LÊ ESSE ARQUIVO ESPECÍFICO."""
+    global _env_config
+    if _env_config is None:
+        from decouple import Config, RepositoryEnv
+        _env_config = Config(RepositoryEnv(DOTENV_PATH))
+    return _env_config
+
+def __getattr__(nome):
+    if nome == 'env_config':
+        return _obter_env_config()
+    if nome in CHAVES_DO_ENV:
+        valor = _obter_env_config()(nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module 'config' has no attribute '{nome}'")
 
 # --- DICIONÁRIO DE RISCO E NÍVEIS DE ODDS ---
 NIVEIS_DE_RISCO_ODDS = {
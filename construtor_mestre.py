@@ -1,5 +1,6 @@
 import os
-import requests
+import cliente_http
+from cliente_http import URL_API_FOOTBALL
 import json
 import time
 
@@ -32,7 +33,7 @@ def main():
 
     print("Buscando a lista de todos os países...")
     try:
-        response_paises = requests.get("https://v3.football.api-sports.io/countries", headers=headers, timeout=15)
+        response_paises = cliente_http.get(f"{URL_API_FOOTBALL}/countries", headers=headers, timeout=15)
         if response_paises.status_code != 200:
             print(f"❌ ERRO ao buscar países: {response_paises.text}"); return
 
@@ -68,7 +69,7 @@ def main():
 
         try:
             params = {'country': nome_pais}
-            response_times = requests.get("https://v3.football.api-sports.io/teams", headers=headers, params=params, timeout=15)
+            response_times = cliente_http.get(f"{URL_API_FOOTBALL}/teams", headers=headers, params=params, timeout=15)
 
             if response_times.status_code != 200:
                 print(f"  ❌ ERRO ao buscar times para '{nome_pais}': {response_times.text}")
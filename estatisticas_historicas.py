@@ -0,0 +1,231 @@
+# estatisticas_historicas.py (Motor de Estatísticas + Snapshot Persistente)
+
+import hashlib
+import io
+import json
+import os
+
+import metricas
+from armazem_historico import compactar_historico
+from importacao_tardia import importar_tardio
+
+np = importar_tardio('numpy')
+pd = importar_tardio('pandas')
+
+# --- ARQUIVOS E CONSTANTES ---
+ARQUIVO_SNAPSHOT_ESTATISTICAS = 'snapshot_estatisticas.json'
+VERSAO_SNAPSHOT = 1
+# Contextos já carregados neste processo (modo serviço): {(csv, snapshot): ((tamanho, mtime), contexto)}.
+_contextos_em_memoria = {}
+COLUNAS_STATS = ['FTHG', 'FTAG', 'HC', 'AC', 'HS', 'AS', 'HST', 'AST', 'HY', 'AY', 'HR', 'AR']
+
+def calcular_estatisticas_historicas(df):
+    if df.empty: return {}, {}, {}
+    try:
+        limpar_historico(df)
+        df.sort_values(by='Date', inplace=True)
+    except Exception:
+        print(" -> ERRO: Falha ao converter a coluna de datas."); return {}, {}, {}
+    saldo_gols = np.sign(df['FTHG'].to_numpy() - df['FTAG'].to_numpy())
+    df['ResultadoCasa'] = np.select([saldo_gols > 0, saldo_gols == 0], ['V', 'E'], default='D')
+    df['ResultadoFora'] = np.select([saldo_gols < 0, saldo_gols == 0], ['V', 'E'], default='D')
+    print("  -> 📊 Pré-calculando estatísticas gerais e de forma recente...")
+    # Tabela "longa": uma linha por participação (casa e fora) na ordem cronológica do histórico.
+    # A ordem 2*i / 2*i+1 preserva a sequência do antigo loop (mandante antes do visitante).
+    posicoes = np.arange(len(df))
+    participacoes = pd.DataFrame({
+        'time': np.concatenate([df['HomeTeam'].to_numpy(), df['AwayTeam'].to_numpy()]),
+        'resultado': np.concatenate([df['ResultadoCasa'].to_numpy(), df['ResultadoFora'].to_numpy()]),
+        'ordem': np.concatenate([2 * posicoes, 2 * posicoes + 1])
+    }).sort_values('ordem', kind='stable')
+    ultimos_5 = participacoes.groupby('time', sort=False).tail(5)
+    forma_recente = {time: resultados[::-1] for time, resultados in ultimos_5.groupby('time', sort=False)['resultado'].agg(list).items()}
+    stats_casa = df.groupby('HomeTeam').agg(avg_gols_marcados_casa=('FTHG', 'mean'), avg_gols_sofridos_casa=('FTAG', 'mean'), total_jogos_casa=('HomeTeam', 'count'))
+    stats_fora = df.groupby('AwayTeam').agg(avg_gols_marcados_fora=('FTAG', 'mean'), avg_gols_sofridos_fora=('FTHG', 'mean'), total_jogos_fora=('AwayTeam', 'count'))
+    colunas_resultado = ['V', 'E', 'D']
+    placar_casa = pd.crosstab(df['HomeTeam'], df['ResultadoCasa']).reindex(columns=colunas_resultado, fill_value=0)
+    placar_casa.columns = ['vitorias_casa', 'empates_casa', 'derrotas_casa']
+    placar_fora = pd.crosstab(df['AwayTeam'], df['ResultadoFora']).reindex(columns=colunas_resultado, fill_value=0)
+    placar_fora.columns = ['vitorias_fora', 'empates_fora', 'derrotas_fora']
+    # Contagens zeradas viram NaN (como nos antigos filtros + groupby) e voltam a 0 no fillna, mantendo os tipos.
+    stats_individuais = pd.concat([stats_casa, stats_fora, placar_casa.where(placar_casa > 0), placar_fora.where(placar_fora > 0)], axis=1).fillna(0)
+    for local in ['casa', 'fora']:
+        for resultado in ['vitorias', 'derrotas', 'empates']:
+            stats_individuais[f'perc_{resultado}_{local}'] = (stats_individuais[f'{resultado}_{local}'] / stats_individuais[f'total_jogos_{local}']) * 100
+    stats_individuais = stats_individuais.to_dict('index')
+    df['TotalGols'] = df['FTHG'] + df['FTAG']
+    nome_casa, nome_fora = df['HomeTeam'].astype(str), df['AwayTeam'].astype(str)
+    casa_primeiro = nome_casa <= nome_fora
+    df['H2H_Key'] = nome_casa.where(casa_primeiro, nome_fora) + '|' + nome_fora.where(casa_primeiro, nome_casa)
+    stats_h2h = df.groupby('H2H_Key').agg(avg_gols_h2h=('TotalGols', 'mean'), total_jogos_h2h=('H2H_Key', 'count')).to_dict('index')
+    print(f"  -> Estatísticas para {len(stats_individuais)} times e {len(stats_h2h)} confrontos calculadas.")
+    return stats_individuais, stats_h2h, forma_recente
+
+
+def limpar_historico(df):
+    """
+    Aplica ao DataFrame as mesmas conversões e filtros do cálculo completo. Usada também pelo backtest (e, por ele,
+    pela varredura de parâmetros), para o histórico simulado ser limpo exatamente como o das estatísticas ao vivo.
+    """
+    for col in COLUNAS_STATS:
+        if col in df.columns: df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        else: df[col] = 0
+    df.dropna(subset=['HomeTeam', 'AwayTeam', 'Date'], inplace=True)
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+    df.dropna(subset=['Date'], inplace=True)
+    return df
+
+def _chave_h2h(time_casa, time_fora):
+    return '|'.join(sorted([str(time_casa), str(time_fora)]))
+
+def _percentual(parte, total):
+    return (parte / total) * 100 if total else float('nan')
+
+def _assinatura_arquivo(conteudo):
+    return hashlib.sha1(conteudo).hexdigest()
+
+def _montar_acumuladores(df):
+    """Somas de gols por time/confronto, necessárias para recalcular médias de forma incremental."""
+    gols_casa = df.groupby('HomeTeam')[['FTHG', 'FTAG']].sum()
+    gols_fora = df.groupby('AwayTeam')[['FTAG', 'FTHG']].sum()
+    gols_h2h = df.groupby('H2H_Key')['TotalGols'].sum()
+    return {
+        'gols_casa': {time: [float(m), float(s)] for time, (m, s) in zip(gols_casa.index, gols_casa.to_numpy())},
+        'gols_fora': {time: [float(m), float(s)] for time, (m, s) in zip(gols_fora.index, gols_fora.to_numpy())},
+        'gols_h2h': {chave: float(total) for chave, total in gols_h2h.items()},
+        'ultima_data': df['Date'].max().isoformat() if not df.empty else None
+    }
+
+def _aplicar_novas_linhas(snapshot, df_novo):
+    """
+    Soma as partidas recém-adicionadas ao snapshot, na ordem cronológica.
+    Retorna False se as linhas não puderem ser aplicadas sem recalcular tudo.
+    """
+    acumuladores = snapshot['acumuladores']
+    if acumuladores.get('ultima_data') is None: return False
+    df_novo = limpar_historico(df_novo)
+    if df_novo.empty: return True
+    df_novo = df_novo.sort_values(by='Date', kind='stable')
+    # Jogos mais antigos que o snapshot mudariam a ordem da forma recente: exige recálculo completo.
+    if df_novo['Date'].min() < pd.Timestamp(acumuladores['ultima_data']): return False
+
+    stats_individuais, stats_h2h, forma_recente = snapshot['stats_individuais'], snapshot['stats_h2h'], snapshot['forma_recente']
+    times_afetados = set()
+    for time_casa, time_fora, gols_casa, gols_fora in zip(df_novo['HomeTeam'], df_novo['AwayTeam'], df_novo['FTHG'], df_novo['FTAG']):
+        resultado_casa = 'V' if gols_casa > gols_fora else ('E' if gols_casa == gols_fora else 'D')
+        resultado_fora = 'V' if gols_fora > gols_casa else ('E' if gols_fora == gols_casa else 'D')
+        for time, local, resultado, marcados, sofridos in ((time_casa, 'casa', resultado_casa, gols_casa, gols_fora), (time_fora, 'fora', resultado_fora, gols_fora, gols_casa)):
+            stats = stats_individuais.setdefault(time, {})
+            for campo in ('total_jogos', 'vitorias', 'empates', 'derrotas'):
+                stats.setdefault(f'{campo}_{local}', 0)
+            stats[f'total_jogos_{local}'] += 1
+            stats[{'V': 'vitorias', 'E': 'empates', 'D': 'derrotas'}[resultado] + f'_{local}'] += 1
+            soma = acumuladores[f'gols_{local}'].setdefault(time, [0.0, 0.0])
+            soma[0] += float(marcados); soma[1] += float(sofridos)
+            forma = forma_recente.setdefault(time, [])
+            forma.insert(0, resultado)
+            if len(forma) > 5: forma.pop()
+            times_afetados.add(time)
+        chave = _chave_h2h(time_casa, time_fora)
+        acumuladores['gols_h2h'][chave] = acumuladores['gols_h2h'].get(chave, 0.0) + float(gols_casa + gols_fora)
+        h2h = stats_h2h.setdefault(chave, {'avg_gols_h2h': 0.0, 'total_jogos_h2h': 0})
+        h2h['total_jogos_h2h'] += 1
+        h2h['avg_gols_h2h'] = acumuladores['gols_h2h'][chave] / h2h['total_jogos_h2h']
+
+    for time in times_afetados:
+        stats = stats_individuais[time]
+        for local in ('casa', 'fora'):
+            total = stats.setdefault(f'total_jogos_{local}', 0)
+            for campo in ('vitorias', 'empates', 'derrotas'):
+                stats.setdefault(f'{campo}_{local}', 0)
+            marcados, sofridos = acumuladores[f'gols_{local}'].get(time, [0.0, 0.0])
+            stats[f'avg_gols_marcados_{local}'] = marcados / total if total else 0.0
+            stats[f'avg_gols_sofridos_{local}'] = sofridos / total if total else 0.0
+            for campo in ('vitorias', 'derrotas', 'empates'):
+                stats[f'perc_{campo}_{local}'] = _percentual(stats[f'{campo}_{local}'], total)
+    acumuladores['ultima_data'] = max(pd.Timestamp(acumuladores['ultima_data']), df_novo['Date'].max()).isoformat()
+    print(f"  -> ♻️  Snapshot atualizado de forma incremental com {len(df_novo)} novos jogos.")
+    return True
+
+def _calcular_snapshot_completo(conteudo):
+    df = compactar_historico(pd.read_csv(io.BytesIO(conteudo), low_memory=False))
+    stats_i, stats_h, forma_r = calcular_estatisticas_historicas(df)
+    acumuladores = _montar_acumuladores(df) if stats_i else {'gols_casa': {}, 'gols_fora': {}, 'gols_h2h': {}, 'ultima_data': None}
+    return {'stats_individuais': stats_i, 'stats_h2h': stats_h, 'forma_recente': forma_r, 'acumuladores': acumuladores}
+
+def _ler_snapshot(arquivo_snapshot):
+    try:
+        with open(arquivo_snapshot, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        return snapshot if snapshot.get('versao') == VERSAO_SNAPSHOT else None
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _salvar_snapshot(snapshot, arquivo_snapshot):
+    arquivo_temporario = f"{arquivo_snapshot}.tmp"
+    try:
+        with open(arquivo_temporario, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(arquivo_temporario, arquivo_snapshot)
+    except Exception as e:
+        print(f"  -> ⚠️ AVISO: Não foi possível salvar o snapshot de estatísticas: {e}")
+
+def carregar_contexto_estatistico(arquivo_csv, arquivo_snapshot=ARQUIVO_SNAPSHOT_ESTATISTICAS):
+    """
+    Retorna (stats_individuais, stats_h2h, forma_recente) do histórico, usando o snapshot em disco.
+    - CSV inalterado (tamanho/mtime ou hash iguais): devolve o snapshot sem ler o CSV com o pandas.
+    - CSV apenas com linhas anexadas: processa só as linhas novas.
+    - Qualquer outra mudança: recalcula tudo e regrava o snapshot.
+    Num processo de longa duração, o contexto fica em memória e só é relido se o CSV mudar.
+    Levanta FileNotFoundError se o CSV não existir.
+    """
+    info_csv = os.stat(arquivo_csv)
+    assinatura = (info_csv.st_size, info_csv.st_mtime)
+    em_memoria = _contextos_em_memoria.get((arquivo_csv, arquivo_snapshot))
+    if em_memoria and em_memoria[0] == assinatura:
+        print("  -> ⚡ Estatísticas já em memória (arquivo histórico inalterado).")
+        metricas.incrementar('snapshot_estatisticas', resultado='memoria')
+        return em_memoria[1]
+
+    snapshot = _ler_snapshot(arquivo_snapshot)
+    if snapshot:
+        origem = snapshot['arquivo']
+        if origem['tamanho'] == info_csv.st_size and origem['mtime'] == info_csv.st_mtime:
+            print("  -> ⚡ Snapshot de estatísticas válido (arquivo histórico inalterado).")
+            metricas.incrementar('snapshot_estatisticas', resultado='inalterado')
+            contexto = snapshot['stats_individuais'], snapshot['stats_h2h'], snapshot['forma_recente']
+            _contextos_em_memoria[(arquivo_csv, arquivo_snapshot)] = (assinatura, contexto)
+            return contexto
+
+    with metricas.etapa('leitura_csv'), open(arquivo_csv, 'rb') as f:
+        conteudo = f.read()
+
+    with metricas.etapa('calculo_estatisticas'):
+        atualizado = False
+        if snapshot:
+            tamanho_anterior = snapshot['arquivo']['tamanho']
+            mesmo_prefixo = len(conteudo) >= tamanho_anterior and _assinatura_arquivo(conteudo[:tamanho_anterior]) == snapshot['arquivo']['sha1']
+            if mesmo_prefixo and len(conteudo) == tamanho_anterior:
+                print("  -> ⚡ Snapshot de estatísticas válido (conteúdo do histórico inalterado).")
+                atualizado = True
+                metricas.incrementar('snapshot_estatisticas', resultado='inalterado')
+            elif mesmo_prefixo and conteudo[tamanho_anterior - 1:tamanho_anterior] == b'\n':
+                cabecalho = conteudo[:conteudo.index(b'\n') + 1]
+                df_novo = compactar_historico(pd.read_csv(io.BytesIO(cabecalho + conteudo[tamanho_anterior:]), low_memory=False))
+                atualizado = _aplicar_novas_linhas(snapshot, df_novo)
+                if atualizado:
+                    metricas.incrementar('snapshot_estatisticas', resultado='incremental')
+
+        if not atualizado:
+            print("  -> 🧮 Recalculando snapshot de estatísticas a partir do histórico completo...")
+            snapshot = _calcular_snapshot_completo(conteudo)
+            metricas.incrementar('snapshot_estatisticas', resultado='recalculado')
+
+    snapshot.update({
+        'versao': VERSAO_SNAPSHOT,
+        'arquivo': {'tamanho': len(conteudo), 'mtime': info_csv.st_mtime, 'sha1': _assinatura_arquivo(conteudo)}
+    })
+    _salvar_snapshot(snapshot, arquivo_snapshot)
+    contexto = snapshot['stats_individuais'], snapshot['stats_h2h'], snapshot['forma_recente']
+    _contextos_em_memoria[(arquivo_csv, arquivo_snapshot)] = (assinatura, contexto)
+    return contexto
@@ -1,8 +1,10 @@
 import os
-import requests
+import cliente_http
+from cliente_http import URL_API_FOOTBALL
 import json
 import time
-import pandas as pd
+from datetime import datetime
+from armazem_historico import anexar_partidas
 
 # --- 1. CONFIGURAÇÕES ---
 API_KEY_FOOTBALL = os.environ.get('API_FOOTBALL_KEY')
@@ -69,12 +71,6 @@ def main():
     headers = {'x-apisports-key': API_KEY_FOOTBALL}
     estado = carregar_estado()
 
-    # Carrega o DataFrame existente ou cria um novo
-    if os.path.exists(ARQUIVO_SAIDA_CSV):
-        df_principal = pd.read_csv(ARQUIVO_SAIDA_CSV)
-    else:
-        df_principal = pd.DataFrame()
-
     for liga_info in LIGAS_PARA_BUSCAR:
         for temporada in liga_info['temporadas']:
             id_unico = f"{liga_info['id_liga']}-{temporada}"
@@ -92,7 +88,7 @@ def main():
             while True: # Loop para lidar com a paginação da API
                 params = {'league': liga_info['id_liga'], 'season': temporada, 'page': pagina_atual}
                 try:
-                    response = requests.get("https://v3.football.api-sports.io/fixtures", headers=headers, params=params)
+                    response = cliente_http.get(f"{URL_API_FOOTBALL}/fixtures", headers=headers, params=params)
                     if response.status_code != 200:
                         print(f"  ❌ ERRO ao buscar dados: {response.text}")
                         print("  > Provavelmente a cota diária acabou. O progresso foi salvo. Tente novamente amanhã.")
@@ -115,18 +111,13 @@ def main():
                 except Exception as e:
                     print(f"  ❌ ERRO de conexão: {e}"); return
 
-            # Adiciona os dados coletados ao DataFrame principal
-            if dados_completos_liga:
-                df_liga = pd.DataFrame(dados_completos_liga)
-                df_principal = pd.concat([df_principal, df_liga], ignore_index=True)
-                # Remove duplicatas caso a gente rode de novo por acidente
-                df_principal.drop_duplicates(inplace=True)
+            # Anexa os jogos coletados; o índice de chaves pula os que já estão no arquivo (caso a gente rode de novo por acidente)
+            gravados = anexar_partidas(ARQUIVO_SAIDA_CSV, dados_completos_liga)
 
             # Salva o progresso
             estado['processados'].append(id_unico)
             salvar_estado(estado)
-            df_principal.to_csv(ARQUIVO_SAIDA_CSV, index=False)
-            print(f"✅ Dados de {liga_info['nome_liga']} {temporada} salvos. Banco de dados agora com {len(df_principal)} jogos.")
+            print(f"✅ Dados de {liga_info['nome_liga']} {temporada} salvos. {gravados} jogos novos no banco de dados.")
 
     print("\n--------------------------------------------------")
     print("🎉 Processo de construção concluído (ou pausado por hoje)!")
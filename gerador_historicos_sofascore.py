@@ -1,9 +1,9 @@
-import os
-import requests
+import cliente_http
+from cliente_http import URL_SOFASCORE
 import json
 import time
-import pandas as pd
 from datetime import datetime
+from armazem_historico import anexar_partidas
 
 # --- 1. CONFIGURAÇÕES ---
 ARQUIVO_SAIDA_CSV = 'dados_historicos_sofascore.csv'
@@ -60,8 +60,6 @@ def main():
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
     estado = carregar_estado()
 
-    df_principal = pd.read_csv(ARQUIVO_SAIDA_CSV) if os.path.exists(ARQUIVO_SAIDA_CSV) else pd.DataFrame()
-
     for liga_info in LIGAS_PARA_BUSCAR:
         for ano, id_temporada in liga_info['temporadas'].items():
             id_unico = f"{liga_info['id_liga']}-{id_temporada}"
@@ -76,9 +74,9 @@ def main():
             dados_completos_liga = []
 
             while True: # Loop para lidar com a paginação do Sofascore
-                url = f"https://api.sofascore.com/api/v1/unique-tournament/{liga_info['id_liga']}/season/{id_temporada}/events/last/{pagina_atual}"
+                url = f"{URL_SOFASCORE}/api/v1/unique-tournament/{liga_info['id_liga']}/season/{id_temporada}/events/last/{pagina_atual}"
                 try:
-                    response = requests.get(url, headers=headers)
+                    response = cliente_http.get(url, headers=headers)
                     if response.status_code != 200:
                         print(f"  ❌ Fim dos dados para esta temporada (ou erro {response.status_code}).")
                         break # Encerra o loop desta temporada
@@ -100,15 +98,12 @@ def main():
                 except Exception as e:
                     print(f"  ❌ ERRO de conexão: {e}"); return
 
-            if dados_completos_liga:
-                df_liga = pd.DataFrame(dados_completos_liga)
-                df_principal = pd.concat([df_principal, df_liga], ignore_index=True)
-                df_principal.drop_duplicates(subset=['Date', 'HomeTeam', 'AwayTeam'], inplace=True, keep='last')
+            # O índice de chaves pula os jogos que já estão no arquivo.
+            gravados = anexar_partidas(ARQUIVO_SAIDA_CSV, dados_completos_liga)
 
             estado['processados'].append(id_unico)
             salvar_estado(estado)
-            df_principal.to_csv(ARQUIVO_SAIDA_CSV, index=False)
-            print(f"💾 Dados de {liga_info['nome_liga']} {ano} salvos. Banco de dados agora com {len(df_principal)} jogos.")
+            print(f"💾 Dados de {liga_info['nome_liga']} {ano} salvos. {gravados} jogos novos no banco de dados.")
 
     print("\n--------------------------------------------------")
     print("🎉 Processo de construção concluído!")
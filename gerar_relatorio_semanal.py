@@ -1,5 +1,6 @@
 import os
-import requests
+import cliente_http
+from cliente_http import URL_TELEGRAM
 import json
 from datetime import datetime, timezone, timedelta
 
@@ -24,9 +25,9 @@ def enviar_alerta_telegram(mensagem):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID: return
     caracteres_especiais = ['_', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
     for char in caracteres_especiais: mensagem = mensagem.replace(char, f'\\{char}')
-    url, payload = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage", {'chat_id': TELEGRAM_CHAT_ID, 'text': mensagem, 'parse_mode': 'MarkdownV2'}
+    url, payload = f"{URL_TELEGRAM}/bot{TELEGRAM_TOKEN}/sendMessage", {'chat_id': TELEGRAM_CHAT_ID, 'text': mensagem, 'parse_mode': 'MarkdownV2'}
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = cliente_http.post(url, json=payload, timeout=10)
         if response.status_code == 200: print("  > Mensagem enviada com sucesso para o Telegram!")
         else: print(f"  > ERRO ao enviar para o Telegram: {response.status_code} - {response.text}")
     except Exception as e: print(f"  > ERRO de conexão com o Telegram: {e}")
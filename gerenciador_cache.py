@@ -1,55 +1,273 @@
-# gerenciador_cache.py (Versão à Prova de Falhas)
+# gerenciador_cache.py (Versão SQLite - Arquivo Único)
 
 import json
-from datetime import datetime, timedelta
 import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
 
-def salvar_cache(nome_arquivo, dados):
+import metricas
+
+# --- CONFIGURAÇÕES DO CACHE ---
+ARQUIVO_BANCO_CACHE = 'cache.sqlite3'
+TAMANHO_MAXIMO_CACHE_BYTES = 50 * 1024 * 1024
+TAMANHO_MINIMO_COMPRESSAO_BYTES = 4 * 1024
+# Entradas mantidas na memória do processo (LRU); o resto continua só no banco.
+MAXIMO_ENTRADAS_MEMORIA = 256
+
+_conexao = None
+_trava = threading.Lock()
+# Memória do processo (LRU): {chave: (salvo_em, expira_em, dados)}. Os dados são compartilhados, não copiados:
+# quem lê o cache não deve alterar o que recebeu (copie antes de mexer).
+_memoria = OrderedDict()
+_atualizacoes_em_andamento = set()
+
+def _obter_conexao():
+    """Conexão única (protegida por trava), aberta na primeira utilização do cache."""
+    global _conexao
+    if _conexao is None:
+        _conexao = sqlite3.connect(ARQUIVO_BANCO_CACHE, timeout=30, check_same_thread=False, isolation_level=None)
+        _conexao.execute('PRAGMA journal_mode=WAL')
+        _conexao.execute('PRAGMA synchronous=NORMAL')
+        _conexao.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                chave TEXT PRIMARY KEY,
+                salvo_em REAL NOT NULL,
+                expira_em REAL,
+                ultimo_acesso REAL NOT NULL,
+                comprimido INTEGER NOT NULL,
+                tamanho INTEGER NOT NULL,
+                dados BLOB NOT NULL
+            )
+        """)
+        _conexao.execute('CREATE INDEX IF NOT EXISTS idx_cache_ultimo_acesso ON cache (ultimo_acesso)')
+    return _conexao
+
+def _serializar(dados):
+    conteudo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+    if len(conteudo) >= TAMANHO_MINIMO_COMPRESSAO_BYTES:
+        return zlib.compress(conteudo), 1
+    return conteudo, 0
+
+def _desserializar(conteudo, comprimido):
+    if comprimido:
+        conteudo = zlib.decompress(conteudo)
+    return json.loads(conteudo.decode('utf-8'))
+
+def _lembrar(nome_arquivo, entrada):
+    _memoria[nome_arquivo] = entrada
+    _memoria.move_to_end(nome_arquivo)
+    while len(_memoria) > MAXIMO_ENTRADAS_MEMORIA:
+        _memoria.popitem(last=False)
+
+def _despejar_lru(conexao):
+    """Remove as entradas usadas há mais tempo até o cache voltar ao tamanho máximo."""
+    total = conexao.execute('SELECT COALESCE(SUM(tamanho), 0) FROM cache').fetchone()[0]
+    if total <= TAMANHO_MAXIMO_CACHE_BYTES:
+        return
+    removidas = 0
+    for chave, tamanho in conexao.execute('SELECT chave, tamanho FROM cache ORDER BY ultimo_acesso ASC').fetchall():
+        if total <= TAMANHO_MAXIMO_CACHE_BYTES:
+            break
+        conexao.execute('DELETE FROM cache WHERE chave = ?', (chave,))
+        _memoria.pop(chave, None)
+        total -= tamanho
+        removidas += 1
+    print(f"  -> 🧹 Cache acima do limite: {removidas} entradas menos usadas foram removidas.")
+
+def _gravar(conexao, nome_arquivo, dados, salvo_em, validade_em_horas=None):
+    conteudo, comprimido = _serializar(dados)
+    expira_em = salvo_em + validade_em_horas * 3600 if validade_em_horas is not None else None
+    conexao.execute(
+        'INSERT OR REPLACE INTO cache (chave, salvo_em, expira_em, ultimo_acesso, comprimido, tamanho, dados) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (nome_arquivo, salvo_em, expira_em, time.time(), comprimido, len(conteudo), sqlite3.Binary(conteudo))
+    )
+
+def _importar_arquivo_legado(conexao, nome_arquivo):
+    """Migra para o banco um cache antigo salvo como arquivo JSON solto na pasta principal."""
+    if not os.path.exists(nome_arquivo):
+        return False
+    try:
+        with open(nome_arquivo, 'r', encoding='utf-8') as f:
+            cache_data = json.load(f)
+        timestamp_str, dados = cache_data.get('timestamp'), cache_data.get('dados')
+        if timestamp_str and dados is not None:
+            _gravar(conexao, nome_arquivo, dados, datetime.fromisoformat(timestamp_str).timestamp())
+        os.remove(nome_arquivo)
+        return True
+    except (json.JSONDecodeError, ValueError, AttributeError, OSError) as e:
+        print(f"  -> AVISO: Cache antigo '{nome_arquivo}' inválido e ignorado: {e}")
+        return False
+
+def salvar_cache(nome_arquivo, dados, validade_em_horas=None):
     """
-    Salva os dados em um arquivo JSON na pasta principal do projeto.
+    Salva os dados no cache (banco SQLite único) sob a chave `nome_arquivo`.
+    `validade_em_horas` opcional define um prazo próprio para a entrada, além do informado na leitura.
     """
-    cache_data = {
-        'timestamp': datetime.now().isoformat(),
-        'dados': dados
-    }
-    
     try:
-        with open(nome_arquivo, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=4)
-        print(f"  -> ✅ Cache '{nome_arquivo}' salvo com sucesso na pasta principal.")
+        with _trava:
+            conexao = _obter_conexao()
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                salvo_em = time.time()
+                with metricas.etapa('cache_gravacao'):
+                    _gravar(conexao, nome_arquivo, dados, salvo_em, validade_em_horas)
+                    _despejar_lru(conexao)
+                    conexao.execute('COMMIT')
+            except Exception:
+                conexao.execute('ROLLBACK')
+                raise
+            # Se o próprio despejo removeu a entrada (maior que o limite sozinha), ela também não fica na memória.
+            if conexao.execute('SELECT 1 FROM cache WHERE chave = ?', (nome_arquivo,)).fetchone():
+                _lembrar(nome_arquivo, (salvo_em, salvo_em + validade_em_horas * 3600 if validade_em_horas is not None else None, dados))
+        print(f"  -> ✅ Cache '{nome_arquivo}' salvo com sucesso.")
     except Exception as e:
-        print(f"  -> ❌ ERRO ao salvar o arquivo de cache '{nome_arquivo}': {e}")
+        print(f"  -> ❌ ERRO ao salvar o cache '{nome_arquivo}': {e}")
+
+def _ler_entradas(nomes_arquivos):
+    """Busca as entradas primeiro na memória do processo e, o que faltar, no banco (já desserializado)."""
+    entradas = {}
+    for nome in nomes_arquivos:
+        if nome in _memoria:
+            _memoria.move_to_end(nome)
+            entradas[nome] = _memoria[nome]
+    faltantes = [nome for nome in nomes_arquivos if nome not in entradas]
+    metricas.incrementar('cache_leituras', len(entradas), origem='memoria')
+    if not faltantes:
+        return entradas
+    metricas.incrementar('cache_leituras', len(faltantes), origem='sqlite')
+    conexao = _obter_conexao()
+    marcadores = ','.join('?' * len(faltantes))
+    consulta = f'SELECT chave, salvo_em, expira_em, comprimido, dados FROM cache WHERE chave IN ({marcadores})'
+    linhas = {linha[0]: linha for linha in conexao.execute(consulta, faltantes).fetchall()}
+    legados = [nome for nome in faltantes if nome not in linhas and _importar_arquivo_legado(conexao, nome)]
+    if legados:
+        linhas.update({linha[0]: linha for linha in conexao.execute(consulta, legados).fetchall()})
+    for nome, (_, salvo_em, expira_em, comprimido, conteudo) in linhas.items():
+        try:
+            entradas[nome] = (salvo_em, expira_em, _desserializar(conteudo, comprimido))
+            _lembrar(nome, entradas[nome])
+        except (json.JSONDecodeError, UnicodeDecodeError, zlib.error) as e:
+            print(f"  -> ERRO ou cache inválido ao ler '{nome}': {e}")
+    return entradas
+
+def _entrada_valida(entrada, validade_em_horas, agora):
+    salvo_em, expira_em, _ = entrada
+    if expira_em is not None and agora >= expira_em:
+        return False
+    return agora - salvo_em < validade_em_horas * 3600
+
+def _marcar_acesso(nomes_arquivos, agora):
+    _obter_conexao().executemany('UPDATE cache SET ultimo_acesso = ? WHERE chave = ?', [(agora, nome) for nome in nomes_arquivos])
 
+def _ler_entrada(nome_arquivo, validade_em_horas):
+    """
+    Uma leitura da entrada, sem contar métricas. Retorna (entrada, valida); a entrada é None se não existir
+    (ou não puder ser lida). Entradas válidas têm o último acesso atualizado.
+    """
+    try:
+        with _trava:
+            entrada = _ler_entradas([nome_arquivo]).get(nome_arquivo)
+            if entrada is None:
+                return None, False
+            agora = time.time()
+            valida = _entrada_valida(entrada, validade_em_horas, agora)
+            if valida:
+                _marcar_acesso([nome_arquivo], agora)
+            return entrada, valida
+    except sqlite3.Error as e:
+        print(f"  -> ERRO ou cache inválido ao ler '{nome_arquivo}': {e}")
+        return None, False
 
 def ler_cache(nome_arquivo, validade_em_horas):
     """
-    Lê o cache. Se o arquivo não existir ou os dados estiverem expirados,
-    retorna None. Caso contrário, retorna os dados.
+    Lê o cache. Se a entrada não existir ou os dados estiverem expirados,
+    retorna None. Caso contrário, retorna os dados (compartilhados com o cache: não alterar).
     """
-    if not os.path.exists(nome_arquivo):
+    entrada, valida = _ler_entrada(nome_arquivo, validade_em_horas)
+    if entrada is None:
+        metricas.incrementar('cache', resultado='ausente')
         return None
+    if not valida:
+        metricas.incrementar('cache', resultado='expirado')
+        print(f"  -> Cache expirado para '{nome_arquivo}'.")
+        return None
+    metricas.incrementar('cache', resultado='acerto')
+    print(f"  -> Dados encontrados em cache válido: '{nome_arquivo}'")
+    return entrada[2]
 
+def get_many(nomes_arquivos, validade_em_horas):
+    """Lê várias entradas numa única consulta. Retorna {nome: dados} apenas com as entradas válidas."""
+    nomes_arquivos = list(dict.fromkeys(nomes_arquivos))
+    if not nomes_arquivos:
+        return {}
+    encontrados = {}
     try:
-        with open(nome_arquivo, 'r', encoding='utf-8') as f:
-            cache_data = json.load(f)
-            
-            timestamp_str = cache_data.get('timestamp')
-            dados = cache_data.get('dados')
-            
-            if not timestamp_str or dados is None:
-                return None
-
-            timestamp_cache = datetime.fromisoformat(timestamp_str)
-            
-            if datetime.now() - timestamp_cache < timedelta(hours=validade_em_horas):
-                print(f"  -> Dados encontrados em cache válido: '{nome_arquivo}'")
-                return dados
-            else:
-                print(f"  -> Cache expirado para '{nome_arquivo}'.")
-                os.remove(nome_arquivo)
-                print(f"  -> Cache antigo '{nome_arquivo}' removido.")
-                return None
-                
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        print(f"  -> ERRO ou cache inválido ao ler '{nome_arquivo}': {e}")
-        return None
+        with _trava:
+            entradas = _ler_entradas(nomes_arquivos)
+            agora = time.time()
+            encontrados = {nome: entrada[2] for nome, entrada in entradas.items() if _entrada_valida(entrada, validade_em_horas, agora)}
+            _marcar_acesso(encontrados, agora)
+        metricas.incrementar('cache', len(encontrados), resultado='acerto')
+        metricas.incrementar('cache', len(nomes_arquivos) - len(encontrados), resultado='ausente')
+    except sqlite3.Error as e:
+        print(f"  -> ERRO ao ler o cache em lote: {e}")
+    print(f"  -> Cache em lote: {len(encontrados)}/{len(nomes_arquivos)} entradas válidas.")
+    return encontrados
+
+def _atualizar_em_segundo_plano(nome_arquivo, funcao_atualizacao):
+    def _executar():
+        try:
+            funcao_atualizacao()
+        except Exception as e:
+            print(f"  -> ❌ ERRO na atualização em segundo plano de '{nome_arquivo}': {e}")
+        finally:
+            with _trava:
+                _atualizacoes_em_andamento.discard(nome_arquivo)
+
+    with _trava:
+        if nome_arquivo in _atualizacoes_em_andamento:
+            return
+        _atualizacoes_em_andamento.add(nome_arquivo)
+    # Thread não-daemon: um processo curto (cron) espera a atualização terminar antes de sair.
+    threading.Thread(target=_executar, name=f'atualiza-{nome_arquivo}').start()
+
+def ler_cache_ou_atualizar(nome_arquivo, validade_em_horas, funcao_atualizacao, tolerancia_horas=0):
+    """
+    Stale-while-revalidate: devolve o cache válido; se ele venceu há menos de `tolerancia_horas`,
+    devolve o dado vencido na hora e dispara `funcao_atualizacao()` em segundo plano; sem cache
+    aproveitável, chama `funcao_atualizacao()` e devolve o seu retorno.
+    `funcao_atualizacao` é responsável por buscar os dados novos e gravá-los com salvar_cache.
+    """
+    # Uma leitura só, com a janela estendida pela tolerância, e um único resultado contado nas métricas.
+    entrada, aproveitavel = _ler_entrada(nome_arquivo, validade_em_horas + max(tolerancia_horas, 0))
+    if aproveitavel and _entrada_valida(entrada, validade_em_horas, time.time()):
+        metricas.incrementar('cache', resultado='acerto')
+        print(f"  -> Dados encontrados em cache válido: '{nome_arquivo}'")
+        return entrada[2]
+    if aproveitavel:
+        metricas.incrementar('cache', resultado='vencido_servido')
+        print(f"  -> ♻️ Usando cache vencido de '{nome_arquivo}' enquanto ele é atualizado em segundo plano.")
+        _atualizar_em_segundo_plano(nome_arquivo, funcao_atualizacao)
+        return entrada[2]
+    metricas.incrementar('cache', resultado='ausente' if entrada is None else 'expirado')
+    if entrada is not None:
+        print(f"  -> Cache expirado para '{nome_arquivo}'.")
+    return funcao_atualizacao()
+
+def limpar_memoria():
+    """Esvazia a memória do processo; as entradas continuam no banco e são relidas de lá."""
+    with _trava:
+        _memoria.clear()
+
+def fechar_cache():
+    """Fecha a conexão com o banco e esvazia a memória. O próximo uso reabre ARQUIVO_BANCO_CACHE (que pode ter mudado)."""
+    global _conexao
+    with _trava:
+        if _conexao is not None:
+            _conexao.close()
+            _conexao = None
+        _memoria.clear()
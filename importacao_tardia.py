@@ -0,0 +1,86 @@
+# importacao_tardia.py (Importação Tardia de Dependências Pesadas + Relatório de Tempo de Importação)
+
+import importlib
+import os
+import subprocess
+import sys
+import threading
+
+LINHAS_RELATORIO_PADRAO = 15
+
+class ModuloTardio:
+    """
+    Representa um módulo que só é importado no primeiro acesso a um atributo (ex.: `pd.DataFrame`).
+    A importação é protegida por trava, então pode acontecer pela primeira vez dentro de threads.
+    Depois de carregado, os atributos do módulo são copiados para o objeto e o acesso fica direto.
+    """
+
+    def __init__(self, nome):
+        self.__dict__['_nome'] = nome
+        self.__dict__['_trava'] = threading.Lock()
+        self.__dict__['_modulo'] = None
+
+    def _carregar(self):
+        with self._trava:
+            if self._modulo is None:
+                modulo = importlib.import_module(self._nome)
+                self.__dict__.update(modulo.__dict__)
+                self.__dict__['_modulo'] = modulo
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._modulo or self._carregar(), atributo)
+
+    def __repr__(self):
+        estado = 'carregado' if self._modulo is not None else 'não carregado'
+        return f"<ModuloTardio '{self._nome}' ({estado})>"
+
+def importar_tardio(nome):
+    """`pd = importar_tardio('pandas')`: o módulo real já importado, ou um ModuloTardio que importa no primeiro uso."""
+    return sys.modules.get(nome) or ModuloTardio(nome)
+
+def medir_importacao(modulo, ambiente=None):
+    """
+    Importa `modulo` num processo novo com `-X importtime` e devolve (total_us, linhas) da subárvore de
+    `modulo`, onde cada linha é (modulo, proprio_us, acumulado_us, profundidade), na ordem do Python.
+    """
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        capture_output=True, text=True, env={**os.environ, **(ambiente or {})},
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falha ao importar '{modulo}': {resultado.stderr.strip().splitlines()[-1]}")
+    linhas = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, acumulado, nome = linha[len('import time:'):].split('|')
+        linhas.append((nome.strip(), int(proprio), int(acumulado), (len(nome) - len(nome.lstrip())) // 2))
+    # O -X importtime lista os filhos antes do pai: a subárvore do módulo são as linhas aninhadas logo acima dele.
+    fim = next((i for i, (nome, _, _, profundidade) in enumerate(linhas) if nome == modulo and profundidade == 0), None)
+    if fim is None:
+        return 0, []
+    inicio = fim
+    while inicio > 0 and linhas[inicio - 1][3] > 0:
+        inicio -= 1
+    return linhas[fim][2], linhas[inicio:fim + 1]
+
+def imprimir_relatorio(modulo, num_linhas=LINHAS_RELATORIO_PADRAO, ambiente=None):
+    total, linhas = medir_importacao(modulo, ambiente)
+    print(f"\n--- ⏱️  Importação de '{modulo}': {total / 1000:.1f} ms ---")
+    print("  -> Dependências diretas e indiretas com maior tempo acumulado:")
+    for nome, proprio, acumulado, profundidade in sorted(linhas, key=lambda linha: -linha[2])[1:num_linhas + 1]:
+        print(f"     {acumulado / 1000:8.1f} ms (próprio {proprio / 1000:6.1f} ms)  {'  ' * profundidade}{nome}")
+    return total
+
+if __name__ == "__main__":
+    # Uso: python importacao_tardia.py [modulo ...]   (padrão: os pontos de entrada dos workflows)
+    modulos = sys.argv[1:] or ['main', 'gerar_relatorio_semanal', 'manutencao', 'servico_bot']
+    # Chaves fictícias só para módulos que leem configuração na importação não falharem durante a medição.
+    ambiente = {chave: os.environ.get(chave, 'medicao') for chave in ['API_KEY_FOOTBALL', 'API_KEY_ODDS', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID']}
+    for modulo in modulos:
+        try:
+            imprimir_relatorio(modulo, ambiente=ambiente)
+        except RuntimeError as e:
+            print(f"  -> ❌ {e}")
@@ -1,20 +1,29 @@
 # main.py (Versão de Teste - Sem The Rundown)
 
-import requests
-import pandas as pd
-from thefuzz import fuzz
+import cliente_http
+import metricas
+from cliente_http import URL_TELEGRAM
 import json
 from datetime import datetime, timezone, timedelta, date
 import os
-import csv
+import sys
+import time
 import traceback
 
-from estrategias import *
+from estrategias import (
+    analisar_favorito_forte_fora, analisar_valor_mandante_azarao, analisar_valor_visitante_azarao,
+    analisar_empate_valorizado, analisar_forma_recente_casa, analisar_forma_recente_fora
+)
 from api_externa import (
     buscar_jogos_api_football, buscar_odds_the_odds_api,
-    verificar_resultado_api_football, buscar_estatisticas_time,
+    verificar_resultados_api_football, buscar_estatisticas_times_em_lote,
     buscar_resultados_por_ids
 )
+from pareamento_odds import parear_jogos_com_odds
+from tabela_odds import construir_tabela_odds
+from armazem_historico import anexar_partidas
+from estatisticas_historicas import carregar_contexto_estatistico
+from avaliador_estrategias import avaliar_jogos_em_lote
 
 # --- ARQUIVOS E CONSTANTES ---
 ARQUIVO_HISTORICO_CORRIGIDO = 'dados_historicos_corrigido.csv'
@@ -25,7 +34,12 @@ ARQUIVO_JOGOS_DIA = 'jogos_a_acompanhar.json'
 ARQUIVO_ENTRADAS_ENVIADAS = 'entradas_enviadas.json'
 ODD_MINIMA = 1.40
 ODD_MAXIMA = 2.00
+ESTRATEGIAS_ATIVAS = [func.__name__ for func in (
+    analisar_favorito_forte_fora, analisar_valor_mandante_azarao, analisar_valor_visitante_azarao,
+    analisar_empate_valorizado, analisar_forma_recente_casa, analisar_forma_recente_fora
+)]
 
+@metricas.etapa('envio_telegram')
 def enviar_alerta_telegram(mensagem, telegram_token, telegram_chat_id):
     if not telegram_token or not telegram_chat_id:
         print("  -> AVISO: Tokens do Telegram não configurados nos Secrets.")
@@ -34,10 +48,10 @@ def enviar_alerta_telegram(mensagem, telegram_token, telegram_chat_id):
     for char in caracteres_especiais:
         mensagem = mensagem.replace(char, f'\\{char}')
     
-    url = f"https://api.telegram.org/bot{telegram_token}/sendMessage"
+    url = f"{URL_TELEGRAM}/bot{telegram_token}/sendMessage"
     payload = {'chat_id': telegram_chat_id, 'text': mensagem, 'parse_mode': 'MarkdownV2'}
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = cliente_http.post(url, json=payload, timeout=10)
         if response.status_code == 200:
             print("  > Mensagem enviada com sucesso para o Telegram!")
         else:
@@ -52,6 +66,23 @@ def carregar_json(nome_arquivo, valor_padrao):
     except (FileNotFoundError, json.JSONDecodeError):
         return valor_padrao
 
+# Arquivos só de leitura mantidos em memória entre ciclos do modo serviço: {nome: ((tamanho, mtime), dados)}.
+_arquivos_residentes = {}
+
+def carregar_json_residente(nome_arquivo, valor_padrao):
+    """Como carregar_json, mas só relê o arquivo se o tamanho/mtime mudou desde a última leitura."""
+    try:
+        info = os.stat(nome_arquivo)
+    except FileNotFoundError:
+        return valor_padrao
+    assinatura = (info.st_size, info.st_mtime_ns)
+    residente = _arquivos_residentes.get(nome_arquivo)
+    if residente and residente[0] == assinatura:
+        return residente[1]
+    dados = carregar_json(nome_arquivo, valor_padrao)
+    _arquivos_residentes[nome_arquivo] = (assinatura, dados)
+    return dados
+
 def salvar_json(dados, nome_arquivo):
     with open(nome_arquivo, 'w', encoding='utf-8') as f:
         json.dump(dados, f, indent=4, ensure_ascii=False)
@@ -65,6 +96,7 @@ def determinar_resultado(aposta, placar_casa, placar_fora):
     if mercado == 'Empate': return 'GREEN' if placar_casa == placar_fora else 'RED'
     return 'INDEFINIDO'
 
+@metricas.etapa('atualizar_historico')
 def atualizar_historico_local(api_keys):
     print("\n--- 💾 Verificando se há histórico para atualizar... ---")
     jogos_para_atualizar = carregar_json(ARQUIVO_JOGOS_DIA, {"data": "", "jogos": []})
@@ -83,30 +115,30 @@ def atualizar_historico_local(api_keys):
             gols_casa = jogo.get('goals', {}).get('home')
             gols_fora = jogo.get('goals', {}).get('away')
             if gols_casa is None or gols_fora is None: continue
-            data_jogo = datetime.fromtimestamp(jogo['fixture']['timestamp']).strftime('%d/%m/%Y')
+            data_jogo = datetime.fromtimestamp(jogo['fixture']['timestamp'])
             resultado_final = 'D'
             if gols_casa > gols_fora: resultado_final = 'H'
             elif gols_fora > gols_casa: resultado_final = 'A'
-            novas_linhas_csv.append({'Date': data_jogo, 'HomeTeam': jogo['teams']['home']['name'], 'AwayTeam': jogo['teams']['away']['name'], 'FTHG': gols_casa, 'FTAG': gols_fora, 'FTR': resultado_final})
+            novas_linhas_csv.append({'Date': data_jogo, 'League': jogo.get('league', {}).get('name', ''), 'HomeTeam': jogo['teams']['home']['name'], 'AwayTeam': jogo['teams']['away']['name'], 'FTHG': gols_casa, 'FTAG': gols_fora, 'FTR': resultado_final})
     if novas_linhas_csv:
         try:
-            fieldnames = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR']
-            with open(ARQUIVO_HISTORICO_CORRIGIDO, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                if f.tell() == 0: writer.writeheader()
-                for linha in novas_linhas_csv:
-                    writer.writerow({key: linha.get(key, '') for key in fieldnames})
-            print(f"  -> ✅ Histórico atualizado com {len(novas_linhas_csv)} novos resultados!")
+            # Segue o cabeçalho do CSV (as colunas ficam alinhadas), pula jogos que já estão nele (rodar de novo
+            # não duplica linhas) e acrescenta as linhas também ao armazém colunar.
+            gravados = anexar_partidas(ARQUIVO_HISTORICO_CORRIGIDO, novas_linhas_csv)
+            print(f"  -> ✅ Histórico atualizado com {gravados} novos resultados!")
         except Exception as e: print(f"  -> ❌ ERRO ao escrever no arquivo CSV: {e}")
     salvar_json({"data": data_hoje_str, "jogos": []}, ARQUIVO_JOGOS_DIA)
 
+@metricas.etapa('verificar_pendentes')
 def verificar_apostas_pendentes(api_key_football, telegram_config):
     print("\n--- 🔄 Verificando apostas pendentes... ---")
     apostas_pendentes = carregar_json(ARQUIVO_PENDENTES, []); historico = carregar_json(ARQUIVO_HISTORICO, [])
     if not apostas_pendentes: print("  -> Nenhuma aposta pendente para verificar."); return
+    # Uma chamada a cada 20 apostas (ids= da API-Football) em vez de uma chamada por aposta.
+    resultados = verificar_resultados_api_football(api_key_football, [aposta['id_partida'] for aposta in apostas_pendentes])
     apostas_ainda_pendentes = []
     for aposta in apostas_pendentes:
-        status, placar_casa, placar_fora = verificar_resultado_api_football(api_key_football, aposta['id_partida'])
+        status, placar_casa, placar_fora = resultados.get(str(aposta['id_partida']), ("erro", None, None))
         if status == "encerrado":
             resultado = determinar_resultado(aposta, placar_casa, placar_fora)
             if resultado != 'INDEFINIDO':
@@ -120,53 +152,16 @@ def verificar_apostas_pendentes(api_key_football, telegram_config):
         else: apostas_ainda_pendentes.append(aposta)
     salvar_json(apostas_ainda_pendentes, ARQUIVO_PENDENTES); salvar_json(historico, ARQUIVO_HISTORICO)
 
-def calcular_estatisticas_historicas(df):
-    if df.empty: return {}, {}, {}
-    cols_stats = ['FTHG', 'FTAG', 'HC', 'AC', 'HS', 'AS', 'HST', 'AST', 'HY', 'AY', 'HR', 'AR']
-    for col in cols_stats:
-        if col in df.columns: df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        else: df[col] = 0
-    df.dropna(subset=['HomeTeam', 'AwayTeam', 'Date'], inplace=True)
-    try:
-        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
-        df.dropna(subset=['Date'], inplace=True)
-        df.sort_values(by='Date', inplace=True)
-    except Exception:
-        print(" -> ERRO: Falha ao converter a coluna de datas."); return {}, {}, {}
-    df['ResultadoCasa'] = df.apply(lambda r: 'V' if r['FTHG'] > r['FTAG'] else ('E' if r['FTHG'] == r['FTAG'] else 'D'), axis=1)
-    df['ResultadoFora'] = df.apply(lambda r: 'V' if r['FTAG'] > r['FTHG'] else ('E' if r['FTAG'] == r['FTHG'] else 'D'), axis=1)
-    print("  -> 📊 Pré-calculando estatísticas gerais e de forma recente...")
-    forma_recente = {}
-    for index, row in df.iterrows():
-        time_casa, time_fora = row['HomeTeam'], row['AwayTeam']
-        if time_casa not in forma_recente: forma_recente[time_casa] = []
-        if time_fora not in forma_recente: forma_recente[time_fora] = []
-        forma_recente[time_casa].insert(0, row['ResultadoCasa'])
-        forma_recente[time_fora].insert(0, row['ResultadoFora'])
-        if len(forma_recente[time_casa]) > 5: forma_recente[time_casa].pop()
-        if len(forma_recente[time_fora]) > 5: forma_recente[time_fora].pop()
-    stats_casa = df.groupby('HomeTeam').agg(avg_gols_marcados_casa=('FTHG', 'mean'), avg_gols_sofridos_casa=('FTAG', 'mean'), total_jogos_casa=('HomeTeam', 'count'))
-    stats_fora = df.groupby('AwayTeam').agg(avg_gols_marcados_fora=('FTAG', 'mean'), avg_gols_sofridos_fora=('FTHG', 'mean'), total_jogos_fora=('AwayTeam', 'count'))
-    vitorias_casa = df[df['ResultadoCasa'] == 'V'].groupby('HomeTeam').size().rename('vitorias_casa')
-    empates_casa = df[df['ResultadoCasa'] == 'E'].groupby('HomeTeam').size().rename('empates_casa')
-    derrotas_casa = df[df['ResultadoCasa'] == 'D'].groupby('HomeTeam').size().rename('derrotas_casa')
-    vitorias_fora = df[df['ResultadoFora'] == 'V'].groupby('AwayTeam').size().rename('vitorias_fora')
-    empates_fora = df[df['ResultadoFora'] == 'E'].groupby('AwayTeam').size().rename('empates_fora')
-    derrotas_fora = df[df['ResultadoFora'] == 'D'].groupby('AwayTeam').size().rename('derrotas_fora')
-    stats_individuais = pd.concat([stats_casa, stats_fora, vitorias_casa, empates_casa, derrotas_casa, vitorias_fora, empates_fora, derrotas_fora], axis=1).fillna(0)
-    stats_individuais['perc_vitorias_casa'] = (stats_individuais['vitorias_casa'] / stats_individuais['total_jogos_casa']) * 100
-    stats_individuais['perc_derrotas_casa'] = (stats_individuais['derrotas_casa'] / stats_individuais['total_jogos_casa']) * 100
-    stats_individuais['perc_empates_casa'] = (stats_individuais['empates_casa'] / stats_individuais['total_jogos_casa']) * 100
-    stats_individuais['perc_vitorias_fora'] = (stats_individuais['vitorias_fora'] / stats_individuais['total_jogos_fora']) * 100
-    stats_individuais['perc_derrotas_fora'] = (stats_individuais['derrotas_fora'] / stats_individuais['total_jogos_fora']) * 100
-    stats_individuais['perc_empates_fora'] = (stats_individuais['empates_fora'] / stats_individuais['total_jogos_fora']) * 100
-    stats_individuais = stats_individuais.to_dict('index')
-    df['TotalGols'] = df['FTHG'] + df['FTAG']
-    df['H2H_Key'] = df.apply(lambda row: '|'.join(sorted([str(row['HomeTeam']), str(row['AwayTeam'])])), axis=1)
-    stats_h2h = df.groupby('H2H_Key').agg(avg_gols_h2h=('TotalGols', 'mean'), total_jogos_h2h=('H2H_Key', 'count')).to_dict('index')
-    print(f"  -> Estatísticas para {len(stats_individuais)} times e {len(stats_h2h)} confrontos calculadas.")
-    return stats_individuais, stats_h2h, forma_recente
+def _registrar_erro_no_jogo(jogo, e):
+    print(f"  -> ‼️ ERRO INESPERADO E GRAVE na análise do jogo {jogo.get('home_team')} vs {jogo.get('away_team')}.")
+    print(f"     TIPO DE ERRO: {type(e).__name__}")
+    print(f"     MENSAGEM: {e}")
+    print("     RASTREAMENTO COMPLETO DO ERRO (CAIXA-PRETA):")
+    traceback.print_exc()
+    print("     -------------------------------------------")
+    print("     Pulando para o próximo jogo...")
 
+@metricas.etapa('ciclo_analise')
 def rodar_analise_completa(api_keys, telegram_config):
     atualizar_historico_local(api_keys)
     verificar_apostas_pendentes(api_keys['football'], telegram_config)
@@ -184,13 +179,15 @@ def rodar_analise_completa(api_keys, telegram_config):
     if not jogos_principais: print("Nenhum jogo novo encontrado."); return
     
     jogos_com_odds = buscar_odds_the_odds_api(api_keys['odds'])
-    contexto = {}
+    with metricas.etapa('tabela_odds'):
+        tabela_odds = construir_tabela_odds(jogos_com_odds)
+    contexto = {'tabela_odds': tabela_odds}
     try:
-        df_historico = pd.read_csv(ARQUIVO_HISTORICO_CORRIGIDO, low_memory=False)
-        stats_i, stats_h, forma_r = calcular_estatisticas_historicas(df_historico.copy())
+        with metricas.etapa('carregar_historico'):
+            stats_i, stats_h, forma_r = carregar_contexto_estatistico(ARQUIVO_HISTORICO_CORRIGIDO)
         contexto.update({"stats_individuais": stats_i, "stats_h2h": stats_h, "forma_recente": forma_r})
         print("  -> 🗺️  Carregando mapa de nomes (Master Team List)...")
-        mapa_de_nomes = carregar_json(ARQUIVO_MASTER_LIST, {})
+        mapa_de_nomes = carregar_json_residente(ARQUIVO_MASTER_LIST, {})
         if mapa_de_nomes:
             contexto['mapa_de_nomes'] = mapa_de_nomes
             print(f"  -> Mapa com {len(mapa_de_nomes)} times carregado com sucesso.")
@@ -199,93 +196,98 @@ def rodar_analise_completa(api_keys, telegram_config):
     except FileNotFoundError:
         print(f"  -> ⚠️ AVISO: Arquivo histórico '{ARQUIVO_HISTORICO_CORRIGIDO}' não encontrado."); return
         
+    jogos_novos = [jogo for jogo in jogos_principais if jogo.get('id_partida') not in ids_pendentes]
+    with metricas.etapa('pareamento'):
+        odds_por_jogo = parear_jogos_com_odds(jogos_novos, jogos_com_odds) if jogos_com_odds else {}
+
     print(f"\n--- 🔬 Analisando {len(jogos_principais)} jogos encontrados... ---")
-    lista_de_funcoes = [
-        analisar_favorito_forte_fora, analisar_valor_mandante_azarao, analisar_valor_visitante_azarao,
-        analisar_empate_valorizado, analisar_forma_recente_casa, analisar_forma_recente_fora
-    ]
-    for jogo in jogos_principais:
+    # Fase 1: triagem offline de todos os jogos (sem nenhuma chamada de rede), avaliada em lote.
+    # Dicts novos com as odds pareadas: os jogos que vieram do cache não são alterados.
+    jogos_pareados = []
+    for jogo in jogos_novos:
+        evento_odds = odds_por_jogo[jogo.get('id_partida')][0] if jogo.get('id_partida') in odds_por_jogo else {}
+        jogos_pareados.append({**jogo, 'bookmakers': evento_odds.get('bookmakers', []), 'id_evento_odds': evento_odds.get('id')})
+    jogos_novos = jogos_pareados
+    with metricas.etapa('avaliacao_estrategias'):
+        jogos_pre_aprovados, _ = avaliar_jogos_em_lote(jogos_novos, contexto, ESTRATEGIAS_ATIVAS)
+    metricas.incrementar('jogos_analisados', len(jogos_novos))
+    metricas.incrementar('jogos_pre_aprovados', len(jogos_pre_aprovados))
+    for jogo, aprovacoes in jogos_pre_aprovados:
+        print(f"\n--------------------------------------------------\nPré-Aprovado: {jogo.get('home_team')} vs {jogo.get('away_team')}")
+        if jogo.get('id_partida') in odds_por_jogo:
+            print(f"  -> Odds encontradas com {odds_por_jogo[jogo.get('id_partida')][1]}% de confiança.")
+        for _, resultado_offline in aprovacoes:
+            print(f"  -> 🔬 Pré-Aprovado pela estratégia '{resultado_offline['nome_estrategia']}' (análise offline).")
+
+    # Fase 2: busca concorrente (e sem repetição) das estatísticas online de todos os times pré-aprovados.
+    pares_time_liga = []
+    for jogo, _ in jogos_pre_aprovados:
+        pares_time_liga.extend([(jogo.get('home_team_id'), jogo.get('league_id')), (jogo.get('away_team_id'), jogo.get('league_id'))])
+    estatisticas_online = buscar_estatisticas_times_em_lote(api_keys['football'], pares_time_liga) if jogos_pre_aprovados else {}
+
+    # Fase 3: validação online e envio, usando apenas os dados já baixados.
+    inicio_validacao = time.perf_counter()
+    for jogo, aprovacoes in jogos_pre_aprovados:
         try:
             id_partida, time_casa, time_fora = jogo.get('id_partida'), jogo.get('home_team'), jogo.get('away_team')
-            if id_partida in ids_pendentes: continue
-            print(f"\n--------------------------------------------------\nAnalisando NOVO Jogo: {time_casa} vs {time_fora}")
-            
-            jogo['bookmakers'] = []
-            if jogos_com_odds:
-                melhor_match_odds, maior_pontuacao = None, 75
-                for jogo_odd in jogos_com_odds:
-                    if jogo_odd.get('home_team') and jogo_odd.get('away_team'):
-                        pontuacao = fuzz.token_set_ratio(f"{time_casa} {time_fora}", f"{jogo_odd['home_team']} {jogo_odd['away_team']}")
-                        if pontuacao > maior_pontuacao: maior_pontuacao, melhor_match_odds = pontuacao, jogo_odd
-                if isinstance(melhor_match_odds, dict):
-                    print(f"  -> Odds encontradas com {maior_pontuacao}% de confiança.")
-                    jogo['bookmakers'] = melhor_match_odds.get('bookmakers', [])
+            print(f"\n--------------------------------------------------\nValidando Jogo Pré-Aprovado: {time_casa} vs {time_fora}")
 
             oportunidade_encontrada = False
-            for func_estrategia in lista_de_funcoes:
-                resultado_offline = func_estrategia(jogo, contexto, debug=True)
+            for nome_funcao, resultado_offline in aprovacoes:
+                print(f"  -> 🌐 Validação online da estratégia '{resultado_offline['nome_estrategia']}'...")
+                stats_casa = estatisticas_online.get((jogo.get('home_team_id'), jogo.get('league_id')))
+                stats_fora = estatisticas_online.get((jogo.get('away_team_id'), jogo.get('league_id')))
+                validado_online = False
+                motivo_online = "Critérios de validação online não atendidos."
+                if stats_casa and stats_fora:
+                    forma_casa, forma_fora = stats_casa.get('forma', ''), stats_fora.get('forma', '')
+                    if resultado_offline['nome_estrategia'] == 'Empate Valorizado' and forma_casa.count('L') <= 1 and forma_fora.count('L') <= 1:
+                        validado_online = True
+                        motivo_online = f"Confirmado com forma recente estável (Casa: {forma_casa}, Fora: {forma_fora})."
+                
+                metricas.incrementar('validacoes_online', resultado='aprovado' if validado_online else 'reprovado')
+                if not validado_online:
+                    print(f"  -> ❌ Reprovado na validação online."); continue
+                print(f"  -> ✅ APROVADO na validação online!")
                 
-                if isinstance(resultado_offline, str):
-                    print(f"    - Estratégia '{func_estrategia.__name__}': {resultado_offline}")
+                id_unico_aposta = f"{id_partida}-{nome_funcao}"
+                if id_unico_aposta in ids_ja_enviados:
+                    print(f"  -> Oportunidade repetida. Ignorando."); continue
                 
-                elif isinstance(resultado_offline, dict) and resultado_offline.get('type') == 'pre_aprovado':
-                    print(f"  -> 🔬 Pré-Aprovado pela estratégia '{resultado_offline['nome_estrategia']}' (análise offline).")
-                    
-                    stats_casa = buscar_estatisticas_time(api_keys['football'], jogo['home_team_id'], jogo['league_id'])
-                    stats_fora = buscar_estatisticas_time(api_keys['football'], jogo['away_team_id'], jogo['league_id'])
-                    validado_online = False
-                    motivo_online = "Critérios de validação online não atendidos."
-                    if stats_casa and stats_fora:
-                        forma_casa, forma_fora = stats_casa.get('forma', ''), stats_fora.get('forma', '')
-                        if resultado_offline['nome_estrategia'] == 'Empate Valorizado' and forma_casa.count('L') <= 1 and forma_fora.count('L') <= 1:
-                            validado_online = True
-                            motivo_online = f"Confirmado com forma recente estável (Casa: {forma_casa}, Fora: {forma_fora})."
-                    
-                    if not validado_online:
-                        print(f"  -> ❌ Reprovado na validação online."); continue
-                    print(f"  -> ✅ APROVADO na validação online!")
-                    
-                    id_unico_aposta = f"{id_partida}-{func_estrategia.__name__}"
-                    if id_unico_aposta in ids_ja_enviados:
-                        print(f"  -> Oportunidade repetida. Ignorando."); continue
-                    
-                    oportunidade, odd, motivo_final = resultado_offline, _encontrar_odd_especifica(jogo, resultado_offline['mercado']), motivo_online
-                    mensagem = ""
-                    fuso_horario_br = timezone(timedelta(hours=-3))
-                    dt_objeto = datetime.fromtimestamp(jogo.get('timestamp', 0), tz=fuso_horario_br)
-                    data_hora_formatada = dt_objeto.strftime('%d/%m/%Y às %H:%M')
+                oportunidade, odd, motivo_final = resultado_offline, tabela_odds.preco(jogo.get('id_evento_odds'), resultado_offline['mercado']), motivo_online
+                mensagem = ""
+                fuso_horario_br = timezone(timedelta(hours=-3))
+                dt_objeto = datetime.fromtimestamp(jogo.get('timestamp', 0), tz=fuso_horario_br)
+                data_hora_formatada = dt_objeto.strftime('%d/%m/%Y às %H:%M')
 
-                    if odd and ODD_MINIMA <= odd <= ODD_MAXIMA:
-                        oportunidade_encontrada = True
-                        mensagem = f"*{oportunidade.get('emoji', '⚠️')} ENTRADA VALIDADA {oportunidade.get('emoji', '⚠️')}*\n\n*🗓️ DATA:* {data_hora_formatada}\n*⚽ JOGO:* {time_casa} vs {time_fora}\n*📈 MERCADO:* {oportunidade['mercado']}\n*📊 ODD ENCONTRADA:* *{odd:.2f}*\n\n*🔍 Análise:* _{motivo_final}_"
-                    elif not odd:
-                        oportunidade_encontrada = True
-                        mensagem = f"*{oportunidade.get('emoji', '⚠️')} ENTRADA VALIDADA (SEM ODD) {oportunidade.get('emoji', '⚠️')}*\n\n*🗓️ DATA:* {data_hora_formatada}\n*⚽ JOGO:* {time_casa} vs {time_fora}\n*📈 MERCADO SUGERIDO:* {oportunidade['mercado']}\n\n*🔍 Análise:* _{motivo_final}_\n\n_NOTA: Verifique a odd na sua casa de apostas e decida se a entrada tem valor._"
-                    
-                    if oportunidade_encontrada:
-                        novas_oportunidades_encontradas = True
-                        enviar_alerta_telegram(mensagem, telegram_config['token'], telegram_config['chat_id'])
-                        ids_ja_enviados.add(id_unico_aposta)
-                        diario_de_envio["enviadas_ids"] = list(ids_ja_enviados)
-                        salvar_json(diario_de_envio, ARQUIVO_ENTRADAS_ENVIADAS)
-                        nova_aposta = {'id_partida': id_partida, 'times': f"{time_casa} vs {time_fora}", 'mercado': oportunidade['mercado'], 'odd_entrada': odd, 'data_aposta': str(date.today())}
-                        apostas_pendentes.append(nova_aposta)
-                        salvar_json(apostas_pendentes, ARQUIVO_PENDENTES)
-                        print(f"  -> Oportunidade salva em '{ARQUIVO_PENDENTES}'.")
-                        break
+                if odd and ODD_MINIMA <= odd <= ODD_MAXIMA:
+                    oportunidade_encontrada = True
+                    mensagem = f"*{oportunidade.get('emoji', '⚠️')} ENTRADA VALIDADA {oportunidade.get('emoji', '⚠️')}*\n\n*🗓️ DATA:* {data_hora_formatada}\n*⚽ JOGO:* {time_casa} vs {time_fora}\n*📈 MERCADO:* {oportunidade['mercado']}\n*📊 ODD ENCONTRADA:* *{odd:.2f}*\n\n*🔍 Análise:* _{motivo_final}_"
+                elif not odd:
+                    oportunidade_encontrada = True
+                    mensagem = f"*{oportunidade.get('emoji', '⚠️')} ENTRADA VALIDADA (SEM ODD) {oportunidade.get('emoji', '⚠️')}*\n\n*🗓️ DATA:* {data_hora_formatada}\n*⚽ JOGO:* {time_casa} vs {time_fora}\n*📈 MERCADO SUGERIDO:* {oportunidade['mercado']}\n\n*🔍 Análise:* _{motivo_final}_\n\n_NOTA: Verifique a odd na sua casa de apostas e decida se a entrada tem valor._"
+                
+                if oportunidade_encontrada:
+                    novas_oportunidades_encontradas = True
+                    metricas.incrementar('oportunidades_enviadas')
+                    enviar_alerta_telegram(mensagem, telegram_config['token'], telegram_config['chat_id'])
+                    ids_ja_enviados.add(id_unico_aposta)
+                    diario_de_envio["enviadas_ids"] = list(ids_ja_enviados)
+                    salvar_json(diario_de_envio, ARQUIVO_ENTRADAS_ENVIADAS)
+                    nova_aposta = {'id_partida': id_partida, 'times': f"{time_casa} vs {time_fora}", 'mercado': oportunidade['mercado'], 'odd_entrada': odd, 'data_aposta': str(date.today())}
+                    apostas_pendentes.append(nova_aposta)
+                    salvar_json(apostas_pendentes, ARQUIVO_PENDENTES)
+                    print(f"  -> Oportunidade salva em '{ARQUIVO_PENDENTES}'.")
+                    break
             
             if not oportunidade_encontrada:
                 print("  -> Nenhuma oportunidade encontrada para este jogo após todas as análises.")
 
         except Exception as e:
-            print(f"  -> ‼️ ERRO INESPERADO E GRAVE na análise do jogo {jogo.get('home_team')} vs {jogo.get('away_team')}.")
-            print(f"     TIPO DE ERRO: {type(e).__name__}")
-            print(f"     MENSAGEM: {e}")
-            print("     RASTREAMENTO COMPLETO DO ERRO (CAIXA-PRETA):")
-            traceback.print_exc()
-            print("     -------------------------------------------")
-            print("     Pulando para o próximo jogo...")
+            _registrar_erro_no_jogo(jogo, e)
+            metricas.incrementar('erros_por_jogo')
             continue
+    metricas.registrar_tempo('validacao_online', time.perf_counter() - inicio_validacao)
 
     if not novas_oportunidades_encontradas:
         num_pendentes = len(carregar_json(ARQUIVO_PENDENTES, []))
@@ -295,7 +297,13 @@ def rodar_analise_completa(api_keys, telegram_config):
     
     print("\n--- Ciclo de análise finalizado. ---")
 
-if __name__ == "__main__":
+def rodar_liquidacao(api_keys, telegram_config):
+    """Só atualiza o histórico e liquida as apostas pendentes (não carrega pandas nem as estratégias)."""
+    atualizar_historico_local(api_keys)
+    verificar_apostas_pendentes(api_keys['football'], telegram_config)
+
+def carregar_chaves():
+    """Lê as chaves dos Secrets (variáveis de ambiente). Retorna (api_keys, telegram_config) ou None se faltarem."""
     print("--- Carregando chaves da API a partir dos Secrets... ---")
     API_KEY_FOOTBALL = os.getenv('API_KEY')
     API_KEY_ODDS = os.getenv('API_KEY_ODDS')
@@ -306,17 +314,31 @@ if __name__ == "__main__":
         print("="*60)
         print("❌ ERRO CRÍTICO: Chaves 'API_KEY' ou 'API_KEY_ODDS' não encontradas nos Secrets.")
         print("="*60)
-    else:
-        print("✅ Chaves da API carregadas com sucesso.")
-        api_keys = {
-            'football': API_KEY_FOOTBALL,
-            'odds': API_KEY_ODDS
-        }
-        telegram_config = {
-            'token': TELEGRAM_TOKEN,
-            'chat_id': TELEGRAM_CHAT_ID
-        }
+        return None
+    print("✅ Chaves da API carregadas com sucesso.")
+    api_keys = {
+        'football': API_KEY_FOOTBALL,
+        'odds': API_KEY_ODDS
+    }
+    telegram_config = {
+        'token': TELEGRAM_TOKEN,
+        'chat_id': TELEGRAM_CHAT_ID
+    }
+    return api_keys, telegram_config
+
+if __name__ == "__main__":
+    chaves = carregar_chaves()
+    if chaves:
+        api_keys, telegram_config = chaves
         try:
-            rodar_analise_completa(api_keys, telegram_config)
+            # PERFIL_CPROFILE=arquivo.prof liga o cProfile; o resumo de métricas é gravado mesmo se a execução falhar.
+            # --apenas-liquidacao: execução curta que só confere resultados das apostas pendentes.
+            with metricas.perfil():
+                if '--apenas-liquidacao' in sys.argv[1:]:
+                    rodar_liquidacao(api_keys, telegram_config)
+                else:
+                    rodar_analise_completa(api_keys, telegram_config)
         except Exception as e:
             print(f"Ocorreu um erro inesperado na execução: {e}")
+        finally:
+            metricas.salvar_resumo()
@@ -1,11 +1,13 @@
 import os
-import requests
+import cliente_http
+from cliente_http import URL_TELEGRAM
 import json
 import time
 import pandas as pd
 from thefuzz import fuzz
 from datetime import datetime, timezone, timedelta
 import warnings
+from armazem_historico import COLUNAS_CONTAGEM, FORMATO_DATA_CSV, compactar_historico, salvar_armazem
 
 # --- 1. CONFIGURAÇÕES GERAIS ---
 API_KEY_ODDS = os.environ.get('API_KEY')
@@ -55,10 +57,10 @@ def enviar_alerta_telegram(mensagem):
     caracteres_especiais = ['_', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
     for char in caracteres_especiais:
         mensagem = mensagem.replace(char, f'\\{char}')
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+    url = f"{URL_TELEGRAM}/bot{TELEGRAM_TOKEN}/sendMessage"
     payload = {'chat_id': TELEGRAM_CHAT_ID, 'text': mensagem, 'parse_mode': 'MarkdownV2'}
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = cliente_http.post(url, json=payload, timeout=10)
         if response.status_code == 200:
             print("  > Mensagem de relatório enviada com sucesso para o Telegram!")
         else:
@@ -88,10 +90,13 @@ def carregar_e_combinar_historicos():
     if not df_lista:
         return pd.DataFrame(), []
     
-    df_combinado = pd.concat(df_lista, ignore_index=True)
+    # Tipos compactos (times em category, contagens Int8, odds float32, datas já convertidas) depois do concat,
+    # para as categorias dos arquivos não precisarem ser unificadas.
+    df_combinado = compactar_historico(pd.concat(df_lista, ignore_index=True))
     
     print(f"  > Total de linhas antes da limpeza: {len(df_combinado)}")
-    df_combinado.drop_duplicates(inplace=True)
+    # Uma passada só, pela chave do jogo (as datas já estão convertidas, então dd/mm/aaaa e ISO não escapam);
+    # quem anexa ao histórico já pula repetidos pelo índice de chaves do armazem_historico.
     df_combinado.drop_duplicates(subset=['Date', 'HomeTeam', 'AwayTeam'], inplace=True, keep='last')
     print(f"  > Total de linhas após limpeza de duplicatas: {len(df_combinado)}")
     return df_combinado, arquivos_encontrados
@@ -123,16 +128,21 @@ def rodar_corretor():
         print("❌ ERRO: Nenhum arquivo de histórico encontrado para corrigir."); return False
 
     print("Aplicando regras de correção ao banco de dados unificado...")
-    df[COLUNA_TIME_CASA] = df[COLUNA_TIME_CASA].replace(mapa_de_nomes)
-    df[COLUNA_TIME_FORA] = df[COLUNA_TIME_FORA].replace(mapa_de_nomes)
+    # Os times chegam como category (compactar_historico); a troca de nomes é feita em texto, porque os nomes
+    # corrigidos não estão entre as categorias e o replace em Categorical não aceita categorias novas.
+    df[COLUNA_TIME_CASA] = df[COLUNA_TIME_CASA].astype(object).replace(mapa_de_nomes)
+    df[COLUNA_TIME_FORA] = df[COLUNA_TIME_FORA].astype(object).replace(mapa_de_nomes)
     
-    # Garante que o DataFrame final tem todas as colunas que definimos, preenchendo com 0
-    # as que não existirem (ex: jogos do sofascore não tem odds, jogos antigos não tem stats detalhadas)
-    df = df.reindex(columns=COLUNAS_FINAIS).fillna(0)
+    # Garante que o DataFrame final tem todas as colunas que definimos. Stats que não existirem viram 0
+    # (jogos antigos não tem stats detalhadas); odds ausentes ficam vazias (jogos do sofascore não tem odds).
+    df = df.reindex(columns=COLUNAS_FINAIS)
+    colunas_contagem = [coluna for coluna in COLUNAS_FINAIS if coluna in COLUNAS_CONTAGEM]
+    df[colunas_contagem] = df[colunas_contagem].fillna(0)
     
     try:
-        df.to_csv(ARQUIVO_CSV_SAIDA, index=False, encoding='utf-8')
+        df.to_csv(ARQUIVO_CSV_SAIDA, index=False, encoding='utf-8', date_format=FORMATO_DATA_CSV)
         print(f"✅ Novo arquivo '{ARQUIVO_CSV_SAIDA}' salvo com sucesso!")
+        salvar_armazem(df, ARQUIVO_CSV_SAIDA)
     except Exception as e:
         print(f"❌ ERRO ao salvar o novo arquivo CSV: {e}"); return False
     return True
@@ -0,0 +1,156 @@
+# metricas.py (Tempos por Etapa e Contadores da Execução)
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# --- CONFIGURAÇÕES (por variável de ambiente, para ligar/desligar nos workflows) ---
+# Resumo JSON da execução; vazio desativa a gravação.
+ARQUIVO_RESUMO_METRICAS = os.getenv('METRICAS_ARQUIVO', 'metricas_execucao.json')
+# Arquivo no formato texto do Prometheus (ex.: para o textfile collector do node_exporter); opcional.
+ARQUIVO_PROMETHEUS = os.getenv('METRICAS_PROMETHEUS', '')
+# Caminho do .prof do cProfile; opcional, só perfila quando definido.
+ARQUIVO_PERFIL = os.getenv('PERFIL_CPROFILE', '')
+PREFIXO_PROMETHEUS = 'bot_trade'
+LINHAS_RESUMO_PERFIL = 25
+
+_trava = threading.Lock()
+_inicio_execucao = time.time()
+# {etapa: [chamadas, segundos_total, segundos_maximo]}
+_etapas = {}
+# {(nome, (('rotulo', 'valor'), ...)): valor}
+_contadores = {}
+
+def reiniciar():
+    """Zera tempos e contadores (início de um novo ciclo no mesmo processo)."""
+    global _inicio_execucao
+    with _trava:
+        _inicio_execucao = time.time()
+        _etapas.clear()
+        _contadores.clear()
+
+def registrar_tempo(nome_etapa, segundos):
+    with _trava:
+        etapa = _etapas.setdefault(nome_etapa, [0, 0.0, 0.0])
+        etapa[0] += 1
+        etapa[1] += segundos
+        etapa[2] = max(etapa[2], segundos)
+
+@contextmanager
+def etapa(nome_etapa):
+    """
+    Mede o tempo do bloco e soma na etapa `nome_etapa` (etapas podem ser aninhadas e repetidas).
+    Também serve de decorador: @metricas.etapa('busca_jogos').
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_tempo(nome_etapa, time.perf_counter() - inicio)
+
+def incrementar(nome, valor=1, **rotulos):
+    """Soma `valor` ao contador `nome` com os `rotulos` informados (ex.: api='api_football', status=200)."""
+    chave = (nome, tuple(sorted((rotulo, str(v)) for rotulo, v in rotulos.items())))
+    with _trava:
+        _contadores[chave] = _contadores.get(chave, 0) + valor
+
+def resumo():
+    """Resumo da execução como dicionário (o mesmo conteúdo gravado em ARQUIVO_RESUMO_METRICAS)."""
+    with _trava:
+        etapas = {
+            nome: {'chamadas': chamadas, 'segundos': round(total, 4), 'segundos_maximo': round(maximo, 4)}
+            for nome, (chamadas, total, maximo) in _etapas.items()
+        }
+        contadores = {}
+        for (nome, rotulos), valor in sorted(_contadores.items()):
+            contadores.setdefault(nome, []).append({**dict(rotulos), 'valor': valor})
+        inicio = _inicio_execucao
+    return {
+        'inicio': datetime.fromtimestamp(inicio, tz=timezone.utc).isoformat(),
+        'duracao_segundos': round(time.time() - inicio, 3),
+        'etapas': etapas,
+        'contadores': contadores
+    }
+
+def _escapar_rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _rotulos_prometheus(rotulos):
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{rotulo}="{_escapar_rotulo(valor)}"' for rotulo, valor in rotulos) + '}'
+
+def texto_prometheus():
+    """As mesmas métricas no formato de exposição em texto do Prometheus."""
+    dados = resumo()
+    linhas = [
+        f'# TYPE {PREFIXO_PROMETHEUS}_execucao_duracao_segundos gauge',
+        f'{PREFIXO_PROMETHEUS}_execucao_duracao_segundos {dados["duracao_segundos"]}',
+        f'# TYPE {PREFIXO_PROMETHEUS}_etapa_segundos_total counter',
+    ]
+    linhas += [f'{PREFIXO_PROMETHEUS}_etapa_segundos_total{{etapa="{nome}"}} {info["segundos"]}' for nome, info in dados['etapas'].items()]
+    linhas.append(f'# TYPE {PREFIXO_PROMETHEUS}_etapa_chamadas_total counter')
+    linhas += [f'{PREFIXO_PROMETHEUS}_etapa_chamadas_total{{etapa="{nome}"}} {info["chamadas"]}' for nome, info in dados['etapas'].items()]
+    with _trava:
+        contadores = sorted(_contadores.items())
+    nomes_declarados = set()
+    for (nome, rotulos), valor in contadores:
+        if nome not in nomes_declarados:
+            linhas.append(f'# TYPE {PREFIXO_PROMETHEUS}_{nome}_total counter')
+            nomes_declarados.add(nome)
+        linhas.append(f'{PREFIXO_PROMETHEUS}_{nome}_total{_rotulos_prometheus(rotulos)} {valor}')
+    return '\n'.join(linhas) + '\n'
+
+def salvar_resumo(arquivo_json=None, arquivo_prometheus=None):
+    """Grava o resumo JSON (e o texto do Prometheus, se configurado) e imprime o tempo de cada etapa."""
+    arquivo_json = ARQUIVO_RESUMO_METRICAS if arquivo_json is None else arquivo_json
+    arquivo_prometheus = ARQUIVO_PROMETHEUS if arquivo_prometheus is None else arquivo_prometheus
+    dados = resumo()
+    print(f"\n--- ⏱️  Tempos da execução ({dados['duracao_segundos']:.1f}s no total) ---")
+    for nome, info in sorted(dados['etapas'].items(), key=lambda item: -item[1]['segundos']):
+        print(f"  -> {nome}: {info['segundos']:.2f}s ({info['chamadas']}x)")
+    for nome, valores in dados['contadores'].items():
+        print(f"  -> {nome}: {sum(v['valor'] for v in valores)}")
+    try:
+        if arquivo_json:
+            with open(arquivo_json, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, indent=2, ensure_ascii=False)
+            print(f"  -> 📝 Métricas salvas em '{arquivo_json}'.")
+        if arquivo_prometheus:
+            # Grava em arquivo temporário e renomeia, para o coletor nunca ler um arquivo pela metade.
+            with open(arquivo_prometheus + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(texto_prometheus())
+            os.replace(arquivo_prometheus + '.tmp', arquivo_prometheus)
+            print(f"  -> 📝 Métricas (Prometheus) salvas em '{arquivo_prometheus}'.")
+    except OSError as e:
+        print(f"  -> ❌ ERRO ao salvar as métricas: {e}")
+    return dados
+
+@contextmanager
+def perfil(arquivo_perfil=None):
+    """
+    Perfila o bloco com cProfile se `arquivo_perfil` (ou PERFIL_CPROFILE) estiver definido: grava o .prof
+    (abrir com `python -m pstats` ou snakeviz) e imprime as funções com maior tempo acumulado.
+    Sem arquivo configurado não faz nada.
+    """
+    arquivo_perfil = ARQUIVO_PERFIL if arquivo_perfil is None else arquivo_perfil
+    if not arquivo_perfil:
+        yield
+        return
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield
+    finally:
+        perfilador.disable()
+        perfilador.dump_stats(arquivo_perfil)
+        saida = io.StringIO()
+        pstats.Stats(perfilador, stream=saida).sort_stats('cumulative').print_stats(LINHAS_RESUMO_PERFIL)
+        print(f"\n--- 🔍 Perfil (cProfile) salvo em '{arquivo_perfil}' ---")
+        print(saida.getvalue())
@@ -0,0 +1,94 @@
+# pareamento_odds.py (Pareamento Indexado Jogo x Odds)
+
+import re
+import time
+import unicodedata
+from datetime import datetime
+
+from importacao_tardia import importar_tardio
+
+fuzz = importar_tardio('thefuzz.fuzz')
+
+# --- PARÂMETROS DO PAREAMENTO ---
+PONTUACAO_MINIMA_PAREAMENTO = 75
+JANELA_HORARIO_HORAS = 6
+TAMANHO_PREFIXO_BLOCO = 3
+# Palavras comuns demais para servir de bloco (aparecem em centenas de nomes de clubes).
+PALAVRAS_IGNORADAS = {
+    'fc', 'cf', 'sc', 'ac', 'afc', 'cd', 'ca', 'se', 'ec', 'sd', 'ud', 'sv', 'fk', 'sk', 'if', 'bk',
+    'club', 'clube', 'de', 'do', 'da', 'del', 'la', 'el', 'the', 'and', 'united', 'city', 'real', 'sporting'
+}
+
+def _tokens_normalizados(nome):
+    """Remove acentos e pontuação e devolve os tokens em minúsculas."""
+    nome = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii').lower()
+    return re.findall(r'[a-z0-9]+', nome)
+
+def _chaves_de_bloco(nome):
+    """Prefixos dos tokens relevantes de um nome; dois nomes só são comparados se compartilharem algum."""
+    tokens = [t for t in _tokens_normalizados(nome) if t not in PALAVRAS_IGNORADAS and len(t) >= 2]
+    if not tokens:
+        tokens = _tokens_normalizados(nome)
+    return {t[:TAMANHO_PREFIXO_BLOCO] for t in tokens}
+
+def _timestamp_inicio(jogo_odd):
+    inicio = jogo_odd.get('commence_time')
+    if not inicio:
+        return None
+    try:
+        return datetime.fromisoformat(inicio.replace('Z', '+00:00')).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def construir_indice_odds(jogos_com_odds):
+    """Indexa os eventos da The Odds API pelos prefixos dos nomes dos times (uma vez por execução)."""
+    indice = {'eventos': [], 'blocos': {}}
+    for jogo_odd in jogos_com_odds or []:
+        if not isinstance(jogo_odd, dict) or not jogo_odd.get('home_team') or not jogo_odd.get('away_team'):
+            continue
+        posicao = len(indice['eventos'])
+        indice['eventos'].append({
+            'jogo': jogo_odd,
+            'texto': f"{jogo_odd['home_team']} {jogo_odd['away_team']}",
+            'timestamp': _timestamp_inicio(jogo_odd)
+        })
+        for chave in _chaves_de_bloco(jogo_odd['home_team']) | _chaves_de_bloco(jogo_odd['away_team']):
+            indice['blocos'].setdefault(chave, []).append(posicao)
+    return indice
+
+def _candidatos(jogo, indice):
+    posicoes = set()
+    for chave in _chaves_de_bloco(jogo.get('home_team', '')) | _chaves_de_bloco(jogo.get('away_team', '')):
+        posicoes.update(indice['blocos'].get(chave, []))
+    timestamp_jogo = jogo.get('timestamp')
+    janela = JANELA_HORARIO_HORAS * 3600
+    # Ordem original da lista de odds: em caso de empate vence o primeiro evento, como no loop antigo.
+    for posicao in sorted(posicoes):
+        timestamp_odd = indice['eventos'][posicao]['timestamp']
+        if timestamp_jogo and timestamp_odd and abs(timestamp_odd - timestamp_jogo) > janela:
+            continue
+        yield indice['eventos'][posicao]
+
+def parear_jogos_com_odds(jogos, jogos_com_odds, pontuacao_minima=PONTUACAO_MINIMA_PAREAMENTO):
+    """
+    Retorna {id_partida: (evento_odds, pontuacao)} para os jogos com correspondência acima de `pontuacao_minima`.
+    Cada jogo só é comparado (fuzz.token_set_ratio) com os eventos que compartilham algum bloco de nome
+    e começam dentro da janela de horário.
+    """
+    inicio = time.perf_counter()
+    indice = construir_indice_odds(jogos_com_odds)
+    pareamentos, comparacoes = {}, 0
+    for jogo in jogos:
+        texto_jogo = f"{jogo.get('home_team')} {jogo.get('away_team')}"
+        melhor_match, maior_pontuacao = None, pontuacao_minima
+        for evento in _candidatos(jogo, indice):
+            comparacoes += 1
+            pontuacao = fuzz.token_set_ratio(texto_jogo, evento['texto'])
+            if pontuacao > maior_pontuacao:
+                maior_pontuacao, melhor_match = pontuacao, evento['jogo']
+        if melhor_match is not None:
+            pareamentos[jogo.get('id_partida')] = (melhor_match, maior_pontuacao)
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    print(f"  -> 🔗 Pareamento de odds: {len(pareamentos)}/{len(jogos)} jogos pareados em {duracao_ms:.1f} ms "
+          f"({comparacoes} comparações em vez de {len(jogos) * len(indice['eventos'])}).")
+    return pareamentos
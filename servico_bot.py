@@ -0,0 +1,152 @@
+# servico_bot.py (Modo Serviço: Ciclos Agendados num Processo Residente)
+
+import json
+import os
+import signal
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metricas
+import main
+
+# --- CONFIGURAÇÕES (variáveis de ambiente) ---
+INTERVALO_CICLO_MINUTOS = float(os.getenv('SERVICO_INTERVALO_MINUTOS', '60'))
+# Mesmo horário do cron do run_bot.yml (11h-03h, horário do servidor); fora dele o serviço só espera.
+HORAS_ATIVAS = [int(hora) for hora in os.getenv('SERVICO_HORAS_ATIVAS', '11,12,13,14,15,16,17,18,19,20,21,22,23,0,1,2,3').split(',') if hora.strip()]
+HOST_STATUS = os.getenv('SERVICO_HOST_STATUS', '127.0.0.1')
+PORTA_STATUS = int(os.getenv('SERVICO_PORTA_STATUS', '8098'))
+
+_parar = threading.Event()
+_trava_estado = threading.Lock()
+_estado = {
+    'iniciado_em': datetime.now().isoformat(timespec='seconds'),
+    'ciclos_executados': 0,
+    'ciclos_com_erro': 0,
+    'em_execucao': False,
+    'ultimo_ciclo': None,
+    'proximo_ciclo': None
+}
+_ultimo_resumo_metricas = {}
+_ultimo_texto_prometheus = ''
+
+def _somar_contador(resumo, nome, **filtro):
+    return sum(item['valor'] for item in resumo.get('contadores', {}).get(nome, []) if all(item.get(chave) == valor for chave, valor in filtro.items()))
+
+def status_atual():
+    """Estado do serviço e resumo do último ciclo (o mesmo JSON servido em /status)."""
+    with _trava_estado:
+        estado = dict(_estado)
+        resumo = _ultimo_resumo_metricas
+    estado['apostas_pendentes'] = len(main.carregar_json(main.ARQUIVO_PENDENTES, []))
+    if resumo:
+        estado['ultimo_ciclo_resumo'] = {
+            'chamadas_api': _somar_contador(resumo, 'chamadas_api'),
+            'acertos_cache': _somar_contador(resumo, 'cache', resultado='acerto'),
+            'faltas_cache': _somar_contador(resumo, 'cache', resultado='ausente') + _somar_contador(resumo, 'cache', resultado='expirado'),
+            'jogos_analisados': _somar_contador(resumo, 'jogos_analisados'),
+            'oportunidades_enviadas': _somar_contador(resumo, 'oportunidades_enviadas'),
+            'etapas': {nome: info['segundos'] for nome, info in resumo.get('etapas', {}).items()}
+        }
+    return estado
+
+class ManipuladorStatus(BaseHTTPRequestHandler):
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status, conteudo, tipo):
+        corpo = conteudo.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        if self.path in ('/', '/status'):
+            self._responder(200, json.dumps(status_atual(), indent=2, ensure_ascii=False), 'application/json; charset=utf-8')
+        elif self.path == '/metrics':
+            self._responder(200, _ultimo_texto_prometheus, 'text/plain; version=0.0.4; charset=utf-8')
+        elif self.path == '/saude':
+            self._responder(200, 'ok', 'text/plain; charset=utf-8')
+        else:
+            self._responder(404, 'rota não encontrada', 'text/plain; charset=utf-8')
+
+def iniciar_servidor_status(host=HOST_STATUS, porta=PORTA_STATUS):
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorStatus)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name='status-servico', daemon=True).start()
+    print(f"--- 📡 Status do serviço em http://{host}:{servidor.server_address[1]}/status (métricas em /metrics) ---")
+    return servidor
+
+def executar_ciclo(api_keys, telegram_config):
+    """Um ciclo de análise com as métricas zeradas no início; erros não derrubam o serviço."""
+    global _ultimo_resumo_metricas, _ultimo_texto_prometheus
+    metricas.reiniciar()
+    with _trava_estado:
+        _estado['em_execucao'] = True
+    inicio, erro = time.perf_counter(), None
+    try:
+        with metricas.perfil():
+            main.rodar_analise_completa(api_keys, telegram_config)
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+        print(f"Ocorreu um erro inesperado no ciclo: {erro}")
+        traceback.print_exc()
+    duracao = time.perf_counter() - inicio
+    resumo = metricas.salvar_resumo()
+    with _trava_estado:
+        _ultimo_resumo_metricas, _ultimo_texto_prometheus = resumo, metricas.texto_prometheus()
+        _estado['em_execucao'] = False
+        _estado['ciclos_executados'] += 1
+        _estado['ciclos_com_erro'] += erro is not None
+        _estado['ultimo_ciclo'] = {
+            'inicio': resumo['inicio'], 'duracao_segundos': round(duracao, 3),
+            'status': 'erro' if erro else 'ok', 'erro': erro
+        }
+    print(f"--- ⏱️  Ciclo concluído em {duracao:.1f}s ---")
+
+def _proximo_horario(a_partir_de):
+    """Próximo início de ciclo dentro das HORAS_ATIVAS (o próprio horário, se já estiver numa hora ativa)."""
+    candidato = a_partir_de
+    for _ in range(24 * 60):
+        if not HORAS_ATIVAS or candidato.hour in HORAS_ATIVAS:
+            return candidato
+        candidato = (candidato + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+    return candidato
+
+def rodar_servico(api_keys, telegram_config, intervalo_minutos=INTERVALO_CICLO_MINUTOS):
+    """
+    Mantém o processo vivo rodando um ciclo a cada `intervalo_minutos`. Contexto histórico, mapas de nomes,
+    cache em memória e conexões HTTP continuam carregados entre ciclos; arquivos só são relidos se mudarem.
+    SIGTERM/SIGINT terminam o ciclo em andamento e encerram o serviço.
+    """
+    def _encerrar(sinal, _quadro):
+        print(f"\n--- 🛑 Sinal {signal.Signals(sinal).name} recebido: encerrando após o ciclo atual... ---")
+        _parar.set()
+    signal.signal(signal.SIGTERM, _encerrar)
+    signal.signal(signal.SIGINT, _encerrar)
+
+    servidor = iniciar_servidor_status()
+    proximo = _proximo_horario(datetime.now())
+    try:
+        while not _parar.is_set():
+            with _trava_estado:
+                _estado['proximo_ciclo'] = proximo.isoformat(timespec='seconds')
+            espera = (proximo - datetime.now()).total_seconds()
+            if espera > 0:
+                print(f"\n--- 💤 Próximo ciclo às {proximo:%d/%m %H:%M}. ---")
+                if _parar.wait(espera):
+                    break
+            executar_ciclo(api_keys, telegram_config)
+            proximo = _proximo_horario(max(datetime.now(), proximo + timedelta(minutes=intervalo_minutos)))
+    finally:
+        servidor.shutdown()
+        print("--- Serviço encerrado. ---")
+
+if __name__ == "__main__":
+    chaves = main.carregar_chaves()
+    if chaves:
+        rodar_servico(*chaves)
@@ -0,0 +1,319 @@
+# servidor_simulado.py (Servidor Local que Imita as APIs Externas)
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PORTA_PADRAO = 8099
+JOGOS_POR_DIA_PADRAO = 1000
+ARQUIVO_HISTORICO = 'dados_historicos_corrigido.csv'
+CASAS_DE_APOSTAS = ['pinnacle', 'betfair', 'bet365', 'marathonbet']
+SUFIXOS_ODDS = ['', ' FC', ' SC']
+FRACAO_JOGOS_COM_ODDS = 0.8
+LIGAS = {39: 'Premier League', 140: 'La Liga', 135: 'Serie A', 78: 'Bundesliga', 61: 'Ligue 1', 71: 'Serie A Brasil'}
+
+def _nomes_de_times(quantidade_minima):
+    """Usa os times do histórico local (para as estratégias encontrarem estatísticas); sem ele, gera nomes."""
+    nomes = []
+    if os.path.exists(ARQUIVO_HISTORICO):
+        import pandas as pd
+        historico = pd.read_csv(ARQUIVO_HISTORICO, usecols=['HomeTeam', 'AwayTeam'], low_memory=False)
+        nomes = sorted({str(nome) for nome in pd.concat([historico['HomeTeam'], historico['AwayTeam']]).dropna() if str(nome) not in ('0', '')})
+    nomes += [f"Clube Simulado {i}" for i in range(max(0, quantidade_minima - len(nomes)))]
+    return nomes
+
+class DadosSimulados:
+    """Jogos, odds, estatísticas e eventos gerados uma vez (semente fixa) e servidos de forma consistente."""
+
+    def __init__(self, num_jogos, semente=42):
+        rng = random.Random(semente)
+        self.times = _nomes_de_times(40)
+        self.id_por_time = {nome: 1000 + i for i, nome in enumerate(self.times)}
+        inicio_dia = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+        self.fixtures = {}
+        self.eventos_odds = []
+        for i in range(num_jogos):
+            casa, fora = rng.sample(self.times, 2)
+            liga_id = rng.choice(list(LIGAS))
+            timestamp = int((inicio_dia + timedelta(minutes=rng.randrange(0, 660))).timestamp())
+            id_partida = 5_000_000 + i
+            self.fixtures[id_partida] = {
+                'fixture': {'id': id_partida, 'timestamp': timestamp, 'status': {'short': 'NS'}},
+                'league': {'id': liga_id, 'name': LIGAS[liga_id]},
+                'teams': {'home': {'id': self.id_por_time[casa], 'name': casa}, 'away': {'id': self.id_por_time[fora], 'name': fora}},
+                'goals': {'home': None, 'away': None}
+            }
+            if rng.random() < FRACAO_JOGOS_COM_ODDS:
+                nome_casa, nome_fora = casa + rng.choice(SUFIXOS_ODDS), fora + rng.choice(SUFIXOS_ODDS)
+                precos = [rng.uniform(1.25, 5.5), rng.uniform(2.9, 4.4), rng.uniform(1.25, 7.5)]
+                self.eventos_odds.append({
+                    'id': f"simulado{id_partida}", 'sport_key': 'soccer', 'home_team': nome_casa, 'away_team': nome_fora,
+                    'commence_time': datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'bookmakers': [{'key': chave, 'title': chave.title(), 'markets': [{'key': 'h2h', 'outcomes': [
+                        {'name': nome_casa, 'price': round(precos[0] * rng.uniform(0.96, 1.04), 2)},
+                        {'name': 'Draw', 'price': round(precos[1] * rng.uniform(0.96, 1.04), 2)},
+                        {'name': nome_fora, 'price': round(precos[2] * rng.uniform(0.96, 1.04), 2)}]}]} for chave in CASAS_DE_APOSTAS]
+                })
+
+    def fixture_encerrado(self, id_partida):
+        """O mesmo jogo, já encerrado, com placar determinístico pelo id."""
+        base = self.fixtures.get(id_partida)
+        if base is None:
+            return None
+        rng = random.Random(id_partida)
+        encerrado = json.loads(json.dumps(base))
+        encerrado['fixture']['status'] = {'short': 'FT'}
+        encerrado['goals'] = {'home': rng.choice([0, 0, 1, 1, 1, 2, 2, 3]), 'away': rng.choice([0, 0, 1, 1, 2, 2, 3])}
+        return encerrado
+
+    def estatisticas_time(self, time_id):
+        rng = random.Random(time_id)
+        return {
+            'form': ''.join(rng.choice('WWDDL') for _ in range(rng.randrange(5, 12))),
+            'goals': {'for': {'average': {'total': f"{rng.uniform(0.6, 2.4):.1f}"}}, 'against': {'average': {'total': f"{rng.uniform(0.5, 2.2):.1f}"}}}
+        }
+
+    def eventos_sofascore_time(self, time_id, pagina):
+        rng = random.Random(time_id * 100 + pagina)
+        agora = int(time.time()) - pagina * 30 * 86400
+        eventos = []
+        for i in range(30):
+            adversario = rng.choice(self.times)
+            em_casa = rng.random() < 0.5
+            time_nome = next((nome for nome, id_time in self.id_por_time.items() if id_time == time_id), f"Time {time_id}")
+            casa, fora = ((time_id, time_nome), (self.id_por_time[adversario], adversario)) if em_casa else ((self.id_por_time[adversario], adversario), (time_id, time_nome))
+            eventos.append({
+                'id': time_id * 10_000 + pagina * 100 + i, 'startTimestamp': agora - i * 86400, 'status': {'code': 100},
+                'homeTeam': {'id': casa[0], 'name': casa[1]}, 'awayTeam': {'id': fora[0], 'name': fora[1]},
+                'homeScore': {'current': rng.randrange(0, 4)}, 'awayScore': {'current': rng.randrange(0, 4)}
+            })
+        return eventos
+
+class Comportamento:
+    """Latência e falhas injetadas; alteráveis em tempo de execução pela rota /__config."""
+
+    def __init__(self, latencia_ms=0, variacao_ms=0, taxa_erro=0.0, taxa_429=0.0, prefixos_com_falhas=None):
+        self.latencia_ms = latencia_ms
+        self.variacao_ms = variacao_ms
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.prefixos_com_falhas = set(prefixos_com_falhas or ['api-football', 'odds', 'sofascore', 'telegram', 'rundown'])
+
+class Estatisticas:
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.requisicoes_por_rota = {}
+        self.respostas_por_status = {}
+        self.em_andamento = 0
+        self.maximo_simultaneo = 0
+        self.mensagens_telegram = []
+
+    def iniciar(self):
+        with self._trava:
+            self.em_andamento += 1
+            self.maximo_simultaneo = max(self.maximo_simultaneo, self.em_andamento)
+
+    def finalizar(self, rota, status):
+        with self._trava:
+            self.em_andamento -= 1
+            self.requisicoes_por_rota[rota] = self.requisicoes_por_rota.get(rota, 0) + 1
+            self.respostas_por_status[str(status)] = self.respostas_por_status.get(str(status), 0) + 1
+
+    def resumo(self):
+        with self._trava:
+            return {
+                'requisicoes_por_rota': dict(sorted(self.requisicoes_por_rota.items())), 'respostas_por_status': dict(self.respostas_por_status),
+                'total_requisicoes': sum(self.requisicoes_por_rota.values()), 'maximo_simultaneo': self.maximo_simultaneo,
+                'mensagens_telegram': len(self.mensagens_telegram)
+            }
+
+def _rota_normalizada(partes):
+    """Troca ids e datas por marcadores para agrupar as estatísticas por rota."""
+    return '/' + '/'.join('{id}' if parte.isdigit() or parte[:4].isdigit() or parte.startswith('bot') else parte for parte in partes)
+
+class ManipuladorSimulado(BaseHTTPRequestHandler):
+    dados = None
+    comportamento = None
+    estatisticas = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status, corpo, cabecalhos=None):
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(conteudo)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(conteudo)
+        return status
+
+    def _tratar(self, metodo):
+        url = urlsplit(self.path)
+        partes = [parte for parte in url.path.split('/') if parte]
+        params = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+        rota = _rota_normalizada(partes)
+        if partes and partes[0] == '__estatisticas':
+            return self._responder(200, self.estatisticas.resumo())
+        if partes and partes[0] == '__config' and metodo == 'POST':
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            for chave, valor in json.loads(self.rfile.read(tamanho) or b'{}').items():
+                if hasattr(self.comportamento, chave):
+                    setattr(self.comportamento, chave, set(valor) if chave == 'prefixos_com_falhas' else valor)
+            return self._responder(200, vars(self.comportamento) | {'prefixos_com_falhas': sorted(self.comportamento.prefixos_com_falhas)})
+
+        self.estatisticas.iniciar()
+        status = 500
+        try:
+            comportamento = self.comportamento
+            if comportamento.latencia_ms or comportamento.variacao_ms:
+                time.sleep(max(0.0, comportamento.latencia_ms + random.uniform(-comportamento.variacao_ms, comportamento.variacao_ms)) / 1000)
+            if partes and partes[0] in comportamento.prefixos_com_falhas:
+                sorteio = random.random()
+                if sorteio < comportamento.taxa_429:
+                    status = self._responder(429, {'message': 'Too many requests (simulado)'}, {'Retry-After': '1'})
+                    return
+                if sorteio < comportamento.taxa_429 + comportamento.taxa_erro:
+                    status = self._responder(500, {'message': 'Erro interno (simulado)'})
+                    return
+            status = self._responder(*self._conteudo(metodo, partes, params))
+        finally:
+            self.estatisticas.finalizar(rota, status)
+
+    def _conteudo(self, metodo, partes, params):
+        if not partes:
+            return 404, {}
+        prefixo, resto = partes[0], partes[1:]
+        if prefixo == 'api-football':
+            return self._api_football(resto, params)
+        if prefixo == 'odds' and resto[-1:] == ['odds']:
+            return 200, self.dados.eventos_odds
+        if prefixo == 'sofascore':
+            return self._sofascore(resto[2:] if resto[:2] == ['api', 'v1'] else resto, params)
+        if prefixo == 'telegram' and metodo == 'POST' and resto[-1:] == ['sendMessage']:
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            corpo = json.loads(self.rfile.read(tamanho) or b'{}')
+            with self.estatisticas._trava:
+                self.estatisticas.mensagens_telegram.append(corpo.get('text', ''))
+            return 200, {'ok': True, 'result': {'message_id': len(self.estatisticas.mensagens_telegram)}}
+        if prefixo == 'rundown':
+            return 200, {'standings': [{'teams': []}]}
+        return 404, {'message': 'Rota não simulada'}
+
+    def _api_football(self, resto, params):
+        if resto == ['fixtures']:
+            if 'ids' in params or 'id' in params:
+                ids = [int(i) for i in (params.get('ids') or params.get('id')).split('-') if i.isdigit()]
+                return 200, {'response': [f for f in (self.dados.fixture_encerrado(i) for i in ids) if f]}
+            return 200, {'response': list(self.dados.fixtures.values())}
+        if resto == ['teams', 'statistics']:
+            return 200, {'response': self.dados.estatisticas_time(int(params.get('team', 0) or 0))}
+        if resto in (['countries'], ['teams']):
+            return 200, {'response': []}
+        return 404, {'response': []}
+
+    def _sofascore(self, resto, params):
+        if resto[:2] == ['search', 'all']:
+            nome = params.get('q', '')
+            id_time = self.dados.id_por_time.get(nome, 900_000 + sum(map(ord, nome)))
+            return 200, {'results': [{'type': 'team', 'entity': {'id': id_time, 'name': nome, 'gender': 'M', 'sport': {'name': 'Football'}}}]}
+        if len(resto) == 5 and resto[0] == 'team' and resto[2:4] == ['events', 'last']:
+            return 200, {'events': self.dados.eventos_sofascore_time(int(resto[1]), int(resto[4])), 'hasNextPage': int(resto[4]) < 2}
+        if len(resto) == 3 and resto[0] == 'event' and resto[2] == 'statistics':
+            rng = random.Random(int(resto[1]))
+            return 200, {'statistics': [{'period': 'ALL', 'groups': [{'groupName': 'Corners', 'statisticsItems': [
+                {'name': 'Corner kicks', 'home': str(rng.randrange(1, 10)), 'away': str(rng.randrange(1, 9)), 'value': rng.randrange(2, 18)}]}]}]}
+        if resto[:3] == ['sport', 'football', 'scheduled-events'] or resto[:3] == ['sport', 'football', 'events']:
+            return 200, {'events': []}
+        return 404, {'error': {'code': 404}}
+
+    def do_GET(self):
+        self._tratar('GET')
+
+    def do_POST(self):
+        self._tratar('POST')
+
+def iniciar_servidor(porta=PORTA_PADRAO, num_jogos=JOGOS_POR_DIA_PADRAO, comportamento=None, em_segundo_plano=False):
+    """Sobe o servidor simulado. Em segundo plano devolve (servidor, thread); caso contrário bloqueia."""
+    manipulador = type('Manipulador', (ManipuladorSimulado,), {
+        'dados': DadosSimulados(num_jogos), 'comportamento': comportamento or Comportamento(), 'estatisticas': Estatisticas()
+    })
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), manipulador)
+    servidor.daemon_threads = True
+    print(f"--- 🧪 Servidor simulado em http://127.0.0.1:{servidor.server_address[1]} ({num_jogos} jogos/dia) ---")
+    if em_segundo_plano:
+        thread = threading.Thread(target=servidor.serve_forever, name='servidor-simulado', daemon=True)
+        thread.start()
+        return servidor, thread
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.server_close()
+
+def medir_ciclo_completo(porta, num_jogos, comportamento, respeitar_limite_real=False):
+    """
+    Roda rodar_analise_completa contra o servidor simulado numa pasta temporária (cache e JSONs de estado
+    isolados do bot real) e imprime o tempo do ciclo e as estatísticas do servidor.
+    Por padrão o limite de chamadas/minuto da API-Football é levantado, para medir o pipeline e não a cota.
+    """
+    servidor, _ = iniciar_servidor(porta, num_jogos, comportamento, em_segundo_plano=True)
+    # Precisam ser definidos antes de importar o cliente HTTP e a api_externa, que os leem na importação.
+    os.environ['SERVIDOR_SIMULADO'] = f"http://127.0.0.1:{servidor.server_address[1]}"
+    if not respeitar_limite_real:
+        os.environ.setdefault('API_FOOTBALL_LIMITE_POR_MINUTO', '100000')
+    pasta_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        if os.path.exists(ARQUIVO_HISTORICO):
+            shutil.copy(ARQUIVO_HISTORICO, pasta_temporaria)
+        dados = servidor.RequestHandlerClass.dados
+        with open(os.path.join(pasta_temporaria, 'master_team_list.json'), 'w', encoding='utf-8') as f:
+            json.dump({nome: nome for nome in dados.times}, f, ensure_ascii=False)
+        # Jogos "de ontem" para exercitar também a atualização do histórico e a liquidação das apostas.
+        ontem = [{'id_partida': id_partida} for id_partida in list(dados.fixtures)[:num_jogos // 2]]
+        with open(os.path.join(pasta_temporaria, 'jogos_a_acompanhar.json'), 'w', encoding='utf-8') as f:
+            json.dump({'data': str(date.today() - timedelta(days=1)), 'jogos': ontem}, f)
+        os.chdir(pasta_temporaria)
+        try:
+            import main
+            inicio = time.perf_counter()
+            main.rodar_analise_completa({'football': 'simulado', 'odds': 'simulado'}, {'token': 'simulado', 'chat_id': '1'})
+            duracao = time.perf_counter() - inicio
+            import metricas
+            metricas.salvar_resumo(arquivo_json='', arquivo_prometheus='')
+        finally:
+            os.chdir(pasta_original)
+    servidor.shutdown()
+    servidor.server_close()
+    resumo = servidor.RequestHandlerClass.estatisticas.resumo()
+    print(f"\n===== ⏱️  Ciclo completo em {duracao:.2f}s com {num_jogos} jogos =====")
+    print(json.dumps(resumo, indent=2, ensure_ascii=False))
+    return duracao, resumo
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita API-Football, The Odds API, SofaScore e Telegram.")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--jogos', type=int, default=JOGOS_POR_DIA_PADRAO, help="Jogos do dia servidos pela API-Football simulada.")
+    parser.add_argument('--latencia-ms', type=float, default=0, help="Latência fixa por requisição.")
+    parser.add_argument('--variacao-ms', type=float, default=0, help="Variação aleatória (+/-) da latência.")
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help="Fração de respostas 500.")
+    parser.add_argument('--taxa-429', type=float, default=0.0, help="Fração de respostas 429 (com Retry-After: 1).")
+    parser.add_argument('--prefixos-com-falhas', default='api-football,odds,sofascore,telegram,rundown', help="APIs que recebem as falhas injetadas.")
+    parser.add_argument('--rodar-analise', action='store_true', help="Sobe o servidor, roda um ciclo de main.rodar_analise_completa contra ele e mede o tempo.")
+    parser.add_argument('--respeitar-limite-real', action='store_true', help="Mantém o limite de chamadas/minuto real da API-Football no --rodar-analise.")
+    args = parser.parse_args()
+    comportamento = Comportamento(args.latencia_ms, args.variacao_ms, args.taxa_erro, args.taxa_429, args.prefixos_com_falhas.split(','))
+    if args.rodar_analise:
+        medir_ciclo_completo(args.porta, args.jogos, comportamento, args.respeitar_limite_real)
+    else:
+        iniciar_servidor(args.porta, args.jogos, comportamento)
@@ -1,56 +1,211 @@
 import os
 import requests
+import cliente_http
+import metricas
+from cliente_http import LimitadorDeTaxa, URL_SOFASCORE
 import json
 import time
+import asyncio
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from thefuzz import fuzz, process
-from playwright.sync_api import sync_playwright, Error
+from urllib.parse import quote
 
 # IMPORTAÇÃO DOS MÓDULOS DE UTILITÁRIOS
 from utils import carregar_json, salvar_json
+from gerenciador_cache import get_many, ler_cache, salvar_cache
+from importacao_tardia import importar_tardio
+
+# Só carregados quando usados: o Playwright só entra em cena quando o SofaScore bloqueia o acesso direto.
+fuzz = importar_tardio('thefuzz.fuzz')
+process = importar_tardio('thefuzz.process')
+playwright_async = importar_tardio('playwright.async_api')
 
 # --- Constantes e Configurações ---
 ARQUIVO_CACHE_IDS = 'sofascore_id_cache.json'
+ARQUIVO_MAPA_NOMES_SOFASCORE = 'mapa_nomes_sofascore.json'
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept': 'application/json',
     'Cache-Control': 'no-cache',
     'Referer': 'https://www.sofascore.com/'
 }
+MAX_PAGINAS_SIMULTANEAS = 4
+STATUS_DESAFIO_SOFASCORE = (403, 429, 503)
+PAUSA_REQUESTS_APOS_BLOQUEIO_SEGUNDOS = 600
+MAX_BUSCAS_SIMULTANEAS_SOFASCORE = 5
+LIMITE_BUSCAS_POR_MINUTO_SOFASCORE = 60
+# Um time "não encontrado" só é pesquisado de novo depois disso (o SofaScore pode passar a listá-lo).
+VALIDADE_FALHA_BUSCA_ID_SEGUNDOS = 6 * 3600
+# Estatísticas de jogos encerrados (status 100) não mudam: o cache só sai por despejo LRU.
+VALIDADE_CACHE_EVENTOS_ENCERRADOS_HORAS = 24 * 365
+MAX_PAGINAS_EVENTOS_TIME = 3
+MAX_EVENTOS_POR_INDICE = 120
+INTERVALO_MINIMO_ATUALIZACAO_INDICE_SEGUNDOS = 600
+# Fora desta janela a pontuação de horário zera e nenhum jogo passa do corte de 80% (70% nome + 30% horário).
+JANELA_BUSCA_RESULTADO_SEGUNDOS = 43200
 
-# --- FUNÇÃO AUXILIAR DO PLAYWRIGHT ---
-def fetch_url_com_playwright(url):
-    """Usa o Playwright para buscar o conteúdo de uma URL de API, driblando desafios."""
-    with sync_playwright() as p:
-        browser = None # Inicializa para garantir que a variável exista
-        try:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_extra_http_headers(HEADERS)
-            response = page.goto(url, timeout=30000, wait_until='domcontentloaded')
-            
-            if response and response.ok:
-                json_content = response.json()
-                browser.close()
-                return json_content
-            else:
+# --- POOL DE NAVEGADOR DO PLAYWRIGHT ---
+class PoolNavegador:
+    """
+    Um único Chromium headless, iniciado na primeira chamada e reaproveitado até o fim do processo.
+    O Playwright roda num event loop próprio (thread dedicada), o que permite abrir várias páginas
+    em paralelo; as chamadas continuam síncronas para quem usa o pool.
+    """
+
+    def __init__(self, max_paginas=MAX_PAGINAS_SIMULTANEAS):
+        self.max_paginas = max_paginas
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._contexto = None
+        self._semaforo = None
+        self._trava = threading.Lock()
+
+    def _garantir_iniciado(self):
+        if self._loop is not None:
+            return
+        with self._trava:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='pool-navegador', daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._abrir(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                raise
+            self._thread, self._loop = thread, loop
+            atexit.register(self.encerrar)
+
+    async def _abrir(self):
+        print("  -> 🌐 Iniciando navegador do Playwright (reutilizado até o fim da execução)...")
+        self._playwright = await playwright_async.async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._contexto = await self._browser.new_context(extra_http_headers=HEADERS)
+        self._semaforo = asyncio.Semaphore(self.max_paginas)
+
+    async def _buscar(self, url):
+        async with self._semaforo:
+            page = await self._contexto.new_page()
+            try:
+                response = await page.goto(url, timeout=30000, wait_until='domcontentloaded')
+                if response and response.ok:
+                    return await response.json()
                 status = response.status if response else "N/A"
                 print(f"  -> AVISO: Playwright recebeu status {status} para a URL: {url}")
-                if browser.is_connected():
-                    browser.close()
                 return None
-        except Error as e:
-            print(f"  -> ❌ ERRO no Playwright ao buscar URL: {e}")
-            if browser and browser.is_connected():
-                browser.close()
-            return None
+            except playwright_async.Error as e:
+                print(f"  -> ❌ ERRO no Playwright ao buscar URL: {e}")
+                return None
+            finally:
+                await page.close()
+
+    def buscar_varios_json(self, urls):
+        """Busca várias URLs em paralelo (até `max_paginas` abas) e devolve os JSONs na mesma ordem."""
+        try:
+            self._garantir_iniciado()
+        except Exception as e:
+            print(f"  -> ❌ ERRO ao iniciar o navegador do Playwright: {e}")
+            return [None] * len(urls)
+        futuros = [asyncio.run_coroutine_threadsafe(self._buscar(url), self._loop) for url in urls]
+        return [futuro.result() for futuro in futuros]
+
+    def buscar_json(self, url):
+        return self.buscar_varios_json([url])[0]
+
+    async def _fechar(self):
+        if self._browser:
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+
+    def encerrar(self):
+        with self._trava:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._fechar(), self._loop).result(timeout=15)
+            except Exception as e:
+                print(f"  -> AVISO: Falha ao fechar o navegador do Playwright: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = self._thread = self._playwright = self._browser = self._contexto = None
+
+pool_navegador = PoolNavegador()
+limitador_buscas_sofascore = LimitadorDeTaxa(LIMITE_BUSCAS_POR_MINUTO_SOFASCORE)
+_ultima_atualizacao_indice = {}
+
+def fetch_url_com_playwright(url):
+    """Usa o Playwright (navegador compartilhado) para buscar o conteúdo de uma URL de API, driblando desafios."""
+    return pool_navegador.buscar_json(url)
+
+# --- TRANSPORTE ADAPTATIVO (REQUESTS PRIMEIRO, NAVEGADOR SÓ SE NECESSÁRIO) ---
+_requests_bloqueado_ate = 0.0
+
+def _buscar_json_direto(url):
+    """
+    Tenta a URL pela sessão HTTP comum. Retorna (dados, bloqueado): `bloqueado` indica que o SofaScore
+    respondeu com desafio/403 (ou uma página HTML) e a URL precisa ir para o navegador. Falhas de rede
+    (timeout, conexão recusada) não contam como bloqueio: não mandam todo o tráfego para o navegador.
+    """
+    try:
+        res = cliente_http.get(url, headers=HEADERS)
+    except requests.exceptions.RequestException as e:
+        print(f"  -> AVISO: Falha de conexão direta com o SofaScore ({e}).")
+        return None, False
+    if res.status_code in STATUS_DESAFIO_SOFASCORE:
+        return None, True
+    if res.status_code != 200:
+        return None, False
+    try:
+        return res.json(), False
+    except ValueError:
+        # Página HTML de desafio (Cloudflare) no lugar do JSON; qualquer outro corpo inválido é só uma falha.
+        eh_html = 'html' in res.headers.get('Content-Type', '') or res.text.lstrip()[:1] == '<'
+        return None, eh_html
+
+@metricas.etapa('sofascore_busca')
+def buscar_varios_json_sofascore(urls):
+    """Busca várias URLs da API do SofaScore: requests primeiro; as bloqueadas vão em paralelo para o navegador."""
+    global _requests_bloqueado_ate
+    resultados = [None] * len(urls)
+    pendentes_navegador = list(range(len(urls)))
+    if time.monotonic() >= _requests_bloqueado_ate:
+        pendentes_navegador = []
+        for posicao, url in enumerate(urls):
+            if pendentes_navegador:
+                # Já houve bloqueio nesta leva: o restante vai direto para o navegador.
+                pendentes_navegador.append(posicao)
+                continue
+            dados, bloqueado = _buscar_json_direto(url)
+            if bloqueado:
+                print("  -> 🛡️ SofaScore bloqueou o acesso direto. Usando o navegador do Playwright...")
+                _requests_bloqueado_ate = time.monotonic() + PAUSA_REQUESTS_APOS_BLOQUEIO_SEGUNDOS
+                pendentes_navegador.append(posicao)
+            else:
+                resultados[posicao] = dados
+    metricas.incrementar('sofascore_urls', len(urls) - len(pendentes_navegador), transporte='direto')
+    if pendentes_navegador:
+        metricas.incrementar('sofascore_urls', len(pendentes_navegador), transporte='navegador')
+        with metricas.etapa('sofascore_navegador'):
+            dados_navegador = pool_navegador.buscar_varios_json([urls[p] for p in pendentes_navegador])
+        for posicao, dados in zip(pendentes_navegador, dados_navegador):
+            resultados[posicao] = dados
+    return resultados
+
+def buscar_json_sofascore(url):
+    return buscar_varios_json_sofascore([url])[0]
 
-# --- FUNÇÕES DE BUSCA PRINCIPAIS (ATUALIZADAS COM PLAYWRIGHT) ---
+# --- FUNÇÕES DE BUSCA PRINCIPAIS (TRANSPORTE ADAPTATIVO) ---
 
 def buscar_jogos_do_dia_sofascore(data: str):
-    print(f"--- 📡 Buscando jogos do dia {data} no SofaScore (via Playwright)... ---")
-    url = f"https://api.sofascore.com/api/v1/sport/football/scheduled-events/{data}"
-    dados = fetch_url_com_playwright(url)
+    print(f"--- 📡 Buscando jogos do dia {data} no SofaScore... ---")
+    url = f"{URL_SOFASCORE}/api/v1/sport/football/scheduled-events/{data}"
+    dados = buscar_json_sofascore(url)
     
     if not dados:
         print(f"  -> ❌ ERRO: Não foi possível buscar jogos do dia.")
@@ -74,9 +229,9 @@ def buscar_jogos_do_dia_sofascore(data: str):
     return jogos_do_dia
 
 def buscar_jogos_ao_vivo():
-    print("--- 📡 Buscando jogos ao vivo no SofaScore (via Playwright)... ---")
-    url = "https://api.sofascore.com/api/v1/sport/football/events/live"
-    dados = fetch_url_com_playwright(url)
+    print("--- 📡 Buscando jogos ao vivo no SofaScore... ---")
+    url = f"{URL_SOFASCORE}/api/v1/sport/football/events/live"
+    dados = buscar_json_sofascore(url)
 
     if not dados:
         print(f"  -> ❌ ERRO: Não foi possível buscar jogos ao vivo.")
@@ -102,9 +257,9 @@ def buscar_jogos_ao_vivo():
 
 def buscar_estatisticas_ao_vivo(id_do_jogo: int):
     if not id_do_jogo: return None
-    url = f"https://api.sofascore.com/api/v1/event/{id_do_jogo}/statistics"
+    url = f"{URL_SOFASCORE}/api/v1/event/{id_do_jogo}/statistics"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = cliente_http.get(url, headers=HEADERS, timeout=10)
         if response.status_code != 200:
             return None
         dados_stats = response.json().get('statistics', [])
@@ -121,39 +276,140 @@ def buscar_estatisticas_ao_vivo(id_do_jogo: int):
     except requests.exceptions.RequestException:
         return None
 
-def obter_sofascore_id(nome_time, cache_ids):
-    if nome_time in cache_ids:
-        return cache_ids[nome_time]
-    mapa_sofascore = carregar_json('mapa_nomes_sofascore.json')
-    nome_para_busca = mapa_sofascore.get(nome_time, nome_time)
-    if nome_time != nome_para_busca:
-        print(f"  -> 🔎 [Sofascore] Nome '{nome_time}' traduzido para '{nome_para_busca}' pelo mapa.")
+def _procurar_id_na_api(nome_para_busca):
+    """
+    Pesquisa o time no SofaScore. Retorna (id, definitivo): `definitivo` é False quando a busca falhou
+    (rede, bloqueio, limite de taxa) e o nome pode ser pesquisado de novo mais tarde.
+    """
     print(f"  -> 🔎 [Sofascore] Procurando ID para: '{nome_para_busca}'")
     try:
-        search_url = f"https://api.sofascore.com/api/v1/search/all?q={nome_para_busca}"
-        res = requests.get(search_url, headers=HEADERS, timeout=10)
-        res.raise_for_status()
-        search_data = res.json()
+        with metricas.etapa('espera_limitador_sofascore'):
+            limitador_buscas_sofascore.aguardar()
+        search_data = buscar_json_sofascore(f"{URL_SOFASCORE}/api/v1/search/all?q={quote(nome_para_busca)}")
+        if not search_data:
+            print(f"        -> Falha: A busca por '{nome_para_busca}' não retornou dados.")
+            return None, False
         resultados_times = [r['entity'] for r in search_data.get('results', []) if r.get('type') == 'team' and r['entity'].get('sport', {}).get('name') == 'Football' and r['entity'].get('gender') == 'M']
         if not resultados_times:
             print(f"        -> Falha: Nenhum time de futebol masculino encontrado para '{nome_para_busca}'")
-            return None
+            return None, True
         nomes_encontrados = {time['name']: time['id'] for time in resultados_times}
         melhor_match = process.extractOne(nome_para_busca, nomes_encontrados.keys())
         if not melhor_match or melhor_match[1] < 85:
             print(f"        -> Falha: Melhor correspondência para '{nome_para_busca}' foi fraca.")
-            return None
-        time_id = nomes_encontrados[melhor_match[0]]
-        cache_ids[nome_time] = time_id
-        salvar_json(cache_ids, ARQUIVO_CACHE_IDS)
-        time.sleep(1)
-        return time_id
+            return None, True
+        return nomes_encontrados[melhor_match[0]], True
     except Exception as e:
         print(f"        -> Exceção ao buscar ID: {e}")
-        return None
+        return None, False
+
+class ResolvedorIdsSofascore:
+    """
+    Traduz nomes de times para IDs do SofaScore. O mapa de nomes e o cache de IDs são lidos uma vez;
+    os nomes desconhecidos são pesquisados em paralelo (com limite de taxa) e os IDs novos só são
+    gravados em disco no salvar() — chamado ao fim de cada lote e, por garantia, na saída do processo.
+    """
+
+    def __init__(self, arquivo_cache=ARQUIVO_CACHE_IDS, arquivo_mapa=ARQUIVO_MAPA_NOMES_SOFASCORE):
+        self.arquivo_cache = arquivo_cache
+        self.arquivo_mapa = arquivo_mapa
+        self._cache_ids = None
+        self._mapa_nomes = None
+        # Só nomes que a busca respondeu e não achou; falhas de rede/bloqueio são tentadas de novo.
+        # {nome: instante (monotonic) em que pode ser pesquisado outra vez}
+        self._falhas = {}
+        self._alterado = False
+        self._trava = threading.Lock()
+
+    def _carregar(self):
+        if self._cache_ids is None:
+            self._cache_ids = carregar_json(self.arquivo_cache)
+            self._mapa_nomes = carregar_json(self.arquivo_mapa)
+            atexit.register(self.salvar)
+
+    def resolver_lote(self, nomes_times):
+        """Retorna {nome: id ou None} para todos os nomes, pesquisando apenas os que não estão no cache."""
+        with self._trava:
+            self._carregar()
+            nomes_times = list(dict.fromkeys(nomes_times))
+            agora = time.monotonic()
+            faltantes = [nome for nome in nomes_times if nome not in self._cache_ids and self._falhas.get(nome, 0) <= agora]
+        if faltantes:
+            print(f"  -> 🔎 [Sofascore] Resolvendo {len(faltantes)} IDs de times desconhecidos...")
+            nomes_para_busca = []
+            for nome in faltantes:
+                nome_para_busca = self._mapa_nomes.get(nome, nome)
+                if nome != nome_para_busca:
+                    print(f"  -> 🔎 [Sofascore] Nome '{nome}' traduzido para '{nome_para_busca}' pelo mapa.")
+                nomes_para_busca.append(nome_para_busca)
+            with ThreadPoolExecutor(max_workers=MAX_BUSCAS_SIMULTANEAS_SOFASCORE) as executor:
+                resultados = list(executor.map(_procurar_id_na_api, nomes_para_busca))
+            with self._trava:
+                for nome, (time_id, definitivo) in zip(faltantes, resultados):
+                    if time_id:
+                        self._cache_ids[nome] = time_id
+                        self._falhas.pop(nome, None)
+                        self._alterado = True
+                    elif definitivo:
+                        self._falhas[nome] = time.monotonic() + VALIDADE_FALHA_BUSCA_ID_SEGUNDOS
+            self.salvar()
+        return {nome: self._cache_ids.get(nome) for nome in nomes_times}
+
+    def resolver(self, nome_time):
+        return self.resolver_lote([nome_time])[nome_time]
+
+    def salvar(self):
+        with self._trava:
+            if not self._alterado:
+                return
+            salvar_json(self._cache_ids, self.arquivo_cache)
+            self._alterado = False
+
+resolvedor_ids = ResolvedorIdsSofascore()
+
+def obter_sofascore_id(nome_time, cache_ids=None):
+    """Mantida por compatibilidade: `cache_ids` é ignorado, o resolvedor compartilhado já mantém o cache."""
+    return resolvedor_ids.resolver(nome_time)
+
+def _chave_cache_estatisticas_evento(id_evento):
+    return f"sofascore_estatisticas_evento_{id_evento}"
+
+def buscar_estatisticas_eventos_encerrados(ids_eventos):
+    """
+    Estatísticas (/event/{id}/statistics) de eventos já encerrados, que nunca mudam.
+    Usa o cache persistente compartilhado entre times e execuções e baixa em paralelo só os que faltam.
+    Retorna {id_evento: lista 'statistics'} apenas para os eventos com estatísticas disponíveis.
+    """
+    ids_eventos = list(dict.fromkeys(ids_eventos))
+    em_cache = get_many([_chave_cache_estatisticas_evento(id_evento) for id_evento in ids_eventos], VALIDADE_CACHE_EVENTOS_ENCERRADOS_HORAS)
+    estatisticas = {id_evento: em_cache[_chave_cache_estatisticas_evento(id_evento)] for id_evento in ids_eventos if _chave_cache_estatisticas_evento(id_evento) in em_cache}
+    faltantes = [id_evento for id_evento in ids_eventos if id_evento not in estatisticas]
+    if faltantes:
+        print(f"        -> Baixando estatísticas de {len(faltantes)} jogos encerrados ({len(estatisticas)} já em cache)...")
+        def _baixar(id_evento):
+            with metricas.etapa('espera_limitador_sofascore'):
+                limitador_buscas_sofascore.aguardar()
+            return buscar_json_sofascore(f"{URL_SOFASCORE}/api/v1/event/{id_evento}/statistics")
+        with ThreadPoolExecutor(max_workers=MAX_BUSCAS_SIMULTANEAS_SOFASCORE) as executor:
+            respostas = list(executor.map(_baixar, faltantes))
+        for id_evento, resposta in zip(faltantes, respostas):
+            if resposta is None:
+                continue
+            estatisticas[id_evento] = resposta.get('statistics', [])
+            salvar_cache(_chave_cache_estatisticas_evento(id_evento), estatisticas[id_evento])
+    return estatisticas
+
+def _total_escanteios(dados_stats):
+    for grupo in dados_stats:
+        if grupo.get('period') == 'ALL' and grupo.get('groups'):
+            for subgrupo in grupo['groups']:
+                if subgrupo.get('groupName') == 'Corners':
+                    return sum(int(item.get('value', 0)) for item in subgrupo.get('statisticsItems', []))
+            return None
+    return None
 
 def consultar_estatisticas_escanteios(time_name, cache_execucao, num_jogos_analise):
-    time_id = obter_sofascore_id(time_name, carregar_json(ARQUIVO_CACHE_IDS))
+    time_id = resolvedor_ids.resolver(time_name)
     if not time_id:
         return None
     cache_key = f"cantos_{time_id}"
@@ -161,33 +417,21 @@ def consultar_estatisticas_escanteios(time_name, cache_execucao, num_jogos_anali
         return cache_execucao[cache_key]
     print(f"  -> 📊 [Sofascore] Buscando estatísticas de escanteios para o time ID: {time_id}")
     try:
-        events_url = f"https://api.sofascore.com/api/v1/team/{time_id}/events/last/0"
-        res = requests.get(events_url, headers=HEADERS, timeout=10)
-        res.raise_for_status()
-        eventos = res.json().get('events', [])
+        dados_eventos = buscar_json_sofascore(f"{URL_SOFASCORE}/api/v1/team/{time_id}/events/last/0")
+        if dados_eventos is None:
+            raise ValueError(f"lista de jogos do time {time_id} indisponível")
+        ids_encerrados = [evento['id'] for evento in dados_eventos.get('events', []) if evento.get('status', {}).get('code') == 100]
         lista_total_cantos = []
-        jogos_analisados = 0
-        for evento in eventos:
-            if jogos_analisados >= num_jogos_analise:
-                break
-            if evento.get('status', {}).get('code') != 100:
-                continue
-            id_partida = evento['id']
-            stats_url = f"https://api.sofascore.com/api/v1/event/{id_partida}/statistics"
-            time.sleep(1.5)
-            res_stats = requests.get(stats_url, headers=HEADERS, timeout=10)
-            if res_stats.status_code != 200:
-                continue
-            dados_stats = res_stats.json().get('statistics', [])
-            for grupo in dados_stats:
-                if grupo.get('period') == 'ALL' and grupo.get('groups'):
-                    for subgrupo in grupo['groups']:
-                        if subgrupo.get('groupName') == 'Corners':
-                            total_cantos_partida = sum(int(item.get('value', 0)) for item in subgrupo.get('statisticsItems', []))
-                            lista_total_cantos.append(total_cantos_partida)
-                            jogos_analisados += 1
-                            break
-                    break 
+        inicio = 0
+        # Busca em lotes do tamanho que ainda falta; só avança se algum jogo vier sem dados de escanteios.
+        while len(lista_total_cantos) < num_jogos_analise and inicio < len(ids_encerrados):
+            lote = ids_encerrados[inicio:inicio + num_jogos_analise - len(lista_total_cantos)]
+            inicio += len(lote)
+            estatisticas = buscar_estatisticas_eventos_encerrados(lote)
+            for id_partida in lote:
+                total_cantos_partida = _total_escanteios(estatisticas.get(id_partida, []))
+                if total_cantos_partida is not None:
+                    lista_total_cantos.append(total_cantos_partida)
         if not lista_total_cantos:
             print(f"        -> Não foram encontrados dados de escanteios.")
             cache_execucao[cache_key] = None
@@ -204,13 +448,13 @@ def consultar_estatisticas_escanteios(time_name, cache_execucao, num_jogos_anali
 def consultar_forma_sofascore(nome_time, cache_execucao, num_jogos=6):
     if nome_time in cache_execucao:
         return cache_execucao[nome_time]
-    time_id = obter_sofascore_id(nome_time, carregar_json(ARQUIVO_CACHE_IDS))
+    time_id = resolvedor_ids.resolver(nome_time)
     if not time_id:
         print(f"        -> Falha: Não foi possível encontrar o ID do time '{nome_time}' para consultar a forma.")
         return None
     try:
-        events_url = f"https://api.sofascore.com/api/v1/team/{time_id}/events/last/0"
-        res = requests.get(events_url, headers=HEADERS, timeout=10)
+        events_url = f"{URL_SOFASCORE}/api/v1/team/{time_id}/events/last/0"
+        res = cliente_http.get(events_url, headers=HEADERS, timeout=10)
         res.raise_for_status()
         events_data = res.json().get('events', [])
         forma, total_gols_lista = [], []
@@ -236,8 +480,8 @@ def consultar_classificacao_sofascore(id_liga, id_temporada, cache):
         return cache[cache_key]
     print(f"  -> CONTEXTO [Sofascore] Buscando tabela de classificação para liga {id_liga}...")
     try:
-        url = f"https://api.sofascore.com/api/v1/unique-tournament/{id_liga}/season/{id_temporada}/standings/total"
-        res = requests.get(url, headers=HEADERS, timeout=10)
+        url = f"{URL_SOFASCORE}/api/v1/unique-tournament/{id_liga}/season/{id_temporada}/standings/total"
+        res = cliente_http.get(url, headers=HEADERS, timeout=10)
         res.raise_for_status()
         dados = res.json().get('standings', [{}])[0].get('rows', [])
         tabela = [{"posicao": time_info['position'], "nome": time_info['team']['name']} for time_info in dados]
@@ -249,37 +493,79 @@ def consultar_classificacao_sofascore(id_liga, id_temporada, cache):
         cache[cache_key] = []
         return []
 
+def _chave_cache_indice_eventos(time_id):
+    return f"sofascore_indice_eventos_time_{time_id}"
+
+def _resumir_evento(evento):
+    """Guarda só os campos usados na busca de resultados."""
+    return {
+        'id': evento['id'],
+        'startTimestamp': evento.get('startTimestamp', 0),
+        'status': {'code': evento.get('status', {}).get('code')},
+        'homeTeam': {'id': evento.get('homeTeam', {}).get('id'), 'name': evento.get('homeTeam', {}).get('name', '')},
+        'awayTeam': {'id': evento.get('awayTeam', {}).get('id'), 'name': evento.get('awayTeam', {}).get('name', '')},
+        'homeScore': {'current': evento.get('homeScore', {}).get('current')},
+        'awayScore': {'current': evento.get('awayScore', {}).get('current')}
+    }
+
+def atualizar_indice_eventos_time(time_id):
+    """
+    Atualiza o índice local de jogos recentes do time: baixa a página 0 e só segue para as
+    páginas seguintes (até MAX_PAGINAS_EVENTOS_TIME) enquanto não encontrar um evento já conhecido.
+    Eventos recebidos sempre sobrescrevem os guardados (placar/status podem ter mudado).
+    """
+    # Cópia: o dict do cache é compartilhado com a memória do gerenciador_cache.
+    indice = dict(ler_cache(_chave_cache_indice_eventos(time_id), VALIDADE_CACHE_EVENTOS_ENCERRADOS_HORAS) or {})
+    ids_conhecidos = set(indice)
+    for pagina in range(MAX_PAGINAS_EVENTOS_TIME):
+        dados = buscar_json_sofascore(f"{URL_SOFASCORE}/api/v1/team/{time_id}/events/last/{pagina}")
+        novos_eventos = (dados or {}).get('events', [])
+        if not novos_eventos: break
+        for evento in novos_eventos:
+            indice[str(evento['id'])] = _resumir_evento(evento)
+        if any(str(evento['id']) in ids_conhecidos for evento in novos_eventos): break
+    if len(indice) > MAX_EVENTOS_POR_INDICE:
+        mais_recentes = sorted(indice.values(), key=lambda evento: evento['startTimestamp'], reverse=True)[:MAX_EVENTOS_POR_INDICE]
+        indice = {str(evento['id']): evento for evento in mais_recentes}
+    salvar_cache(_chave_cache_indice_eventos(time_id), indice)
+    _ultima_atualizacao_indice[time_id] = time.monotonic()
+    return indice
+
+def _procurar_jogo_no_indice(indice, time_id, time_fora, timestamp_partida):
+    """Melhor evento do índice para (adversário, horário); só considera jogos dentro da janela de horário."""
+    melhor_jogo_encontrado, maior_pontuacao = None, -1
+    for jogo_api in indice.values():
+        timestamp_api = jogo_api['startTimestamp']
+        diferenca_tempo_segundos = abs(timestamp_api - timestamp_partida)
+        if diferenca_tempo_segundos > JANELA_BUSCA_RESULTADO_SEGUNDOS: continue
+        oponente_api = jogo_api['awayTeam']['name'] if jogo_api['homeTeam']['id'] == time_id else jogo_api['homeTeam']['name']
+        similaridade_nome = fuzz.ratio(time_fora.lower(), oponente_api.lower())
+        pontuacao_tempo = max(0, 100 - (diferenca_tempo_segundos / 432))
+        pontuacao_final = (similaridade_nome * 0.7) + (pontuacao_tempo * 0.3)
+        if pontuacao_final > maior_pontuacao:
+            maior_pontuacao, melhor_jogo_encontrado = pontuacao_final, jogo_api
+    return melhor_jogo_encontrado, maior_pontuacao
+
+@metricas.etapa('busca_resultado_sofascore')
 def buscar_resultado_sofascore(time_casa, time_fora, timestamp_partida):
-    print(f"  -> Buscando resultado para {time_casa} vs {time_fora} (Busca Profunda e Inteligente)")
-    time_id = obter_sofascore_id(time_casa, carregar_json(ARQUIVO_CACHE_IDS))
+    print(f"  -> Buscando resultado para {time_casa} vs {time_fora} (Índice Local de Jogos)")
+    time_id = resolvedor_ids.resolver(time_casa)
     if not time_id:
         print(f"        -> Falha: Não foi possível encontrar o ID do time da casa '{time_casa}'")
         return None
     try:
-        events_data = []
-        print(f"        -> Consultando múltiplas páginas de jogos recentes...")
-        for pagina in range(3):
-            events_url = f"https://api.sofascore.com/api/v1/team/{time_id}/events/last/{pagina}"
-            res = requests.get(events_url, headers=HEADERS, timeout=10)
-            if res.status_code != 200: break
-            resposta_json = res.json()
-            novos_eventos = resposta_json.get('events', [])
-            if not novos_eventos: break
-            events_data.extend(novos_eventos)
-            time.sleep(1)
-        if not events_data:
+        indice = ler_cache(_chave_cache_indice_eventos(time_id), VALIDADE_CACHE_EVENTOS_ENCERRADOS_HORAS) or {}
+        melhor_jogo_encontrado, maior_pontuacao = _procurar_jogo_no_indice(indice, time_id, time_fora, timestamp_partida)
+        jogo_resolvido = maior_pontuacao > 80 and melhor_jogo_encontrado['status']['code'] == 100
+        atualizado_recentemente = time.monotonic() - _ultima_atualizacao_indice.get(time_id, float('-inf')) < INTERVALO_MINIMO_ATUALIZACAO_INDICE_SEGUNDOS
+        metricas.incrementar('sofascore_indice_eventos', resultado='acerto' if jogo_resolvido else ('recente' if atualizado_recentemente else 'atualizado'))
+        if not jogo_resolvido and not atualizado_recentemente:
+            print(f"        -> Atualizando o índice de jogos recentes do time...")
+            indice = atualizar_indice_eventos_time(time_id)
+            melhor_jogo_encontrado, maior_pontuacao = _procurar_jogo_no_indice(indice, time_id, time_fora, timestamp_partida)
+        if not indice:
             print(f"        -> Falha: API não retornou jogos recentes para o time_id {time_id}.")
             return None
-        melhor_jogo_encontrado, maior_pontuacao = None, -1
-        for jogo_api in events_data:
-            oponente_api = jogo_api['awayTeam']['name'] if jogo_api['homeTeam']['id'] == time_id else jogo_api['homeTeam']['name']
-            timestamp_api = jogo_api['startTimestamp']
-            similaridade_nome = fuzz.ratio(time_fora.lower(), oponente_api.lower())
-            diferenca_tempo_segundos = abs(timestamp_api - timestamp_partida)
-            pontuacao_tempo = max(0, 100 - (diferenca_tempo_segundos / 432))
-            pontuacao_final = (similaridade_nome * 0.7) + (pontuacao_tempo * 0.3)
-            if pontuacao_final > maior_pontuacao:
-                maior_pontuacao, melhor_jogo_encontrado = pontuacao_final, jogo_api
         if maior_pontuacao > 80:
             print(f"        -> Melhor correspondência encontrada com {maior_pontuacao:.2f}% de confiança.")
             if melhor_jogo_encontrado['status']['code'] == 100:
@@ -290,4 +576,4 @@ def buscar_resultado_sofascore(time_casa, time_fora, timestamp_partida):
         return None
     except Exception as e:
         print(f"        -> Falha na conexão com a API do Sofascore: {e}")
-        return None
\ No newline at end of file
+        return None
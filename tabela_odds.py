@@ -0,0 +1,77 @@
+# tabela_odds.py (Tabela Normalizada de Odds)
+
+import time
+
+from importacao_tardia import importar_tardio
+
+np = importar_tardio('numpy')
+pd = importar_tardio('pandas')
+
+CASA_REFERENCIA = 'pinnacle'
+TIPOS_DE_PRECO = ('melhor', 'pinnacle', 'mediana')
+# A The Odds API devolve os resultados do h2h com o nome dos times; as estratégias falam em Home/Draw/Away.
+MERCADOS_PARA_RESULTADO = {
+    'Casa para Vencer': 'Home', 'Visitante para Vencer': 'Away', 'Empate': 'Draw',
+    'Home': 'Home', 'Away': 'Away', 'Draw': 'Draw'
+}
+
+def _normalizar_resultado(nome_resultado, evento):
+    if nome_resultado == evento.get('home_team'):
+        return 'Home'
+    if nome_resultado == evento.get('away_team'):
+        return 'Away'
+    return MERCADOS_PARA_RESULTADO.get(nome_resultado, nome_resultado)
+
+class TabelaOdds:
+    """
+    Odds de uma execução achatadas em colunas (evento x casa x mercado x resultado -> preço),
+    com melhor preço, preço da Pinnacle e mediana (consenso) de cada resultado já calculados.
+    """
+
+    def __init__(self, precos):
+        self.precos = precos
+        self._resumo = {}
+        if precos.empty:
+            return
+        agrupado = precos.groupby(['evento', 'mercado', 'resultado'], observed=True, sort=False)['preco']
+        resumo = pd.DataFrame({'melhor': agrupado.max(), 'mediana': agrupado.median()})
+        pinnacle = precos[precos['casa'] == CASA_REFERENCIA].groupby(['evento', 'mercado', 'resultado'], observed=True, sort=False)['preco'].first()
+        resumo['pinnacle'] = pinnacle.reindex(resumo.index)
+        for chave, linha in zip(resumo.index, resumo[list(TIPOS_DE_PRECO)].itertuples(index=False)):
+            self._resumo[tuple(str(parte) for parte in chave)] = {tipo: (None if np.isnan(valor) else float(valor)) for tipo, valor in zip(TIPOS_DE_PRECO, linha)}
+
+    def __len__(self):
+        return len(self._resumo)
+
+    def preco(self, id_evento, mercado, tipo='melhor', chave_mercado='h2h'):
+        """Preço de `mercado` ('Home'/'Draw'/'Away' ou 'Casa para Vencer'/'Empate'/...) no evento; None se não houver."""
+        if id_evento is None:
+            return None
+        resultado = MERCADOS_PARA_RESULTADO.get(mercado, mercado)
+        precos = self._resumo.get((str(id_evento), chave_mercado, resultado))
+        return precos.get(tipo) if precos else None
+
+def construir_tabela_odds(jogos_com_odds):
+    """Achata a resposta de buscar_odds_the_odds_api (uma vez por execução) numa TabelaOdds."""
+    inicio = time.perf_counter()
+    colunas = {'evento': [], 'casa': [], 'mercado': [], 'resultado': [], 'preco': []}
+    for evento in jogos_com_odds or []:
+        if not isinstance(evento, dict) or evento.get('id') is None:
+            continue
+        for bookmaker in evento.get('bookmakers', []):
+            if not isinstance(bookmaker, dict):
+                continue
+            for market in bookmaker.get('markets', []):
+                for outcome in market.get('outcomes', []):
+                    preco = outcome.get('price')
+                    if not isinstance(preco, (int, float)) or preco <= 1:
+                        continue
+                    colunas['evento'].append(str(evento['id']))
+                    colunas['casa'].append(bookmaker.get('key'))
+                    colunas['mercado'].append(market.get('key'))
+                    colunas['resultado'].append(_normalizar_resultado(outcome.get('name'), evento))
+                    colunas['preco'].append(float(preco))
+    precos = pd.DataFrame(colunas).astype({'evento': 'category', 'casa': 'category', 'mercado': 'category', 'resultado': 'category', 'preco': 'float64'})
+    tabela = TabelaOdds(precos)
+    print(f"  -> 📒 Tabela de odds: {len(precos)} preços de {precos['evento'].nunique()} eventos normalizados em {(time.perf_counter() - inicio) * 1000:.1f} ms.")
+    return tabela
@@ -0,0 +1,144 @@
+# varredura_parametros.py (Varredura Paralela dos Limiares das Estratégias)
+
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from armazem_historico import carregar_historico
+from avaliador_estrategias import COLUNAS_FEATURES, ESTRATEGIAS_POR_FUNCAO, PARAMETROS_ESTRATEGIAS, mascara_aprovacao
+from backtest import (
+    ARQUIVO_HISTORICO_PADRAO, STAKE_UNIDADES,
+    _preparar_historico, construir_features_historicas
+)
+
+ARQUIVO_RESULTADO_VARREDURA = 'resultado_varredura.csv'
+MIN_APOSTAS_RANKING = 30
+COMBINACOES_POR_TAREFA = 16
+COLUNAS_BOOLEANAS = ['tem_nome_casa', 'tem_nome_fora', 'tem_stats_casa', 'tem_stats_fora']
+COLUNAS_RESULTADO = ['acerto_casa', 'acerto_empate', 'acerto_fora']
+COLUNAS_MATRIZ = COLUNAS_FEATURES + COLUNAS_RESULTADO
+COLUNA_ACERTO_POR_MERCADO = {'Casa para Vencer': 'acerto_casa', 'Empate': 'acerto_empate', 'Visitante para Vencer': 'acerto_fora'}
+COLUNA_ODD_POR_MERCADO = {'Casa para Vencer': 'odd_casa', 'Empate': 'odd_empate', 'Visitante para Vencer': 'odd_fora'}
+
+# Grade padrão: cada estratégia só é combinada com os próprios limiares (ver 'parametros' em ESTRATEGIAS).
+GRADE_PADRAO = {
+    'FAVORITO_FORA_MIN_PERC_VITORIAS_FORA': list(range(40, 85, 5)), 'FAVORITO_FORA_MIN_PERC_DERROTAS_CASA': list(range(40, 85, 5)),
+    'MANDANTE_AZARAO_MIN_ODD': [round(x, 2) for x in np.arange(1.8, 3.55, 0.1)], 'MANDANTE_AZARAO_MIN_PERC_VITORIAS_CASA': list(range(30, 65, 5)),
+    'VISITANTE_AZARAO_MIN_ODD': [round(x, 2) for x in np.arange(1.8, 3.55, 0.1)], 'VISITANTE_AZARAO_MIN_PERC_VITORIAS_FORA': list(range(25, 60, 5)),
+    'EMPATE_MIN_PERC_EMPATES_CASA': list(range(20, 45, 2)), 'EMPATE_MIN_PERC_EMPATES_FORA': list(range(20, 45, 2)),
+    'FORMA_CASA_MIN_VITORIAS_CASA': [2, 3, 4, 5], 'FORMA_CASA_MIN_DERROTAS_FORA': [2, 3, 4, 5],
+    'FORMA_FORA_MIN_DERROTAS_CASA': [2, 3, 4, 5], 'FORMA_FORA_MIN_VITORIAS_FORA': [2, 3, 4, 5],
+}
+
+# --- ESTADO DE CADA PROCESSO TRABALHADOR ---
+_memoria_compartilhada = None
+_colunas = None
+
+def _iniciar_trabalhador(nome_memoria, formato):
+    """Conecta o processo à matriz de features já existente (sem cópia) e monta as colunas como visões dela."""
+    global _memoria_compartilhada, _colunas
+    _memoria_compartilhada = shared_memory.SharedMemory(name=nome_memoria)
+    matriz = np.ndarray(formato, dtype=np.float64, buffer=_memoria_compartilhada.buf)
+    _colunas = {coluna: matriz[:, i] for i, coluna in enumerate(COLUNAS_MATRIZ)}
+    for coluna in COLUNAS_BOOLEANAS + COLUNAS_RESULTADO:
+        _colunas[coluna] = _colunas[coluna] != 0
+
+def _metricas(estrategia, parametros):
+    mercado = estrategia['resultado']['mercado']
+    odds = _colunas[COLUNA_ODD_POR_MERCADO[mercado]]
+    selecionados = mascara_aprovacao(estrategia, _colunas, parametros) & ~np.isnan(odds)
+    acerto = _colunas[COLUNA_ACERTO_POR_MERCADO[mercado]][selecionados]
+    lucro = np.where(acerto, (odds[selecionados] - 1) * STAKE_UNIDADES, -STAKE_UNIDADES)
+    acumulado = np.cumsum(lucro)
+    pico = np.maximum.accumulate(np.concatenate([[0.0], acumulado]))[1:]
+    apostas = int(selecionados.sum())
+    # Mesmas definições do backtest: roi é sobre o capital necessário (pior banca exigida por uma aposta).
+    capital_necessario = float((STAKE_UNIDADES - (acumulado - lucro)).max()) if apostas else np.nan
+    return {
+        'apostas': apostas, 'acertos': int(acerto.sum()),
+        'taxa_acerto': acerto.mean() * 100 if apostas else np.nan,
+        'lucro': float(lucro.sum()),
+        'yield': lucro.sum() / (apostas * STAKE_UNIDADES) * 100 if apostas else np.nan,
+        'roi': lucro.sum() / capital_necessario * 100 if apostas else np.nan,
+        'capital_necessario': capital_necessario,
+        'drawdown_maximo': float((pico - acumulado).max()) if apostas else 0.0,
+    }
+
+def _avaliar_tarefa(tarefa):
+    nome_funcao, combinacoes = tarefa
+    estrategia = ESTRATEGIAS_POR_FUNCAO[nome_funcao]
+    return [{'estrategia': estrategia['resultado']['nome_estrategia'], **parametros, **_metricas(estrategia, parametros)} for parametros in combinacoes]
+
+def gerar_tarefas(grade, funcoes=None):
+    """Combinações de limiares por estratégia, agrupadas em tarefas de COMBINACOES_POR_TAREFA."""
+    tarefas = []
+    for nome_funcao in funcoes or list(ESTRATEGIAS_POR_FUNCAO):
+        nomes = ESTRATEGIAS_POR_FUNCAO[nome_funcao]['parametros']
+        valores = [grade.get(nome, [PARAMETROS_ESTRATEGIAS[nome]]) for nome in nomes]
+        combinacoes = [dict(zip(nomes, combinacao)) for combinacao in itertools.product(*valores)]
+        for inicio in range(0, len(combinacoes), COMBINACOES_POR_TAREFA):
+            tarefas.append((nome_funcao, combinacoes[inicio:inicio + COMBINACOES_POR_TAREFA]))
+    return tarefas
+
+def rodar_varredura(df, grade=GRADE_PADRAO, funcoes=None, processos=None):
+    """
+    Avalia no histórico todas as combinações da `grade` ({limiar: [valores]}) em paralelo.
+    A matriz de features é calculada uma vez e colocada em memória compartilhada: cada processo
+    apenas a mapeia, e as tarefas carregam só os limiares. Retorna o ranking (DataFrame) por yield.
+    """
+    inicio = time.perf_counter()
+    historico = _preparar_historico(df)
+    features = construir_features_historicas(historico)
+    matriz_local = np.column_stack(
+        [features[coluna].to_numpy(dtype=np.float64) for coluna in COLUNAS_FEATURES] +
+        [(historico['FTHG'] > historico['FTAG']).to_numpy(float), (historico['FTHG'] == historico['FTAG']).to_numpy(float), (historico['FTHG'] < historico['FTAG']).to_numpy(float)]
+    )
+    tarefas = gerar_tarefas(grade, funcoes)
+    total = sum(len(combinacoes) for _, combinacoes in tarefas)
+    processos = processos or os.cpu_count() or 1
+    print(f"  -> 🧮 Varredura: {total} combinações sobre {len(historico)} jogos em {processos} processos...")
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(1, matriz_local.nbytes))
+    try:
+        np.ndarray(matriz_local.shape, dtype=np.float64, buffer=memoria.buf)[:] = matriz_local
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador, initargs=(memoria.name, matriz_local.shape)) as executor:
+            linhas = [linha for resultado in executor.map(_avaliar_tarefa, tarefas) for linha in resultado]
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+    ranking = pd.DataFrame(linhas)
+    if not ranking.empty:
+        ranking['elegivel'] = ranking['apostas'] >= MIN_APOSTAS_RANKING
+        ranking = ranking.sort_values(['elegivel', 'yield', 'apostas'], ascending=[False, False, False], na_position='last').reset_index(drop=True)
+    print(f"  -> ✅ {total} combinações avaliadas em {time.perf_counter() - inicio:.1f}s.")
+    return ranking
+
+def _carregar_grade(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        grade = json.load(f)
+    desconhecidos = set(grade) - set(PARAMETROS_ESTRATEGIAS)
+    if desconhecidos:
+        raise ValueError(f"Limiares desconhecidos na grade: {', '.join(sorted(desconhecidos))}")
+    return grade
+
+if __name__ == "__main__":
+    # Uso: python varredura_parametros.py [historico.csv] [grade.json]
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_HISTORICO_PADRAO
+    grade = _carregar_grade(sys.argv[2]) if len(sys.argv) > 2 else GRADE_PADRAO
+    print(f"===== VARREDURA DE PARÂMETROS ({arquivo}) =====")
+    ranking = rodar_varredura(carregar_historico(arquivo), grade)
+    ranking.to_csv(ARQUIVO_RESULTADO_VARREDURA, index=False)
+    with pd.option_context('display.max_columns', None, 'display.width', 250, 'display.float_format', '{:.2f}'.format):
+        for nome, grupo in ranking[ranking['elegivel']].groupby('estrategia', sort=False):
+            colunas = ['apostas', 'taxa_acerto', 'lucro', 'yield', 'roi', 'drawdown_maximo'] + [c for c in grupo.columns if c in PARAMETROS_ESTRATEGIAS and grupo[c].notna().all()]
+            print(f"\n--- {nome} (top 5 de {len(grupo)}) ---")
+            print(grupo[colunas].head(5).to_string(index=False))
+    print(f"\nRanking completo salvo em '{ARQUIVO_RESULTADO_VARREDURA}'.")